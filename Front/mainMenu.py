@@ -4,7 +4,9 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from Simulador.cpuPipelineSinHazards import CPUpipelineNoHazard
+from Simulador.pipelineEtapas.ejecucion import FIN_CANCELADO
 from processor_view import ProcessorView
+from simulation_runner import SimulationRunner
 
 back = "#1A1A1A"
 
@@ -74,11 +76,16 @@ class MainMenu:
 
         # Path to log file
         self.log_path = os.path.join(os.path.dirname(__file__), "..", "log.txt")
+        # Binary per-cycle trace written by the simulator (read by the processor view)
+        self.trace_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "traza.trz"))
 
         # Create processor view widget
-        self.processor_view = ProcessorView(self.processor_tab, self.log_path)
+        self.processor_view = ProcessorView(self.processor_tab, self.trace_path)
         self.processor_view.pack(fill='both', expand=True)
 
+        # Simulation running in the background (None when idle)
+        self.runner = None
+
     def get_txt(self):
         self.list.clear()
         self.filtered_list.clear()
@@ -92,17 +99,32 @@ class MainMenu:
         self.filtered_list = [item for item in self.filtered_list if item.strip()]
 
         if len(self.filtered_list) != 0:
+            # Release the previous trace before the simulator overwrites it
+            self.processor_view.parser.close()
             new_cpu_pipeline = CPUpipelineNoHazard()
             new_cpu_pipeline.cargarCodigo(self.filtered_list)   
-            new_cpu_pipeline.ejecutar()
 
-            # After execution, reload the log in processor view
-            if self.processor_view:
-                success = self.processor_view.load_log()
-                if success:
-                    messagebox.showinfo("Success", "Simulation completed! Switch to Processor tab to view pipeline execution.")
-                else:
-                    messagebox.showerror("Error", "Failed to load simulation log.")
+            # Simulate on a worker thread; the processor view shows cycles as they arrive
+            self.runner = SimulationRunner(new_cpu_pipeline, self.trace_path)
+            self.run_button.config(text="Cancel", command=lambda: self.cancel_run())
+            self.processor_view.start_live(self.runner, on_finished=self.simulation_finished)
+            self.runner.start()
+
+    def cancel_run(self):
+        if self.runner is not None:
+            self.processor_view.cancel_live()
+
+    def simulation_finished(self, runner):
+        self.runner = None
+        self.run_button.config(text="Run", command=lambda: self.get_txt())
+        if runner.error is not None:
+            messagebox.showerror("Error", f"Simulation failed: {runner.error}")
+        elif self.processor_view.parser.get_total_cycles() == 0:
+            messagebox.showerror("Error", "Failed to load simulation log.")
+        elif runner.result == FIN_CANCELADO:
+            messagebox.showinfo("Cancelled", "Simulation cancelled. The cycles run so far are in the Processor tab.")
+        else:
+            messagebox.showinfo("Success", "Simulation completed! Switch to Processor tab to view pipeline execution.")
 
 
     def editor_window(self):
@@ -127,7 +149,7 @@ class MainMenu:
         self.processor_tab.grid_propagate(False)
 
         # Try to load log if it exists
-        if self.processor_view and os.path.exists(self.log_path):
+        if self.processor_view and self.runner is None and os.path.exists(self.trace_path):
             self.processor_view.load_log()
 
 
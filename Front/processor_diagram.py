@@ -16,6 +16,10 @@ class ProcessorDiagram:
         self.wires: Dict[str, Wire] = {}
         self.junctions: Dict[str, Junction] = {}
 
+        # Names currently drawn as active; updates only reconfigure what changed
+        self.active_components = set()
+        self.active_wires = set()
+
         # Build the complete processor
         self._build_processor()
 
@@ -277,33 +281,33 @@ class ProcessorDiagram:
 
     def set_active_components(self, active_components: List[str]):
         """
-        Activate specific components
+        Activate specific components (only items whose state changes are redrawn)
         Args:
             active_components: List of component names to activate
         """
-        # Deactivate all first
-        for comp in self.components.values():
-            comp.set_active(False)
+        new_active = {name for name in active_components if name in self.components}
+
+        for comp_name in self.active_components - new_active:
+            self.components[comp_name].set_active(False)
+        for comp_name in new_active - self.active_components:
+            self.components[comp_name].set_active(True)
 
-        # Activate specified components
-        for comp_name in active_components:
-            if comp_name in self.components:
-                self.components[comp_name].set_active(True)
+        self.active_components = new_active
 
     def set_active_wires(self, active_wires: List[str]):
         """
-        Activate specific wires
+        Activate specific wires (only items whose state changes are redrawn)
         Args:
             active_wires: List of wire names to activate
         """
-        # Deactivate all first
-        for wire in self.wires.values():
-            wire.set_active(False)
-
-        # Activate specified wires
-        for wire_name in active_wires:
-            if wire_name in self.wires:
-                self.wires[wire_name].set_active(True)
+        new_active = {name for name in active_wires if name in self.wires}
+
+        for wire_name in self.active_wires - new_active:
+            self.wires[wire_name].set_active(False)
+        for wire_name in new_active - self.active_wires:
+            self.wires[wire_name].set_active(True)
+
+        self.active_wires = new_active
 
     def set_state_from_json(self, state_data: dict):
         """
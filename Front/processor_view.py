@@ -2,11 +2,32 @@ import tkinter as tk
 from tkinter import ttk
 import re
 import os
+import time
 from processor_diagram import ProcessorDiagram
+from Simulador.componentes.traza import LectorTraza
+
+TRACE_EXTENSION = '.trz'
+PROGRESS_EVERY = 5000  # lines between progress callbacks while parsing a text log
+
+# Line formats of the simulator log (one state dump, then the events of that cycle)
+CYCLE_HEADER_RE = re.compile(r'\[CICLO\s+(\d+)\]\s+\[PC=\s*(-?\d+)\](?:\s+\[ESPECULATIVO\])?\s+Estado del Pipeline:')
+STAGE_RE = re.compile(r'\s+(\w+):\s+(.+)')
+COMPLETED_RE = re.compile(r'\[CICLO\s+\d+\]\s+\[COMPLETADA\]\s+(.+)')
+REGISTER_RE = re.compile(r'\[STORE\]\s+Registro\s+(\w+)\s+<-\s+(-?\d+)')
+LOAD_RE = re.compile(r'\[STORE\]\s+Load:\s+(\w+)\s+<-\s+Mem\[-?\d+\]\s+=\s+(-?\d+)')
+JAL_RE = re.compile(r'\[STORE\]\s+JAL:\s+(.+)')
+INSTRUCTIONS_LOADED_RE = re.compile(r'(\d+) instrucciones cargadas')
+INSTRUCTION_RE = re.compile(r'\s+\[(\d+)\]\s+(.+)')
+
+KEYFRAME_INTERVAL = 128  # cycles between full register/memory copies in StateHistory
+STATE_NAME_RE = re.compile(r'x\d+$|Mem\[-?\d+\]$')  # reg_updates entries that are state (not JAL/Salto info)
+
+LIVE_POLL_MS = 50      # how often the view drains a running simulation's queue
+LIVE_BATCH = 5000      # max cycle records taken per poll (keeps each poll short)
 
 
 class LogParser:
-    """Parse the log.txt file to extract pipeline execution data"""
+    """Parse the log.txt file (or a binary .trz trace) to extract pipeline execution data"""
 
     def __init__(self, log_path):
         self.log_path = log_path
@@ -14,93 +35,176 @@ class LogParser:
         self.instructions = []
         self.register_updates = {}
         self.current_cycle_idx = 0
+        self.trace = None  # LectorTraza when log_path is a binary trace
 
-    def parse(self):
-        """Parse the log file and extract all cycle information"""
+    def parse(self, progress=None):
+        """
+        Parse the log file and extract all cycle information.
+        The text log is read once, line by line; progress(done, total) is called
+        with bytes read every PROGRESS_EVERY lines and when parsing ends.
+        """
         if not os.path.exists(self.log_path):
             print(f"Log file not found: {self.log_path}")
             return False
 
-        with open(self.log_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Extract instructions list
-        instr_match = re.search(r'(\d+) instrucciones cargadas.*?(?=\n\n)', content, re.DOTALL)
-        if instr_match:
-            instr_section = instr_match.group(0)
-            instr_lines = re.findall(r'\[(\d+)\]\s+(.+)', instr_section)
-            self.instructions = [(int(idx), instr.strip()) for idx, instr in instr_lines]
-
-        # Extract cycle information
-        cycle_pattern = r'\[CICLO\s+(\d+)\]\s+\[PC=\s*(\d+)\]\s+Estado del Pipeline:(.*?)(?=\n\n|\[CICLO|\Z)'
-        cycle_matches = re.finditer(cycle_pattern, content, re.DOTALL)
-
-        for match in cycle_matches:
-            cycle_num = int(match.group(1))
-            pc = int(match.group(2))
-            pipeline_state = match.group(3)
-
-            # Extract stage states
-            stages = {}
-            stage_pattern = r'(\w+):\s+(.+?)(?=\n|$)'
-            for stage_match in re.finditer(stage_pattern, pipeline_state):
-                stage_name = stage_match.group(1).strip()
-                stage_value = stage_match.group(2).strip()
-                stages[stage_name] = stage_value
-
-            # Look for completed instruction and register updates after this cycle
-            cycle_end_pattern = rf'\[CICLO\s+{cycle_num}\].*?(?=\[CICLO|\Z)'
-            cycle_section = re.search(cycle_end_pattern, content, re.DOTALL)
-
-            completed_instr = None
-            reg_updates = []
-
-            if cycle_section:
-                section_text = cycle_section.group(0)
-
-                # Check for completed instruction
-                completed_match = re.search(r'\[COMPLETADA\]\s+(.+)', section_text)
-                if completed_match:
-                    completed_instr = completed_match.group(1).strip()
-
-                # Check for register updates
-                reg_pattern = r'\[STORE\]\s+Registro\s+(\w+)\s+<-\s+(\d+)'
-                for reg_match in re.finditer(reg_pattern, section_text):
-                    reg_name = reg_match.group(1)
-                    reg_value = int(reg_match.group(2))
-                    reg_updates.append((reg_name, reg_value))
-                    self.register_updates[reg_name] = reg_value
-
-                # Check for JAL updates
-                jal_pattern = r'\[STORE\]\s+JAL:\s+(.+)'
-                jal_matches = re.findall(jal_pattern, section_text)
-                if jal_matches:
-                    for jal_info in jal_matches:
-                        reg_updates.append(("JAL", jal_info))
-
-            cycle_data = {
-                'cycle': cycle_num,
-                'pc': pc,
-                'stages': stages,
-                'completed': completed_instr,
-                'reg_updates': reg_updates
-            }
+        if self.log_path.endswith(TRACE_EXTENSION):
+            return self._parse_trace()
 
-            self.cycles.append(cycle_data)
+        self.cycles = []
+        self.instructions = []
+        self.register_updates = {}
 
+        total = os.path.getsize(self.log_path)
+        done = 0
+        current = None          # cycle record the following lines belong to
+        in_stages = False       # reading the stage lines of a state dump
+        in_instructions = False  # reading the "[NNN] instr" listing
+
+        with open(self.log_path, 'rb') as f:
+            for line_number, raw in enumerate(f, 1):
+                done += len(raw)
+                if progress is not None and line_number % PROGRESS_EVERY == 0:
+                    progress(done, total)
+                line = raw.decode('utf-8').rstrip('\r\n')
+
+                if not line.strip():
+                    in_stages = in_instructions = False
+                    continue
+
+                if in_stages:
+                    stage_match = STAGE_RE.match(line)
+                    if stage_match:
+                        current['stages'][stage_match.group(1)] = stage_match.group(2).strip()
+                        continue
+                    in_stages = False
+
+                if in_instructions:
+                    instr_match = INSTRUCTION_RE.match(line)
+                    if instr_match:
+                        self.instructions.append((int(instr_match.group(1)), instr_match.group(2).strip()))
+                        continue
+                    in_instructions = False
+
+                if line.startswith('[CICLO'):
+                    header = CYCLE_HEADER_RE.match(line)
+                    if header:
+                        current = {
+                            'cycle': int(header.group(1)),
+                            'pc': int(header.group(2)),
+                            'stages': {},
+                            'completed': None,
+                            'reg_updates': []
+                        }
+                        self.cycles.append(current)
+                        in_stages = True
+                        continue
+                    completed = COMPLETED_RE.match(line)
+                    if completed and current is not None and current['completed'] is None:
+                        current['completed'] = completed.group(1).strip()
+                    continue
+
+                if line.startswith('[STORE]') and current is not None:
+                    update = REGISTER_RE.match(line) or LOAD_RE.match(line)
+                    if update:
+                        reg_name, reg_value = update.group(1), int(update.group(2))
+                        current['reg_updates'].append((reg_name, reg_value))
+                        self.register_updates[reg_name] = reg_value
+                        continue
+                    jal = JAL_RE.match(line)
+                    if jal:
+                        current['reg_updates'].append(("JAL", jal.group(1)))
+                    continue
+
+                if not self.instructions and INSTRUCTIONS_LOADED_RE.match(line):
+                    in_instructions = True
+
+        if progress is not None:
+            progress(done, total)
         return len(self.cycles) > 0
 
+    def _parse_trace(self):
+        """Open the binary trace; cycles are decoded lazily from the memory map"""
+        self.close()
+        self.trace = LectorTraza(self.log_path)
+        self.instructions = list(enumerate(self.trace.instrucciones))
+        return len(self.trace) > 0
+
+    def close(self):
+        """Release the trace memory map (needed before the simulator rewrites the file)"""
+        if self.trace is not None:
+            self.trace.cerrar()
+            self.trace = None
+
     def get_cycle_data(self, cycle_idx):
         """Get data for a specific cycle index"""
+        if self.trace is not None:
+            if 0 <= cycle_idx < len(self.trace):
+                return self.trace.ciclo(cycle_idx)
+            return None
         if 0 <= cycle_idx < len(self.cycles):
             return self.cycles[cycle_idx]
         return None
 
     def get_total_cycles(self):
         """Get total number of cycles"""
+        if self.trace is not None:
+            return len(self.trace)
         return len(self.cycles)
 
 
+class StateHistory:
+    """
+    Register/memory values at any cycle, rebuilt from the per-cycle reg_updates.
+    A full copy of the state (keyframe) is kept every `interval` cycles, so reaching
+    any cycle costs one keyframe copy plus at most interval - 1 cycles of updates;
+    stepping forward from the last cycle shown applies only that cycle's updates.
+    Keyframes are built on demand, the first time a cycle past them is requested.
+    """
+
+    def __init__(self, parser, interval=KEYFRAME_INTERVAL):
+        self.parser = parser
+        self.interval = interval
+        self.keyframes = []   # keyframes[k] = state after cycle k * interval
+        self._cursor = None   # (cycle_idx, state) of the last lookup
+
+    def _apply(self, state, cycle_idx):
+        """Apply the writes of one cycle to state"""
+        cycle_data = self.parser.get_cycle_data(cycle_idx)
+        if cycle_data:
+            for name, value in cycle_data['reg_updates']:
+                if STATE_NAME_RE.match(name):
+                    state[name] = value
+
+    def _keyframe(self, k):
+        """State after cycle k * interval (builds the missing keyframes in order)"""
+        while len(self.keyframes) <= k:
+            n = len(self.keyframes)
+            if n == 0:
+                state = {}
+                self._apply(state, 0)
+            else:
+                state = dict(self.keyframes[-1])
+                for i in range((n - 1) * self.interval + 1, n * self.interval + 1):
+                    self._apply(state, i)
+            self.keyframes.append(state)
+        return self.keyframes[k]
+
+    def state_at(self, cycle_idx):
+        """
+        Dict name -> value ('x5', 'Mem[12]', ...) after the writes of cycle_idx.
+        The returned dict is reused by the next call; copy it to keep it.
+        """
+        if self._cursor is not None and 0 <= cycle_idx - self._cursor[0] < self.interval:
+            start, state = self._cursor
+        else:
+            k = cycle_idx // self.interval
+            start, state = k * self.interval, dict(self._keyframe(k))
+        for i in range(start + 1, cycle_idx + 1):
+            self._apply(state, i)
+        self._cursor = (cycle_idx, state)
+        return state
+
+
 class PipelineStage(tk.Canvas):
     """Visual representation of a single pipeline stage"""
 
@@ -124,8 +228,14 @@ class PipelineStage(tk.Canvas):
         self.instr_text = self.create_text(width//2, 55, text='Libre',
                                           fill='#888888', font=('Arial', 9), width=width-30)
 
+        self.shown_text = 'Libre'  # last text drawn, so unchanged stages are not reconfigured
+
     def update_stage(self, instruction_text, is_busy=False):
         """Update the stage with current instruction"""
+        if instruction_text == self.shown_text:
+            return
+        self.shown_text = instruction_text
+
         if instruction_text == "Libre":
             self.itemconfig(self.box, fill='#3A3A3A', outline='#5A5A5A')
             self.itemconfig(self.instr_text, text='Libre', fill='#888888')
@@ -151,9 +261,14 @@ class ProcessorView(tk.Frame):
 
         self.log_path = log_path
         self.parser = LogParser(log_path)
+        self.history = StateHistory(self.parser)
         self.current_cycle = 0
         self.is_running = False
         self.animation_speed = 500  # milliseconds
+        self.last_frame_time = None  # perf_counter() of the previous animation frame
+        self.reg_shown = {}  # register name -> (text, highlighted) currently on its label
+        self.live_runner = None  # SimulationRunner streaming cycles into the parser
+        self.on_live_finished = None
         self.processor_diagram = None  # Will be created in setup_ui
 
         self.setup_ui()
@@ -191,6 +306,12 @@ class ProcessorView(tk.Frame):
                                    bg='#2A2A2A', fg='white', font=('Arial', 11, 'bold'))
         self.cycle_label.pack(side='left', padx=20)
 
+        self.goto_entry = tk.Entry(control_frame, width=7, font=('Arial', 10))
+        self.goto_entry.pack(side='left', padx=(0, 3))
+        self.goto_entry.bind('<Return>', lambda event: self._go_to_entry())
+        self.goto_btn = tk.Button(control_frame, text='Go to', command=self._go_to_entry, **btn_style)
+        self.goto_btn.pack(side='left', padx=3, pady=10)
+
         self.pc_label = tk.Label(control_frame, text='PC: 0',
                                 bg='#2A2A2A', fg='#6ADA6A', font=('Arial', 11, 'bold'))
         self.pc_label.pack(side='left', padx=10)
@@ -205,6 +326,15 @@ class ProcessorView(tk.Frame):
         self.speed_scale.set(500)
         self.speed_scale.pack(side='left', padx=5)
 
+        # Background simulation status
+        self.cancel_sim_btn = tk.Button(control_frame, text='✖ Cancel Sim', command=self.cancel_live,
+                                        state='disabled', **btn_style)
+        self.cancel_sim_btn.pack(side='left', padx=(20, 3), pady=10)
+
+        self.sim_label = tk.Label(control_frame, text='', bg='#2A2A2A', fg='#AAAAAA',
+                                  font=('Arial', 9))
+        self.sim_label.pack(side='left', padx=5)
+
         # Main content area
         content_frame = tk.Frame(self, bg='#1A1A1A')
         content_frame.pack(fill='both', expand=True, padx=5, pady=5)
@@ -388,9 +518,16 @@ class ProcessorView(tk.Frame):
             components.extend(mapping['components'])
             wires.extend(mapping['wires'])
 
+    def _show_load_progress(self, done, total):
+        """Show parsing progress while a long log is being loaded"""
+        percent = 100 * done // total if total else 100
+        self.instr_info_label.config(text=f'Loading log... {percent}%')
+        self.instr_info_label.update_idletasks()
+
     def load_log(self):
         """Load and parse the log file"""
-        success = self.parser.parse()
+        success = self.parser.parse(progress=self._show_load_progress)
+        self.history = StateHistory(self.parser)
         if success:
             self.current_cycle = 0
             self.update_display()
@@ -401,6 +538,70 @@ class ProcessorView(tk.Frame):
             self.instr_info_label.config(text='Error: Could not load log file')
             return False
 
+    def start_live(self, runner, on_finished=None):
+        """
+        Show a simulation while it runs: cycles from runner.queue are appended to the
+        parser as they arrive, so stepping and Run work before the simulation ends.
+        on_finished(runner) is called on the Tk thread when the run is over.
+        """
+        self.stop()
+        self.parser.close()
+        self.parser.cycles = []
+        self.parser.instructions = []
+        self.parser.register_updates = {}
+        self.history = StateHistory(self.parser)
+        self.current_cycle = 0
+        if self.processor_diagram:
+            self.processor_diagram.reset_all()
+        self.cycle_label.config(text='Cycle: 0 / 0')
+        self.instr_info_label.config(text='Simulating...')
+
+        self.live_runner = runner
+        self.on_live_finished = on_finished
+        self.cancel_sim_btn.config(state='normal')
+        self.sim_label.config(text='Simulating: 0 cycles')
+        self.after(LIVE_POLL_MS, self._poll_live)
+
+    def is_live(self):
+        """True while a background simulation is still streaming cycles"""
+        return self.live_runner is not None
+
+    def cancel_live(self):
+        """Stop the background simulation (the cycles received so far stay viewable)"""
+        if self.live_runner is not None:
+            self.live_runner.cancel()
+            self.sim_label.config(text='Cancelling...')
+
+    def _poll_live(self):
+        """Move the queued cycles into the parser and refresh progress"""
+        runner = self.live_runner
+        if runner is None:
+            return
+        had_cycles = self.parser.get_total_cycles() > 0
+        self.parser.cycles.extend(runner.drain(LIVE_BATCH))
+        total = self.parser.get_total_cycles()
+
+        if total and not had_cycles:
+            self.update_display()
+        elif not self.is_running:
+            cycle_data = self.parser.get_cycle_data(self.current_cycle)
+            if cycle_data is not None:
+                self.cycle_label.config(text=f"Cycle: {cycle_data['cycle']} / {total}")
+
+        if not runner.finished:
+            self.sim_label.config(text=f'Simulating: {total} cycles')
+            self.after(LIVE_POLL_MS, self._poll_live)
+            return
+
+        self.live_runner = None
+        self.cancel_sim_btn.config(state='disabled')
+        if runner.error is not None:
+            self.sim_label.config(text=f'Simulation failed: {runner.error}')
+        else:
+            self.sim_label.config(text=f'Simulation ended ({runner.result}): {total} cycles')
+        if self.on_live_finished is not None:
+            self.on_live_finished(runner)
+
     def update_display(self):
         """Update all visual elements based on current cycle"""
         cycle_data = self.parser.get_cycle_data(self.current_cycle)
@@ -440,57 +641,56 @@ class ProcessorView(tk.Frame):
 
         self.instr_info_label.config(text=info_text)
 
-        # Update register file
-        for reg_update in cycle_data['reg_updates']:
-            reg_name, reg_value = reg_update
-            if reg_name in self.reg_labels:
-                self.reg_labels[reg_name].config(
-                    text=f'{reg_name}: {reg_value}',
-                    fg='#6ADA6A',
-                    font=('Courier', 9, 'bold')
-                )
-
-        # Reset non-updated registers to normal color
+        # Update register file with the values after this cycle (from the keyframed history)
+        state = self.history.state_at(self.current_cycle)
+        updated = {name for name, _ in cycle_data['reg_updates']}
         for reg_name, label in self.reg_labels.items():
-            if not any(reg_name == r[0] for r in cycle_data['reg_updates']):
-                current_text = label.cget('text')
-                label.config(fg='#AAAAAA', font=('Courier', 9))
+            shown = (f'{reg_name}: {state.get(reg_name, 0)}', reg_name in updated)
+            if self.reg_shown.get(reg_name) == shown:
+                continue
+            self.reg_shown[reg_name] = shown
+            text, highlighted = shown
+            if highlighted:
+                label.config(text=text, fg='#6ADA6A', font=('Courier', 9, 'bold'))
+            else:
+                label.config(text=text, fg='#AAAAAA', font=('Courier', 9))
 
     def reset(self):
         """Reset to cycle 0"""
         self.stop()
-        self.current_cycle = 0
-
-        # Reset all register displays
-        for reg_name, label in self.reg_labels.items():
-            label.config(text=f'{reg_name}: 0', fg='#AAAAAA', font=('Courier', 9))
 
         # Reset processor diagram
         if self.processor_diagram:
             self.processor_diagram.reset_all()
 
+        self.go_to_cycle(0)
+
+    def go_to_cycle(self, cycle_idx):
+        """Show any cycle (forward or back) without replaying from cycle 0"""
+        total = self.parser.get_total_cycles()
+        if total == 0:
+            return
+        self.current_cycle = max(0, min(cycle_idx, total - 1))
         self.update_display()
 
+    def _go_to_entry(self):
+        """Jump to the cycle index typed in the Go to box"""
+        try:
+            cycle_idx = int(self.goto_entry.get())
+        except ValueError:
+            return
+        self.stop()
+        self.go_to_cycle(cycle_idx)
+
     def step(self):
         """Step forward one cycle"""
         if self.current_cycle < self.parser.get_total_cycles() - 1:
-            self.current_cycle += 1
-            self.update_display()
+            self.go_to_cycle(self.current_cycle + 1)
 
     def step_back(self):
         """Step back one cycle"""
         if self.current_cycle > 0:
-            self.current_cycle -= 1
-            # Need to recalculate register state up to this point
-            self.reset()
-            for i in range(self.current_cycle + 1):
-                cycle_data = self.parser.get_cycle_data(i)
-                if cycle_data:
-                    for reg_update in cycle_data['reg_updates']:
-                        reg_name, reg_value = reg_update
-                        if reg_name in self.reg_labels:
-                            self.reg_labels[reg_name].config(text=f'{reg_name}: {reg_value}')
-            self.update_display()
+            self.go_to_cycle(self.current_cycle - 1)
 
     def run(self):
         """Run through all cycles automatically"""
@@ -498,14 +698,32 @@ class ProcessorView(tk.Frame):
             self.is_running = True
             self.run_btn.config(state='disabled')
             self.stop_btn.config(state='normal')
+            self.last_frame_time = None
             self._run_cycle()
 
     def _run_cycle(self):
-        """Internal method to run one cycle in animation"""
-        if self.is_running and self.current_cycle < self.parser.get_total_cycles() - 1:
-            self.current_cycle += 1
-            self.update_display()
+        """
+        Internal method to run one cycle in animation.
+        If drawing a frame takes longer than animation_speed, the cycles the timer
+        has already passed are skipped so the animation keeps up instead of lagging.
+        """
+        if (self.is_running and self.live_runner is not None
+                and self.current_cycle >= self.parser.get_total_cycles() - 1):
+            # Caught up with a simulation that is still running: wait for more cycles
+            self.last_frame_time = None
             self.after(self.animation_speed, self._run_cycle)
+        elif self.is_running and self.current_cycle < self.parser.get_total_cycles() - 1:
+            start = time.perf_counter()
+            frames = 1
+            if self.last_frame_time is not None:
+                elapsed_ms = (start - self.last_frame_time) * 1000
+                frames = max(1, round(elapsed_ms / self.animation_speed))
+            self.last_frame_time = start
+
+            self.go_to_cycle(self.current_cycle + frames)
+
+            render_ms = (time.perf_counter() - start) * 1000
+            self.after(max(1, int(self.animation_speed - render_ms)), self._run_cycle)
         else:
             self.stop()
 
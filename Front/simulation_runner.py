@@ -0,0 +1,58 @@
+"""
+Run a simulation on a worker thread and hand its cycles to the GUI through a queue.
+Tk widgets are only touched from the main thread: the view polls the queue with after().
+"""
+
+import queue
+import threading
+
+
+class SimulationRunner:
+    """Runs cpu.ejecutar() in the background; each finished cycle is put on self.queue"""
+
+    def __init__(self, cpu, trace_path, **run_kwargs):
+        """
+        Args:
+            cpu: pipelined CPU with the program already loaded (cargarCodigo)
+            trace_path: binary trace written alongside (read again when the tab is reopened)
+            run_kwargs: passed to cpu.ejecutar() (max_ciclos, modo_eventos, ...)
+        """
+        self.cpu = cpu
+        self.queue = queue.Queue()
+        self.result = None  # cpu.motivo_fin once the run ends
+        self.error = None   # exception raised outside the simulated cycles, if any
+        self.finished = False
+        cpu.activar_traza(trace_path, al_ciclo=self.queue.put)
+        self.thread = threading.Thread(target=self._work, args=(run_kwargs,), daemon=True)
+
+    def _work(self, run_kwargs):
+        try:
+            self.result = self.cpu.ejecutar(**run_kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.queue.put(None)  # end of run
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """Ask the CPU to stop at the start of its next cycle"""
+        self.cpu.detener()
+
+    def is_running(self):
+        return not self.finished
+
+    def drain(self, limit):
+        """Take up to `limit` cycle records without blocking; sets self.finished at the end marker"""
+        records = []
+        while len(records) < limit:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is None:
+                self.finished = True
+                break
+            records.append(record)
+        return records
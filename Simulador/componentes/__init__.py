@@ -2,16 +2,36 @@
 
 from .alu import ALU
 from .registros import BancoRegistros
-from .memoria import Memoria
+from .memoria import Memoria, MemoriaInstrucciones
 from .mux import MUX
 from .signextender import SignExtender
 from .registro_pipline import RegistroPipeline
+from .traductor import CacheBloques
+from .traza import EscritorTraza, LectorTraza, ciclo_desde_registro
+from .checkpoint import escribir_checkpoint, leer_checkpoint
+from .predictores import (PredictorBimodal, PredictorGshare, PredictorTage, PredictorPerceptron,
+                          BufferDestinos, SALTO_BEQ, SALTO_JAL, SALTO_RETORNO)
 
 __all__ = [
     "ALU",
     "BancoRegistros",
     "Memoria",
+    "MemoriaInstrucciones",
     "MUX",
     "SignExtender",
-    "RegistroPipeline"
+    "RegistroPipeline",
+    "CacheBloques",
+    "EscritorTraza",
+    "LectorTraza",
+    "ciclo_desde_registro",
+    "escribir_checkpoint",
+    "leer_checkpoint",
+    "PredictorBimodal",
+    "PredictorGshare",
+    "PredictorTage",
+    "PredictorPerceptron",
+    "BufferDestinos",
+    "SALTO_BEQ",
+    "SALTO_JAL",
+    "SALTO_RETORNO",
 ]
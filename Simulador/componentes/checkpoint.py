@@ -0,0 +1,31 @@
+# Checkpoints en disco del estado completo de un CPU pipeline, para reanudar
+# corridas largas después de una interrupción. El estado es el snapshot() del
+# CPU (registros, memorias, etapas, contadores...); se guarda con
+# pickle detrás de una cabecera con versión, escribiendo primero a un archivo
+# temporal para que un corte a mitad de escritura no deje un checkpoint roto.
+
+import os
+import pickle
+
+MAGIA = b'RVCK'
+VERSION = 1
+
+
+def escribir_checkpoint(ruta, estado):
+    temporal = ruta + ".tmp"
+    with open(temporal, 'wb') as f:
+        f.write(MAGIA)
+        pickle.dump((VERSION, estado), f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def leer_checkpoint(ruta):
+    with open(ruta, 'rb') as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un checkpoint del simulador")
+        version, estado = pickle.load(f)
+    if version != VERSION:
+        raise ValueError(f"Checkpoint {ruta} con versión {version} (se esperaba {VERSION})")
+    return estado
@@ -1,11 +1,18 @@
+from array import array
+import sys
+
+
 class Memoria:
     def __init__(self, size):
         self.data = [0] * size  # puede almacenar ints o strings (instrucciones)
+        self.al_escribir = None  # callback(direccion) opcional, p. ej. para invalidar caches
 
     def escribir(self, direccion, valor):
         """Guarda un valor en una dirección de memoria."""
         if 0 <= direccion < len(self.data):
             self.data[direccion] = valor
+            if self.al_escribir is not None:
+                self.al_escribir(direccion)
         else:
             raise IndexError("Dirección de memoria fuera de rango")
 
@@ -22,3 +29,57 @@ class Memoria:
         for i in range(inicio, min(fin, len(self.data))):
             print(f"[{i:03d}] -> {self.data[i]}")
         print("================")
+
+
+class MemoriaInstrucciones:
+    """
+    Memoria de instrucciones con palabras RV32I de 32 bits en un array('I').
+    Misma interfaz que Memoria (leer/escribir por índice de palabra), pero
+    compacta y cargable directamente desde una imagen binaria little-endian.
+    """
+    def __init__(self, size):
+        self.data = array('I', [0]) * size
+
+    def escribir(self, direccion, valor):
+        """Guarda una palabra de 32 bits en una dirección (índice de palabra)."""
+        if 0 <= direccion < len(self.data):
+            self.data[direccion] = valor & 0xFFFFFFFF
+        else:
+            raise IndexError("Dirección de memoria fuera de rango")
+
+    def leer(self, direccion):
+        """Lee la palabra de 32 bits de una dirección (índice de palabra)."""
+        if 0 <= direccion < len(self.data):
+            return self.data[direccion]
+        else:
+            raise IndexError("Dirección de memoria fuera de rango")
+
+    def cargar_programa(self, palabras):
+        """Carga una lista de palabras desde la dirección 0, ampliando la memoria si hace falta."""
+        palabras = array('I', palabras)
+        faltan = len(palabras) - len(self.data)
+        if faltan > 0:
+            self.data.extend(array('I', [0]) * faltan)
+        self.data[:len(palabras)] = palabras
+
+    def cargar_imagen(self, imagen):
+        """Reemplaza el contenido con una imagen binaria (little-endian, 4 bytes por instrucción)."""
+        palabras = array('I')
+        palabras.frombytes(bytes(imagen))
+        if sys.byteorder == 'big':
+            palabras.byteswap()
+        self.data = palabras
+
+    def imagen(self):
+        """Retorna el contenido como bytes little-endian (hashable y comparable)."""
+        palabras = array('I', self.data)
+        if sys.byteorder == 'big':
+            palabras.byteswap()
+        return palabras.tobytes()
+
+    def mostrar(self, inicio=0, fin=16):
+        """Muestra un rango de direcciones de memoria."""
+        print("=== MEMORIA DE INSTRUCCIONES ===")
+        for i in range(inicio, min(fin, len(self.data))):
+            print(f"[{i:03d}] -> 0x{self.data[i]:08x}")
+        print("================")
@@ -0,0 +1,350 @@
+# Tablas de predicción de saltos para las estrategias dinámicas de
+# BranchPredictor (cpuPipelineConPredicciondeSaltos.py). Cada tabla tiene la
+# misma interfaz: predecir(pc, historia) -> bool, actualizar(pc, historia, tomado),
+# bits() (almacenamiento que ocupa en hardware) y snapshot()/restore(). La
+# historia global (un bit por branch, el más reciente en el bit 0) la lleva
+# BranchPredictor con el largo que pide cada tabla en bits_historia; las tablas
+# que no la usan (bits_historia = 0) la ignoran. BufferDestinos (BTB) no
+# predice direcciones: guarda el destino de los saltos tomados para que Fetch
+# redirija sin esperar a Decode.
+
+from array import array
+
+
+def _potencia_de_dos(entradas, nombre):
+    if entradas < 1 or entradas & (entradas - 1):
+        raise ValueError(f"{nombre} debe ser una potencia de 2 (se pidió {entradas})")
+    return entradas
+
+
+class PredictorBimodal:
+    """
+    Tabla de historia de saltos (BHT) indexada por los bits bajos del PC, con
+    un contador saturado de 2 bits por entrada: 0-1 predicen no tomado, 2-3
+    tomado. Arranca en 2 (débilmente tomado), así un salto nuevo se predice
+    como con 'always_taken' y un lazo falla solo a la salida.
+    """
+    bits_historia = 0
+
+    def __init__(self, entradas=1024):
+        self.entradas = _potencia_de_dos(entradas, "bht_size")
+        self.mascara = entradas - 1
+        self.contadores = array('B', [2]) * entradas
+
+    def indice(self, pc, historia):
+        return (pc >> 2) & self.mascara
+
+    def predecir(self, pc, historia):
+        return self.contadores[self.indice(pc, historia)] >= 2
+
+    def actualizar(self, pc, historia, tomado):
+        i = self.indice(pc, historia)
+        c = self.contadores[i]
+        if tomado:
+            if c < 3:
+                self.contadores[i] = c + 1
+        elif c > 0:
+            self.contadores[i] = c - 1
+
+    def bits(self):
+        return 2 * self.entradas
+
+    def snapshot(self):
+        return {'contadores': self.contadores.tolist()}
+
+    def restore(self, estado):
+        self.contadores = array('B', estado['contadores'])
+        self.entradas = len(self.contadores)
+        self.mascara = self.entradas - 1
+
+
+class PredictorGshare(PredictorBimodal):
+    """
+    gshare: la misma tabla de contadores de 2 bits, pero indexada con el PC XOR
+    la historia global. Un mismo branch usa contadores distintos según cómo
+    salieron los branches anteriores, así aprende saltos correlacionados (p. ej.
+    el lazo interno que siempre sale en la misma iteración del externo).
+    """
+    def __init__(self, entradas=1024, bits_historia=10):
+        super().__init__(entradas)
+        self.bits_historia = bits_historia
+
+    def indice(self, pc, historia):
+        return ((pc >> 2) ^ historia) & self.mascara
+
+
+def _plegar(historia, largo, bits):
+    """
+    Los últimos 'largo' bits de la historia, plegados en 'bits' bits de a
+    trozos. El acumulado se multiplica por 3 antes de sumar cada trozo: con un
+    XOR simple, una historia periódica cuyo período es múltiplo de 'bits' se
+    cancela y muchos contextos distintos caen en la misma entrada.
+    """
+    historia &= (1 << largo) - 1
+    mascara = (1 << bits) - 1
+    plegada = 0
+    while historia:
+        plegada = ((plegada << 1) + plegada + (historia & mascara)) & mascara
+        historia >>= bits
+    return plegada
+
+
+class PredictorTage:
+    """
+    TAGE reducido: una tabla base bimodal y 'tablas' tablas con tag, cada una
+    indexada con el PC y una historia global más larga que la anterior (largos
+    en progresión geométrica entre historia_min e historia_max). Cada entrada
+    con tag tiene un contador de 3 bits (tomado si >= 4), el tag y 2 bits de
+    utilidad.
+
+    Predice la tabla de historia más larga cuyo tag coincide (la proveedora) o,
+    si ninguna coincide, la base. Al fallar se reserva una entrada en una tabla
+    de historia más larga que la proveedora cuya utilidad esté en 0; si no hay,
+    se les baja la utilidad. La utilidad sube cuando la proveedora acierta y la
+    predicción alternativa (la siguiente tabla que coincide, o la base) no, y
+    cada 'periodo_utilidad' actualizaciones se divide a la mitad.
+
+    El tamaño sale de presupuesto_bits: las tablas con tag se reparten hasta
+    tres cuartos y la base se queda con lo que sobra (siempre la mayor potencia
+    de 2 de entradas que entra). bits() devuelve lo que realmente se usó.
+    """
+    BITS_CONTADOR = 3
+    BITS_UTILIDAD = 2
+
+    def __init__(self, presupuesto_bits=8192, tablas=4, bits_tag=8, historia_min=4, historia_max=64,
+                 periodo_utilidad=4096):
+        if tablas < 1 or historia_min < 1 or historia_max < historia_min or not 2 <= bits_tag <= 16:
+            raise ValueError("TAGE necesita al menos una tabla con tag, 1 <= historia_min <= historia_max "
+                             "y tags de 2 a 16 bits")
+        por_entrada = self.BITS_CONTADOR + bits_tag + self.BITS_UTILIDAD
+        entradas = self._mayor_potencia(presupuesto_bits * 3 // 4 // tablas // por_entrada)
+        self.entradas_base = self._mayor_potencia((presupuesto_bits - tablas * entradas * por_entrada) // 2)
+        if self.entradas_base < 1 or entradas < 1:
+            raise ValueError(f"tage_budget_bits={presupuesto_bits} no alcanza para {tablas} tablas")
+        self.bits_tag = bits_tag
+        self.bits_indice = entradas.bit_length() - 1
+        self.entradas = entradas
+        self.periodo_utilidad = periodo_utilidad
+        if tablas > 1:
+            razon = (historia_max / historia_min) ** (1 / (tablas - 1))
+            self.largos = [int(historia_min * razon ** i + 0.5) for i in range(tablas)]
+        else:
+            self.largos = [historia_max]
+        self.bits_historia = self.largos[-1]
+        self.base = array('B', [2]) * self.entradas_base
+        self.contadores = [array('B', [4]) * entradas for _ in range(tablas)]
+        self.tags = [array('H', [0]) * entradas for _ in range(tablas)]
+        self.utilidad = [array('B', [0]) * entradas for _ in range(tablas)]
+        self.actualizaciones = 0
+
+    @staticmethod
+    def _mayor_potencia(n):
+        return 1 << (n.bit_length() - 1) if n >= 1 else 0
+
+    def _buscar(self, pc, historia):
+        """(índice y tag en cada tabla, tablas cuyo tag coincide de la más larga a la más corta)."""
+        pc >>= 2
+        lugares = []
+        coinciden = []
+        for t, largo in enumerate(self.largos):
+            i = (pc ^ (pc >> self.bits_indice) ^ _plegar(historia, largo, self.bits_indice)) & (self.entradas - 1)
+            tag = (pc ^ _plegar(historia, largo, self.bits_tag) ^ (_plegar(historia, largo, self.bits_tag - 1) << 1)) \
+                & ((1 << self.bits_tag) - 1)
+            lugares.append((i, tag))
+            if self.tags[t][i] == tag:
+                coinciden.append(t)
+        coinciden.reverse()
+        return lugares, coinciden
+
+    def _prediccion(self, pc, lugares, tabla):
+        """Predicción de la tabla con tag 'tabla' (None: la base)."""
+        if tabla is None:
+            return self.base[(pc >> 2) & (self.entradas_base - 1)] >= 2
+        return self.contadores[tabla][lugares[tabla][0]] >= 4
+
+    def predecir(self, pc, historia):
+        lugares, coinciden = self._buscar(pc, historia)
+        return self._prediccion(pc, lugares, coinciden[0] if coinciden else None)
+
+    def actualizar(self, pc, historia, tomado):
+        lugares, coinciden = self._buscar(pc, historia)
+        proveedora = coinciden[0] if coinciden else None
+        alternativa = coinciden[1] if len(coinciden) > 1 else None
+        prediccion = self._prediccion(pc, lugares, proveedora)
+
+        if proveedora is None:
+            i = (pc >> 2) & (self.entradas_base - 1)
+            c = self.base[i]
+            self.base[i] = min(c + 1, 3) if tomado else max(c - 1, 0)
+        else:
+            i = lugares[proveedora][0]
+            c = self.contadores[proveedora][i]
+            self.contadores[proveedora][i] = min(c + 1, 7) if tomado else max(c - 1, 0)
+            if prediccion != self._prediccion(pc, lugares, alternativa):
+                u = self.utilidad[proveedora][i]
+                self.utilidad[proveedora][i] = min(u + 1, 3) if prediccion == tomado else max(u - 1, 0)
+
+        if prediccion != tomado:
+            # Reservar en una tabla de historia más larga que la proveedora
+            desde = 0 if proveedora is None else proveedora + 1
+            for t in range(desde, len(self.largos)):
+                i, tag = lugares[t]
+                if self.utilidad[t][i] == 0:
+                    self.tags[t][i] = tag
+                    self.contadores[t][i] = 4 if tomado else 3
+                    break
+            else:
+                for t in range(desde, len(self.largos)):
+                    i = lugares[t][0]
+                    if self.utilidad[t][i]:
+                        self.utilidad[t][i] -= 1
+
+        self.actualizaciones += 1
+        if self.actualizaciones % self.periodo_utilidad == 0:
+            for utilidad in self.utilidad:
+                for i, u in enumerate(utilidad):
+                    if u:
+                        utilidad[i] = u >> 1
+
+    def bits(self):
+        por_entrada = self.BITS_CONTADOR + self.bits_tag + self.BITS_UTILIDAD
+        return 2 * self.entradas_base + len(self.largos) * self.entradas * por_entrada
+
+    def snapshot(self):
+        return {
+            'base': self.base.tolist(),
+            'contadores': [tabla.tolist() for tabla in self.contadores],
+            'tags': [tabla.tolist() for tabla in self.tags],
+            'utilidad': [tabla.tolist() for tabla in self.utilidad],
+            'actualizaciones': self.actualizaciones,
+        }
+
+    def restore(self, estado):
+        self.base = array('B', estado['base'])
+        self.entradas_base = len(self.base)
+        self.contadores = [array('B', tabla) for tabla in estado['contadores']]
+        self.tags = [array('H', tabla) for tabla in estado['tags']]
+        self.utilidad = [array('B', tabla) for tabla in estado['utilidad']]
+        self.actualizaciones = estado['actualizaciones']
+
+
+class PredictorPerceptron:
+    """
+    Predictor de perceptrones: una fila de pesos enteros (sesgo + uno por bit
+    de historia) por entrada, elegida con el PC. La salida es el sesgo más la
+    suma de los pesos, cada uno con signo + si ese branch de la historia se
+    tomó y - si no; predice tomado si la salida es >= 0. Se entrena cuando
+    falla o cuando la salida no pasa el umbral (1.93 * historia + 14), y cada
+    peso se satura en 8 bits. Ve correlaciones con branches lejanos en la
+    historia sin que la tabla crezca con 2^historia, como en gshare.
+    """
+    BITS_PESO = 8
+
+    def __init__(self, entradas=128, bits_historia=24):
+        self.entradas = _potencia_de_dos(entradas, "perceptron_size")
+        if bits_historia < 1:
+            raise ValueError("perceptron_history debe ser al menos 1")
+        self.mascara = entradas - 1
+        self.bits_historia = bits_historia
+        self.umbral = int(1.93 * bits_historia + 14)
+        self.peso_max = (1 << (self.BITS_PESO - 1)) - 1
+        self.pesos = array('h', [0]) * (entradas * (bits_historia + 1))
+
+    def _salida(self, base, historia):
+        pesos = self.pesos
+        y = pesos[base]
+        for k in range(1, self.bits_historia + 1):
+            if historia & 1:
+                y += pesos[base + k]
+            else:
+                y -= pesos[base + k]
+            historia >>= 1
+        return y
+
+    def _fila(self, pc):
+        return ((pc >> 2) & self.mascara) * (self.bits_historia + 1)
+
+    def predecir(self, pc, historia):
+        return self._salida(self._fila(pc), historia) >= 0
+
+    def actualizar(self, pc, historia, tomado):
+        base = self._fila(pc)
+        y = self._salida(base, historia)
+        if (y >= 0) == tomado and abs(y) > self.umbral:
+            return
+        pesos = self.pesos
+        maximo, minimo = self.peso_max, -self.peso_max - 1
+        paso = 1 if tomado else -1
+        pesos[base] = max(minimo, min(maximo, pesos[base] + paso))
+        for k in range(1, self.bits_historia + 1):
+            # Sube el peso si este bit de la historia coincide con el resultado
+            p = pesos[base + k] + (paso if historia & 1 else -paso)
+            pesos[base + k] = maximo if p > maximo else minimo if p < minimo else p
+            historia >>= 1
+
+    def bits(self):
+        return len(self.pesos) * self.BITS_PESO
+
+    def snapshot(self):
+        return {'pesos': self.pesos.tolist()}
+
+    def restore(self, estado):
+        self.pesos = array('h', estado['pesos'])
+
+
+# Tipo de salto guardado en cada entrada de BufferDestinos (0: entrada vacía)
+SALTO_BEQ = 1      # branch condicional: la dirección la decide el predictor
+SALTO_JAL = 2      # salto directo, siempre tomado
+SALTO_RETORNO = 3  # jalr x0: el destino sale de la pila de retornos, no de la entrada
+
+
+class BufferDestinos:
+    """
+    Branch target buffer de mapeo directo, indexado por los bits bajos del PC.
+    Cada entrada guarda el PC completo como tag (no hay alias: un acierto es
+    siempre el mismo salto), su destino y el tipo de salto. Se llena en Store
+    con los saltos que se tomaron.
+    """
+    BITS_DESTINO = 30  # PC alineado a 4 bytes
+    BITS_TIPO = 2
+
+    def __init__(self, entradas=64):
+        self.entradas = _potencia_de_dos(entradas, "btb_size")
+        self.mascara = entradas - 1
+        self.tags = array('l', [-1]) * entradas
+        self.destinos = array('l', [0]) * entradas
+        self.tipos = array('B', [0]) * entradas
+        self.consultas = 0
+        self.aciertos = 0
+
+    def buscar(self, pc):
+        """(tipo, destino) del salto en ese PC, o None si no está."""
+        self.consultas += 1
+        i = (pc >> 2) & self.mascara
+        if self.tags[i] != pc >> 2:
+            return None
+        self.aciertos += 1
+        return self.tipos[i], self.destinos[i]
+
+    def registrar(self, pc, tipo, destino):
+        i = (pc >> 2) & self.mascara
+        self.tags[i] = pc >> 2
+        self.tipos[i] = tipo
+        self.destinos[i] = destino
+
+    def bits(self):
+        bits_tag = self.BITS_DESTINO - (self.entradas.bit_length() - 1)
+        return self.entradas * (1 + bits_tag + self.BITS_DESTINO + self.BITS_TIPO)
+
+    def snapshot(self):
+        return {'tags': self.tags.tolist(), 'destinos': self.destinos.tolist(), 'tipos': self.tipos.tolist(),
+                'consultas': self.consultas, 'aciertos': self.aciertos}
+
+    def restore(self, estado):
+        self.tags = array('l', estado['tags'])
+        self.destinos = array('l', estado['destinos'])
+        self.tipos = array('B', estado['tipos'])
+        self.entradas = len(self.tags)
+        self.mascara = self.entradas - 1
+        self.consultas = estado['consultas']
+        self.aciertos = estado['aciertos']
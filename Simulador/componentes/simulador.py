@@ -1,6 +1,8 @@
 from typing import List, Dict
 from collections import deque
 
+from .traductor import CacheBloques
+
 
 class ProcessorSimulator:
     def __init__(self, code: List[str]):
@@ -18,6 +20,11 @@ class ProcessorSimulator:
 
         self._find_labels()
 
+        # Cache de bloques traducidos para run(bloques=True)
+        self.cache_bloques = CacheBloques(
+            self._leer_instruccion, self._traducir_instruccion,
+            {"r": self.registers, "mem": self.memory, "hist": self.ultimos4instrucciones.append})
+
 
     # ----------------------------------------------------
     # Limpia comentarios y líneas vacías
@@ -49,16 +56,127 @@ class ProcessorSimulator:
     # ----------------------------------------------------
     # Ejecuta el programa completo
     # ----------------------------------------------------
-    def run(self):
-        while self.PC < len(self.code):
-            line = self.code[self.PC]
-            print(f"[PC={self.PC}] Ejecutando → {line}")
-            self.execute(line)
+    def run(self, bloques=False):
+        if bloques:
+            self.run_bloques()
+        else:
+            while self.PC < len(self.code):
+                line = self.code[self.PC]
+                print(f"[PC={self.PC}] Ejecutando → {line}")
+                self.execute(line)
 
         print("\nÚltimas 4 instrucciones ejecutadas:")
         print(list(self.ultimos4instrucciones))
 
 
+    # ----------------------------------------------------
+    # Ejecuta por bloques básicos traducidos (sin prints por paso)
+    # ----------------------------------------------------
+    def run_bloques(self):
+        ejecutadas = 0
+        obtener = self.cache_bloques.obtener
+        while self.PC < len(self.code):
+            bloque = obtener(self.PC)
+            if bloque is None:
+                # No traducible: se ejecuta igual que en run()
+                self.execute(self.code[self.PC])
+                ejecutadas += 1
+            else:
+                self.PC = bloque[0]()
+                ejecutadas += bloque[1]
+        return ejecutadas
+
+
+    # ----------------------------------------------------
+    # Reescribe una instrucción (invalida los bloques que la contienen)
+    # ----------------------------------------------------
+    def escribir_instruccion(self, indice: int, line: str):
+        self.code[indice] = line
+        self.cache_bloques.invalidar(indice)
+
+
+    def _leer_instruccion(self, pc):
+        return self.code[pc] if 0 <= pc < len(self.code) else None
+
+
+    # ----------------------------------------------------
+    # Traduce una instrucción a líneas Python para CacheBloques
+    # (None si no se puede: la resuelve execute())
+    # ----------------------------------------------------
+    def _traducir_instruccion(self, pc, line):
+        parts = line.replace(",", "").split()
+        instr = parts[0]
+        args = parts[1:]
+        labels = self.labels
+        siguiente = pc + 1
+
+        try:
+            if instr in ("addi", "add", "sub"):
+                rd, rs1 = self.reg(args[0]), self.reg(args[1])
+                if instr == "addi":
+                    imm = int(args[2])
+                    regs, expr, nombre = (rd, rs1), f"r[{rs1}] + {imm}", f"addi x{rd} x{rs1} {imm}"
+                else:
+                    rs2 = self.reg(args[2])
+                    op = "+" if instr == "add" else "-"
+                    regs, expr, nombre = (rd, rs1, rs2), f"r[{rs1}] {op} r[{rs2}]", f"{instr} x{rd} x{rs1} x{rs2}"
+                lineas = [] if rd == 0 else [f"r[{rd}] = {expr}"]
+                salto = False
+
+            elif instr in ("lw", "sw"):
+                reg = self.reg(args[0])
+                offset, rs1 = self._parse_offset(args[1])
+                regs = (reg, rs1)
+                if instr == "lw":
+                    lineas = [] if reg == 0 else [f"r[{reg}] = mem.get(r[{rs1}] + {offset}, 0)"]
+                    nombre = f"lw x{reg} {offset}(x{rs1})"
+                else:
+                    lineas = [f"mem[r[{rs1}] + {offset}] = r[{reg}]"]
+                    nombre = f"sw x{reg} {offset}(x{rs1})"
+                salto = False
+
+            elif instr == "la":
+                rd, label = self.reg(args[0]), args[1]
+                regs = (rd,)
+                lineas = [] if rd == 0 else [f"r[{rd}] = {labels.get(label, 0)}"]
+                nombre, salto = f"la x{rd} {label}", False
+
+            elif instr in ("blt", "beq"):
+                rs1, rs2, label = self.reg(args[0]), self.reg(args[1]), args[2]
+                if label not in labels:
+                    return None
+                regs = (rs1, rs2)
+                comparacion = "<" if instr == "blt" else "=="
+                nombre = f"{instr} x{rs1} x{rs2} {label}"
+                lineas = [f"hist({nombre!r})",
+                          f"return {labels[label]} if r[{rs1}] {comparacion} r[{rs2}] else {siguiente}"]
+                salto = True
+
+            elif instr == "jal":
+                rd, label = self.reg(args[0]), args[1]
+                if label not in labels:
+                    return None
+                regs = (rd,)
+                nombre = f"jal x{rd} {label}"
+                lineas = [] if rd == 0 else [f"r[{rd}] = {siguiente}"]
+                lineas += [f"hist({nombre!r})", f"return {labels[label]}"]
+                salto = True
+
+            elif instr == "nop":
+                regs, lineas, nombre, salto = (), [], "nop", False
+
+            else:
+                return None
+        except (ValueError, IndexError):
+            return None
+
+        if not all(0 <= x < len(self.registers) for x in regs):
+            return None
+        if not salto:
+            lineas.append(f"hist({nombre!r})")
+        return lineas, salto
+
+
     # ----------------------------------------------------
     # Registrar última instrucción ejecutada
     # ----------------------------------------------------
@@ -246,5 +364,6 @@ riscv_code = [
 
 
 
-claseProc = ProcessorSimulator(riscv_code)
-claseProc.run()
\ No newline at end of file
+if __name__ == "__main__":
+    claseProc = ProcessorSimulator(riscv_code)
+    claseProc.run()
\ No newline at end of file
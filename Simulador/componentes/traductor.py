@@ -0,0 +1,81 @@
+class CacheBloques:
+    """
+    Traducción dinámica por bloques básicos.
+    Un bloque empieza en un PC y sigue en línea recta hasta el primer salto
+    (inclusive), el fin del código o una instrucción que no se puede traducir.
+    Cada bloque se genera como código fuente Python, se compila con compile()
+    una sola vez y queda en cache indexado por su PC de inicio.
+
+    El simulador provee:
+      - leer(pc): texto de la instrucción en pc (None/"" si no hay)
+      - traducir(pc, texto): (lineas, es_salto) o None si no se puede traducir.
+        'lineas' son sentencias Python que usan los nombres de 'entorno'; si
+        es_salto es True deben terminar con un 'return <pc siguiente>'.
+      - entorno: nombres que usan las líneas generadas (registros, memoria, ...)
+    """
+    def __init__(self, leer, traducir, entorno, max_instrucciones=64):
+        self.leer = leer
+        self.traducir = traducir
+        self.entorno = entorno
+        self.max_instrucciones = max_instrucciones
+        self.bloques = {}      # pc inicio -> (funcion, n_instrucciones)
+        self.cubiertos = {}    # pc -> set de pcs de inicio de bloques que lo contienen
+        self.traducciones = 0
+
+    def obtener(self, pc):
+        """Retorna (funcion, n_instrucciones) del bloque en pc, o None si no es traducible."""
+        bloque = self.bloques.get(pc)
+        if bloque is None:
+            bloque = self._traducir_bloque(pc)
+        return bloque
+
+    def _traducir_bloque(self, inicio):
+        cuerpo = []
+        pc = inicio
+        salto = False
+        while pc - inicio < self.max_instrucciones:
+            try:
+                texto = self.leer(pc)
+            except IndexError:
+                break
+            if not texto:
+                break
+            traduccion = self.traducir(pc, texto)
+            if traduccion is None:
+                break
+            lineas, salto = traduccion
+            cuerpo.extend(lineas)
+            pc += 1
+            if salto:
+                break
+        n = pc - inicio
+        if n == 0:
+            return None
+        if not salto:
+            cuerpo.append(f"return {pc}")
+
+        parametros = ", ".join(f"{nombre}={nombre}" for nombre in self.entorno)
+        fuente = f"def _bloque({parametros}):\n" + "".join(f"    {linea}\n" for linea in cuerpo)
+        espacio = dict(self.entorno)
+        exec(compile(fuente, f"<bloque pc={inicio}>", "exec"), espacio)
+
+        bloque = (espacio["_bloque"], n)
+        self.bloques[inicio] = bloque
+        for p in range(inicio, pc):
+            self.cubiertos.setdefault(p, set()).add(inicio)
+        self.traducciones += 1
+        return bloque
+
+    def invalidar(self, pc=None):
+        """Descarta los bloques que contienen 'pc' (o todos si pc es None)."""
+        if pc is None:
+            self.bloques.clear()
+            self.cubiertos.clear()
+            return
+        for inicio in self.cubiertos.pop(pc, ()):
+            bloque = self.bloques.pop(inicio, None)
+            if bloque is None:
+                continue
+            for p in range(inicio, inicio + bloque[1]):
+                if p != pc and p in self.cubiertos:
+                    self.cubiertos[p].discard(inicio)
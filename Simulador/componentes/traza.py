@@ -0,0 +1,254 @@
+# Traza binaria por ciclo: un registro de tamaño fijo (struct) por ciclo con el
+# estado del pipeline y los eventos de ese ciclo. Ocupa una fracción del log de
+# texto y se lee con mmap sin parsear (Front, scripts de análisis).
+#
+# Formato (little-endian):
+#   cabecera  : CABECERA
+#   registros : n_registros * REGISTRO
+#   tabla     : u32 cantidad, y por cada instrucción u16 largo + texto utf-8
+# El id de una instrucción es su índice en la tabla (SIN_INSTRUCCION = vacío).
+
+import mmap
+import struct
+
+MAGIA = b'RVTZ'
+VERSION = 1
+N_ETAPAS = 5
+NOMBRES_ETAPAS = ('Fetch', 'Decode', 'RegFile', 'Execute', 'Store')  # como en mostrar_estado_pipeline
+
+# magia, versión, n_etapas, tamaño de registro, n_registros, offset de la tabla
+CABECERA = struct.Struct('<4sHHIII')
+
+# ciclo, pc, etapas ocupadas (bits), etapas con instrucción (bits),
+# ids por etapa (5), ciclos restantes por etapa (5), id completada, eventos,
+# rd escrito, valor registro, dirección memoria, valor memoria, destino salto
+REGISTRO = struct.Struct('<IIBB5H5HHBBqiqi')
+
+SIN_INSTRUCCION = 0xFFFF
+SIN_REGISTRO = 0xFF
+
+# Bits del campo 'eventos'
+EV_COMPLETADA = 1 << 0
+EV_ESCRITURA_REG = 1 << 1
+EV_ESCRITURA_MEM = 1 << 2
+EV_SALTO = 1 << 3
+EV_SALTO_TOMADO = 1 << 4
+EV_FLUSH = 1 << 5
+
+_MASCARA_64 = (1 << 64) - 1
+
+
+def _a_64(valor):
+    """Ajusta un entero de Python al rango de un int64 (complemento a 2)."""
+    valor &= _MASCARA_64
+    return valor - (1 << 64) if valor >> 63 else valor
+
+
+def _a_32(valor):
+    valor &= 0xFFFFFFFF
+    return valor - (1 << 32) if valor >> 31 else valor
+
+
+def ciclo_desde_registro(r, texto):
+    """
+    Convierte un registro (tupla o lista con el orden de REGISTRO) al dict que usa
+    LogParser en Front (cycle, pc, stages, completed, reg_updates). texto(id) da el
+    texto de una instrucción.
+    """
+    ocupadas, ids, restantes, eventos = r[2], r[4:9], r[9:14], r[15]
+    stages = {}
+    for k, nombre in enumerate(NOMBRES_ETAPAS):
+        if ocupadas & (1 << k):
+            stages[nombre] = f"Procesando: {texto(ids[k])} ({restantes[k]} ciclos restantes)"
+        else:
+            stages[nombre] = "Libre"
+    reg_updates = []
+    if eventos & EV_ESCRITURA_REG:
+        reg_updates.append((f"x{r[16]}", r[17]))
+    if eventos & EV_ESCRITURA_MEM:
+        reg_updates.append((f"Mem[{r[18]}]", r[19]))
+    if eventos & EV_SALTO:
+        tomado = "tomado" if eventos & EV_SALTO_TOMADO else "no tomado"
+        flush = ", flush" if eventos & EV_FLUSH else ""
+        reg_updates.append(("Salto", f"{tomado} -> {r[20]}{flush}"))
+    return {
+        'cycle': r[0],
+        'pc': r[1],
+        'stages': stages,
+        'completed': texto(r[14]) if eventos & EV_COMPLETADA else None,
+        'reg_updates': reg_updates,
+    }
+
+
+class EscritorTraza:
+    """
+    Escribe la traza binaria. El CPU llama ciclo() con el estado antes de cada
+    tick y, durante el tick, los métodos de eventos (completada, escritura_*,
+    salto); el registro se cierra al comenzar el siguiente ciclo o en cerrar().
+    Si se da al_ciclo, se llama con cada registro cerrado ya convertido con
+    ciclo_desde_registro (p. ej. para mandarlo a una cola y verlo en vivo).
+    """
+    def __init__(self, ruta, registros_por_bloque=4096, al_ciclo=None):
+        self.ruta = ruta
+        self.archivo = open(ruta, 'wb')
+        self.archivo.write(CABECERA.pack(MAGIA, VERSION, N_ETAPAS, REGISTRO.size, 0, 0))
+        self.ids = {}          # texto de instrucción -> id
+        self.textos = []
+        self.n_registros = 0
+        self.buffer = bytearray(REGISTRO.size * registros_por_bloque)
+        self.en_buffer = 0
+        self.max_en_buffer = registros_por_bloque
+        self.actual = None
+        self.al_ciclo = al_ciclo
+
+    def _id(self, instr):
+        if instr == "":
+            return SIN_INSTRUCCION
+        texto = str(instr)
+        ident = self.ids.get(texto)
+        if ident is None:
+            ident = len(self.textos)
+            if ident >= SIN_INSTRUCCION:
+                raise OverflowError("Demasiadas instrucciones distintas para la traza")
+            self.ids[texto] = ident
+            self.textos.append(texto)
+        return ident
+
+    def texto(self, ident):
+        if ident == SIN_INSTRUCCION:
+            return ""
+        return self.textos[ident]
+
+    def ciclo(self, ciclo, pc, etapas):
+        """Comienza el registro del ciclo con el estado de las etapas (orden Fetch..Store)."""
+        if self.actual is not None:
+            self._volcar()
+        ocupadas = con_instruccion = 0
+        ids = []
+        restantes = []
+        for i, etapa in enumerate(etapas):
+            instr = etapa.instruccionEjecutando
+            if etapa.ocupada:
+                ocupadas |= 1 << i
+            if instr != "":
+                con_instruccion |= 1 << i
+            ids.append(self._id(instr))
+            restantes.append(min(etapa.ciclos_restantes, 0xFFFF))
+        # [ciclo, pc, ocupadas, con_instr, *ids, *restantes, completada, eventos, rd, vreg, dir, vmem, destino]
+        self.actual = [ciclo, pc, ocupadas, con_instruccion, *ids, *restantes,
+                       SIN_INSTRUCCION, 0, SIN_REGISTRO, 0, 0, 0, 0]
+
+    def completada(self, instr):
+        if self.actual is not None:
+            self.actual[14] = self._id(instr)
+            self.actual[15] |= EV_COMPLETADA
+
+    def escritura_registro(self, rd, valor):
+        if self.actual is not None:
+            self.actual[15] |= EV_ESCRITURA_REG
+            self.actual[16] = rd
+            self.actual[17] = _a_64(valor)
+
+    def escritura_memoria(self, direccion, valor):
+        if self.actual is not None:
+            self.actual[15] |= EV_ESCRITURA_MEM
+            self.actual[18] = _a_32(direccion)
+            self.actual[19] = _a_64(valor)
+
+    def salto(self, tomado, destino, flush):
+        if self.actual is not None:
+            self.actual[15] |= EV_SALTO | (EV_SALTO_TOMADO if tomado else 0) | (EV_FLUSH if flush else 0)
+            self.actual[20] = _a_32(destino) if destino is not None else 0
+
+    def _volcar(self):
+        if self.al_ciclo is not None:
+            self.al_ciclo(ciclo_desde_registro(self.actual, self.texto))
+        REGISTRO.pack_into(self.buffer, self.en_buffer * REGISTRO.size, *self.actual)
+        self.actual = None
+        self.en_buffer += 1
+        self.n_registros += 1
+        if self.en_buffer == self.max_en_buffer:
+            self.archivo.write(self.buffer)
+            self.en_buffer = 0
+
+    def cerrar(self):
+        """Escribe lo pendiente, la tabla de instrucciones y completa la cabecera."""
+        if self.archivo.closed:
+            return
+        if self.actual is not None:
+            self._volcar()
+        self.archivo.write(memoryview(self.buffer)[:self.en_buffer * REGISTRO.size])
+        offset_tabla = self.archivo.tell()
+        self.archivo.write(struct.pack('<I', len(self.textos)))
+        for texto in self.textos:
+            datos = texto.encode('utf-8')
+            self.archivo.write(struct.pack('<H', len(datos)))
+            self.archivo.write(datos)
+        self.archivo.seek(0)
+        self.archivo.write(CABECERA.pack(MAGIA, VERSION, N_ETAPAS, REGISTRO.size,
+                                         self.n_registros, offset_tabla))
+        self.archivo.close()
+
+
+class LectorTraza:
+    """
+    Lee una traza binaria con mmap; los registros se decodifican solo cuando se
+    piden. Si la traza no se cerró (simulación interrumpida) se leen los
+    registros completos que haya, sin tabla de instrucciones.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.archivo = open(ruta, 'rb')
+        self.mm = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, version, n_etapas, tam, n_registros, offset_tabla = CABECERA.unpack_from(self.mm, 0)
+        if magia != MAGIA or version != VERSION or n_etapas != N_ETAPAS or tam != REGISTRO.size:
+            self.cerrar()
+            raise ValueError(f"{ruta} no es una traza válida (versión {VERSION})")
+        if offset_tabla == 0:
+            n_registros = (len(self.mm) - CABECERA.size) // REGISTRO.size
+        self.n_registros = n_registros
+        self.instrucciones = self._leer_tabla(offset_tabla) if offset_tabla else []
+
+    def _leer_tabla(self, offset):
+        (cantidad,) = struct.unpack_from('<I', self.mm, offset)
+        offset += 4
+        textos = []
+        for _ in range(cantidad):
+            (largo,) = struct.unpack_from('<H', self.mm, offset)
+            offset += 2
+            textos.append(self.mm[offset:offset + largo].decode('utf-8'))
+            offset += largo
+        return textos
+
+    def __len__(self):
+        return self.n_registros
+
+    def registro(self, i):
+        """Tupla cruda del registro i (ver REGISTRO)."""
+        if not 0 <= i < self.n_registros:
+            raise IndexError(i)
+        return REGISTRO.unpack_from(self.mm, CABECERA.size + i * REGISTRO.size)
+
+    def registros(self):
+        """Itera todos los registros (tuplas crudas) sin copiar el archivo."""
+        fin = CABECERA.size + self.n_registros * REGISTRO.size
+        return REGISTRO.iter_unpack(memoryview(self.mm)[CABECERA.size:fin])
+
+    def texto(self, ident):
+        if ident == SIN_INSTRUCCION or ident >= len(self.instrucciones):
+            return ""
+        return self.instrucciones[ident]
+
+    def ciclo(self, i):
+        """Registro i con el mismo formato que LogParser en Front (cycle, pc, stages, completed, reg_updates)."""
+        return ciclo_desde_registro(self.registro(i), self.texto)
+
+    def cerrar(self):
+        self.mm.close()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
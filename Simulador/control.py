@@ -84,6 +84,16 @@ class UnidadControl:
                 "Branch": 1     # salto incondicional
             })
 
+        # -------------------------
+        # JALR (salto a rs1 + imm con link)
+        # -------------------------
+        elif opcode == "jalr":
+            self.control.update({
+                "RegWrite": 1,  # rd recibe return address
+                "ALUSrc": 1,    # destino = rs1 + imm
+                "Branch": 1
+            })
+
         # -------------------------
         # LA (pseudo-instrucción)
         # No usa señales de CPU porque se ejecuta por software
@@ -1,10 +1,16 @@
-from componentes import ALU, BancoRegistros, Memoria, SignExtender, MUX
+from componentes import ALU, BancoRegistros, Memoria, SignExtender, MUX, CacheBloques
 from control import UnidadControl
+from pipelineEtapas.bitacora import Bitacora, SalidaArchivo, NIVEL_RESUMEN, NIVEL_COMMIT, NIVEL_CICLO
 import os
 from pathlib import Path
 
+def _delegar():
+    """Handler de la tabla rápida para instrucciones que resuelve ejecutar_ciclo."""
+    raise LookupError("delegar a ejecutar_ciclo")
+
+
 class CPU:
-    def __init__(self):
+    def __init__(self, bitacora=None):
         # Componentes
         self.mem_inst = Memoria(64)
         self.mem_data = Memoria(256)
@@ -16,17 +22,23 @@ class CPU:
         self.labels = {}
         self.data_pointer = 0  # apunta dentro de memoria de datos
 
+        # Cache de bloques traducidos (modo bloques); se invalida al escribir mem_inst
+        self.cache_bloques = CacheBloques(
+            self.mem_inst.leer, self._traducir_instruccion,
+            {"r": self.regs.reg, "m": self.mem_data.data, "n_mem": len(self.mem_data.data)})
+        self.mem_inst.al_escribir = self.cache_bloques.invalidar
 
-        # Log
-        self.log_file = open("log.txt", "w", encoding="utf-8")
-        self.log_file.write("=== LOG DE EJECUCIÓN DEL CPU ===\n")
+        # Log (por defecto todos los niveles a log.txt)
+        self.bitacora = bitacora if bitacora is not None else Bitacora(NIVEL_CICLO, [SalidaArchivo("log.txt")])
+        self.log(NIVEL_RESUMEN, "=== LOG DE EJECUCIÓN DEL CPU ===")
 
-    def log(self, mensaje):
-        self.log_file.write(mensaje + "\n")
+    def log(self, nivel, mensaje, *args):
+        self.bitacora.log(nivel, mensaje, *args)
 
     def ejecutar(self, codigo):
         self.PC = 0
         self.mem_inst.data = [None] * len(self.mem_inst.data)
+        self.cache_bloques.invalidar()
         self.labels = {}
         self.data_pointer = 0
 
@@ -92,20 +104,20 @@ class CPU:
             self.mem_inst.escribir(write_index, line)
             write_index += 1
 
-        self.log(f"{write_index} instrucciones cargadas")
-        self.log(f"Labels detectados: {self.labels}")
+        self.log(NIVEL_RESUMEN, "{} instrucciones cargadas", write_index)
+        self.log(NIVEL_RESUMEN, "Labels detectados: {}", self.labels)
 
 
     def guardar_memoria_en_archivo(self, ruta):
         with open(ruta, "w", encoding="utf-8") as f:
             for i, valor in enumerate(self.mem_data.data):
                 f.write(f"[{i:03d}] -> {valor}\n")
-        self.log(f"Estado de memoria escrito en {ruta}")
+        self.log(NIVEL_RESUMEN, "Estado de memoria escrito en {}", ruta)
 
     def ejecutar_ciclo(self):
         instr_original = self.mem_inst.leer(self.PC)
         if not instr_original:
-            self.log("Fin del programa")
+            self.log(NIVEL_RESUMEN, "Fin del programa")
             return False
 
         # LIMPIA COMENTARIOS ANTES DE TODO
@@ -115,26 +127,26 @@ class CPU:
             self.PC += 1
             return True
 
-        self.log(f"\n=== Ciclo {self.PC} ===")
-        self.log(f"Instrucción: {instr}")
+        self.log(NIVEL_CICLO, "\n=== Ciclo {} ===", self.PC)
+        self.log(NIVEL_CICLO, "Instrucción: {}", instr)
 
         partes = instr.replace(",", "").split()
         opcode = partes[0]
 
-        instrucciones_validas = ["add", "sub", "addi", "sw", "lw", "la", "jal", "nop", "blt", "beq"]
+        instrucciones_validas = ["add", "sub", "addi", "sw", "lw", "la", "jal", "jalr", "nop", "blt", "beq"]
 
         # Directiva
         if opcode.startswith("."):
-            self.log(f"Directiva ignorada: {opcode}")
+            self.log(NIVEL_CICLO, "Directiva ignorada: {}", opcode)
             self.PC += 1
             return True
 
         if opcode not in instrucciones_validas:
-            self.log(f"ERROR: La instrucción '{opcode}' no está implementada.")
+            self.log(NIVEL_RESUMEN, "ERROR: La instrucción '{}' no está implementada.", opcode)
             return False
 
         señales = self.uc.decodificar(opcode)
-        self.log(f"Señales: {señales}")
+        self.log(NIVEL_CICLO, "Señales: {}", señales)
 
         try:
             if opcode == "la":
@@ -149,7 +161,7 @@ class CPU:
 
                 direccion = self.labels[label]
                 self.regs.escribir(rd, direccion)
-                self.log(f"la: x{rd} = dirección({label}) = {direccion}")
+                self.log(NIVEL_COMMIT, "la: x{} = dirección({}) = {}", rd, label, direccion)
 
                 self.PC += 1
                 return True
@@ -165,7 +177,7 @@ class CPU:
 
                 if señales["RegWrite"]:
                     self.regs.escribir(rd, res)
-                self.log(f"ALU: {a} {opcode} {b} = {res} → x{rd}")
+                self.log(NIVEL_COMMIT, "ALU: {} {} {} = {} → x{}", a, opcode, b, res, rd)
 
             elif opcode == "addi":
                 if len(partes) != 4:
@@ -181,7 +193,7 @@ class CPU:
 
                 if señales["RegWrite"]:
                     self.regs.escribir(rd, res)
-                self.log(f"ADDInmediato: x{rd} = {a} + {b} = {res}")
+                self.log(NIVEL_COMMIT, "ADDInmediato: x{} = {} + {} = {}", rd, a, b, res)
 
             elif opcode == "sw":
                 if len(partes) != 3:
@@ -196,7 +208,7 @@ class CPU:
                 val = self.regs.leer(rs2)
 
                 self.mem_data.escribir(addr, val)
-                self.log(f"Store: Mem[{addr}] = x{rs2} valor guardado->({val})")
+                self.log(NIVEL_COMMIT, "Store: Mem[{}] = x{} valor guardado->({})", addr, rs2, val)
 
             elif opcode == "lw":
                 if len(partes) != 3:
@@ -211,9 +223,9 @@ class CPU:
                 val = self.mem_data.leer(addr)
 
                 self.regs.escribir(rd, val)
-                self.log(f"Load: x{rd} = Mem[{addr}] = {val}")
+                self.log(NIVEL_COMMIT, "Load: x{} = Mem[{}] = {}", rd, addr, val)
             elif opcode == "nop":
-                self.log("NOP: No se realiza ninguna operación.")
+                self.log(NIVEL_COMMIT, "NOP: No se realiza ninguna operación.")
                 self.PC += 1
                 return True
 
@@ -230,11 +242,31 @@ class CPU:
                 return_address = self.PC + 1
                 self.regs.escribir(rd, return_address)
 
-                self.log(f"jal: salto a {label}, x{rd}=retorno({return_address})")
+                self.log(NIVEL_COMMIT, "jal: salto a {}, x{}=retorno({})", label, rd, return_address)
 
                 self.PC = self.labels[label]
                 return True
 
+            elif opcode == "jalr":
+                if len(partes) != 4:
+                    raise ValueError("Cantidad incorrecta de parámetros")
+
+                rd = int(partes[1][1:])
+                rs1 = int(partes[2][1:])
+                offset = int(partes[3])
+
+                destino = self.regs.leer(rs1) + offset
+                if not 0 <= destino < len(self.mem_inst.data):
+                    raise ValueError(f"Destino {destino} fuera del programa")
+
+                return_address = self.PC + 1
+                self.regs.escribir(rd, return_address)
+
+                self.log(NIVEL_COMMIT, "jalr: salto a x{}+{} = {}, x{}=retorno({})", rs1, offset, destino, rd, return_address)
+
+                self.PC = destino
+                return True
+
             elif opcode == "la":
                 if len(partes) != 3:
                     raise ValueError("Cantidad incorrecta de parámetros")
@@ -247,7 +279,7 @@ class CPU:
 
                 direccion = self.labels[label]
                 self.regs.escribir(rd, direccion)
-                self.log(f"la: x{rd} = dirección({label}) = {direccion}")
+                self.log(NIVEL_COMMIT, "la: x{} = dirección({}) = {}", rd, label, direccion)
 
                 self.PC += 1
                 return True
@@ -267,10 +299,10 @@ class CPU:
                 v2 = self.regs.leer(rs2)
 
                 if v1 < v2:
-                    self.log(f"blt: salto tomado → {label}")
+                    self.log(NIVEL_COMMIT, "blt: salto tomado → {}", label)
                     self.PC = self.labels[label]
                 else:
-                    self.log(f"blt: no tomado")
+                    self.log(NIVEL_COMMIT, "blt: no tomado")
                     self.PC += 1
 
                 return True
@@ -290,30 +322,368 @@ class CPU:
                 v2 = self.regs.leer(rs2)
 
                 if v1 == v2:
-                    self.log(f"beq: salto tomado → {label}")
+                    self.log(NIVEL_COMMIT, "beq: salto tomado → {}", label)
                     self.PC = self.labels[label]
                 else:
-                    self.log(f"beq: no tomado")
+                    self.log(NIVEL_COMMIT, "beq: no tomado")
                     self.PC += 1
 
                 return True
 
         except Exception as e:
             # ERRRO: instrucción válida pero parámetros inválidos
-            self.log(f"ERROR: La instrucción '{opcode}' es válida, pero sus parámetros son incorrectos.")
-            self.log(f"Detalle: {e}")
+            self.log(NIVEL_RESUMEN, "ERROR: La instrucción '{}' es válida, pero sus parámetros son incorrectos.", opcode)
+            self.log(NIVEL_RESUMEN, "Detalle: {}", e)
             return False
 
         # ============================
         # Continuar ejecución normal
         # ============================
         self.PC += 1
-        self.log(f"PC → {self.PC}")
+        self.log(NIVEL_COMMIT, "PC → {}", self.PC)
         return True
 
-    def ejecutar_todo(self):
-        while self.ejecutar_ciclo():
-            pass
-        self.log("\n--- EJECUCIÓN FINALIZADA ---")
+    # ============================
+    # MODO RÁPIDO (intérprete por tabla)
+    # ============================
+    def _compilar_instruccion(self, pc, instr_original):
+        """
+        Retorna un handler sin argumentos que ejecuta la instrucción en 'pc' y
+        retorna el siguiente PC. Los operandos se resuelven aquí una sola vez.
+        Si la instrucción no se puede pre-compilar (fin del programa, opcode no
+        soportado, parámetros inválidos) retorna _delegar, que devuelve el control
+        a ejecutar_ciclo para que reporte el caso igual que el modo normal.
+        """
+        if not instr_original:
+            return _delegar
+
+        instr = instr_original.split("#")[0].strip()
+        siguiente = pc + 1
+        if instr == "":
+            return lambda: siguiente
+
+        partes = instr.replace(",", "").split()
+        opcode = partes[0]
+        if opcode.startswith("."):
+            return lambda: siguiente
+
+        r = self.regs.reg
+        m = self.mem_data.data
+        n_mem = len(m)
+        labels = self.labels
+
+        try:
+            if opcode in ("add", "sub"):
+                if len(partes) != 4:
+                    return _delegar
+                rd, rs1, rs2 = [int(p[1:]) for p in partes[1:4]]
+                if rd == 0:
+                    return lambda: siguiente
+                if opcode == "add":
+                    def h():
+                        r[rd] = r[rs1] + r[rs2]
+                        return siguiente
+                else:
+                    def h():
+                        r[rd] = r[rs1] - r[rs2]
+                        return siguiente
+                return h
+
+            if opcode == "addi":
+                if len(partes) != 4:
+                    return _delegar
+                rd = int(partes[1][1:])
+                rs1 = int(partes[2][1:])
+                imm = self.sign_ext.extender(int(partes[3]))
+                if rd == 0:
+                    return lambda: siguiente
+                def h():
+                    r[rd] = r[rs1] + imm
+                    return siguiente
+                return h
+
+            if opcode in ("lw", "sw"):
+                if len(partes) != 3:
+                    return _delegar
+                reg = int(partes[1][1:])
+                offset, base = partes[2].split("(")
+                offset = int(offset)
+                rs1 = int(base[1:-1])
+                if opcode == "sw":
+                    def h():
+                        addr = r[rs1] + offset
+                        if not 0 <= addr < n_mem:
+                            raise IndexError("Dirección de memoria fuera de rango")
+                        m[addr] = r[reg]
+                        return siguiente
+                elif reg == 0:
+                    def h():
+                        addr = r[rs1] + offset
+                        if not 0 <= addr < n_mem:
+                            raise IndexError("Dirección de memoria fuera de rango")
+                        return siguiente
+                else:
+                    def h():
+                        addr = r[rs1] + offset
+                        if not 0 <= addr < n_mem:
+                            raise IndexError("Dirección de memoria fuera de rango")
+                        r[reg] = m[addr]
+                        return siguiente
+                return h
+
+            if opcode == "nop":
+                return lambda: siguiente
+
+            if opcode in ("la", "jal"):
+                if len(partes) != 3 or partes[2] not in labels:
+                    return _delegar
+                rd = int(partes[1][1:])
+                destino = labels[partes[2]]
+                if opcode == "la":
+                    if rd == 0:
+                        return lambda: siguiente
+                    def h():
+                        r[rd] = destino
+                        return siguiente
+                elif rd == 0:
+                    return lambda: destino
+                else:
+                    def h():
+                        r[rd] = siguiente
+                        return destino
+                return h
+
+            if opcode == "jalr":
+                if len(partes) != 4:
+                    return _delegar
+                rd = int(partes[1][1:])
+                rs1 = int(partes[2][1:])
+                offset = int(partes[3])
+                n_inst = len(self.mem_inst.data)
+                def h():
+                    destino = r[rs1] + offset
+                    if not 0 <= destino < n_inst:
+                        raise IndexError("Destino fuera del programa")  # lo reporta ejecutar_ciclo
+                    if rd:
+                        r[rd] = siguiente
+                    return destino
+                return h
+
+            if opcode in ("beq", "blt"):
+                if len(partes) != 4 or partes[3] not in labels:
+                    return _delegar
+                rs1 = int(partes[1][1:])
+                rs2 = int(partes[2][1:])
+                destino = labels[partes[3]]
+                if opcode == "beq":
+                    return lambda: destino if r[rs1] == r[rs2] else siguiente
+                return lambda: destino if r[rs1] < r[rs2] else siguiente
+
+        except (ValueError, IndexError):
+            return _delegar
+
+        # Opcode no implementado
+        return _delegar
+
+    def _compilar_tabla(self):
+        """Pre-compila un handler por cada posición de la memoria de instrucciones."""
+        return [self._compilar_instruccion(pc, instr) for pc, instr in enumerate(self.mem_inst.data)]
+
+    def ejecutar_rapido(self, max_instrucciones=None):
+        """
+        Ejecuta el programa con el intérprete por tabla: un handler pre-enlazado
+        por instrucción, sin decodificar ni escribir al log en cada paso.
+        Produce el mismo estado final (registros, memoria, PC) que ejecutar_ciclo.
+        Si se da max_instrucciones, se detiene tras ese número de instrucciones
+        (útil para avanzar rápido y luego seguir con ejecutar_ciclo).
+        Retorna la cantidad de instrucciones ejecutadas.
+        """
+        tabla = self._compilar_tabla()
+        ejecutadas = 0
+        while max_instrucciones is None or ejecutadas < max_instrucciones:
+            pc = self.PC
+            try:
+                if max_instrucciones is None:
+                    while True:
+                        pc = tabla[pc]()
+                        ejecutadas += 1
+                else:
+                    while ejecutadas < max_instrucciones:
+                        pc = tabla[pc]()
+                        ejecutadas += 1
+            except Exception:
+                # Fin del programa, error o instrucción no pre-compilable:
+                # ejecutar_ciclo la procesa (y registra) exactamente como en modo normal
+                self.PC = pc
+                if not self.ejecutar_ciclo():
+                    break
+                ejecutadas += 1
+                continue
+            self.PC = pc
+        self.log(NIVEL_RESUMEN, "Modo rápido: {} instrucciones ejecutadas", ejecutadas)
+        return ejecutadas
+
+    # ============================
+    # MODO BLOQUES (traducción por bloques básicos)
+    # ============================
+    def _traducir_instruccion(self, pc, instr_original):
+        """
+        Traduce la instrucción en 'pc' a líneas de código Python para CacheBloques.
+        Retorna (lineas, es_salto) o None si la instrucción la debe resolver
+        ejecutar_ciclo (opcode no soportado, parámetros o label inválidos).
+        Un acceso a memoria fuera de rango retorna ~pc (negativo) para que
+        ejecutar_bloques reanude en esa instrucción con ejecutar_ciclo.
+        """
+        instr = instr_original.split("#")[0].strip()
+        if instr == "":
+            return [], False
+
+        partes = instr.replace(",", "").split()
+        opcode = partes[0]
+        if opcode.startswith("."):
+            return [], False
+
+        labels = self.labels
+        n_regs = len(self.regs.reg)
+        siguiente = pc + 1
+        salto = False
+
+        try:
+            if opcode in ("add", "sub"):
+                if len(partes) != 4:
+                    return None
+                rd, rs1, rs2 = [int(p[1:]) for p in partes[1:4]]
+                registros = (rd, rs1, rs2)
+                lineas = [] if rd == 0 else [f"r[{rd}] = r[{rs1}] {'+' if opcode == 'add' else '-'} r[{rs2}]"]
+
+            elif opcode == "addi":
+                if len(partes) != 4:
+                    return None
+                rd = int(partes[1][1:])
+                rs1 = int(partes[2][1:])
+                imm = self.sign_ext.extender(int(partes[3]))
+                registros = (rd, rs1)
+                lineas = [] if rd == 0 else [f"r[{rd}] = r[{rs1}] + {imm}"]
+
+            elif opcode in ("lw", "sw"):
+                if len(partes) != 3:
+                    return None
+                reg = int(partes[1][1:])
+                offset, base = partes[2].split("(")
+                offset = int(offset)
+                rs1 = int(base[1:-1])
+                registros = (reg, rs1)
+                lineas = [f"a = r[{rs1}] + {offset}",
+                          f"if not 0 <= a < n_mem: return {~pc}"]
+                if opcode == "sw":
+                    lineas.append(f"m[a] = r[{reg}]")
+                elif reg != 0:
+                    lineas.append(f"r[{reg}] = m[a]")
+
+            elif opcode == "nop":
+                return [], False
+
+            elif opcode in ("la", "jal"):
+                if len(partes) != 3 or partes[2] not in labels:
+                    return None
+                rd = int(partes[1][1:])
+                destino = labels[partes[2]]
+                registros = (rd,)
+                if opcode == "la":
+                    lineas = [] if rd == 0 else [f"r[{rd}] = {destino}"]
+                else:
+                    lineas = [] if rd == 0 else [f"r[{rd}] = {siguiente}"]
+                    lineas.append(f"return {destino}")
+                    salto = True
+
+            elif opcode == "jalr":
+                if len(partes) != 4:
+                    return None
+                rd = int(partes[1][1:])
+                rs1 = int(partes[2][1:])
+                offset = int(partes[3])
+                registros = (rd, rs1)
+                lineas = [f"d = r[{rs1}] + {offset}",
+                          f"if not 0 <= d < {len(self.mem_inst.data)}: return {~pc}"]
+                if rd != 0:
+                    lineas.append(f"r[{rd}] = {siguiente}")
+                lineas.append("return d")
+                salto = True
+
+            elif opcode in ("beq", "blt"):
+                if len(partes) != 4 or partes[3] not in labels:
+                    return None
+                rs1 = int(partes[1][1:])
+                rs2 = int(partes[2][1:])
+                destino = labels[partes[3]]
+                registros = (rs1, rs2)
+                comparacion = "==" if opcode == "beq" else "<"
+                lineas = [f"return {destino} if r[{rs1}] {comparacion} r[{rs2}] else {siguiente}"]
+                salto = True
+
+            else:
+                # Opcode no implementado
+                return None
+
+        except (ValueError, IndexError):
+            return None
+
+        # Registros fuera de rango: ejecutar_ciclo reporta el error
+        if not all(0 <= x < n_regs for x in registros):
+            return None
+        return lineas, salto
+
+    def ejecutar_bloques(self, max_instrucciones=None):
+        """
+        Ejecuta el programa por bloques básicos traducidos a Python y compilados
+        una sola vez (ver componentes/traductor.py). Mismo estado final que
+        ejecutar_ciclo; las instrucciones que no se pueden traducir y los accesos
+        fuera de rango se resuelven con ejecutar_ciclo. Cerca del límite de
+        max_instrucciones se avanza de a una instrucción para no pasarse.
+        Retorna la cantidad de instrucciones ejecutadas.
+        """
+        obtener = self.cache_bloques.obtener
+        ejecutadas = 0
+        pc = self.PC
+        while max_instrucciones is None or ejecutadas < max_instrucciones:
+            bloque = obtener(pc)
+            if bloque is not None and (max_instrucciones is None
+                                       or ejecutadas + bloque[1] <= max_instrucciones):
+                siguiente = bloque[0]()
+                if siguiente >= 0:
+                    ejecutadas += bloque[1]
+                    pc = siguiente
+                    continue
+                # Acceso fuera de rango: las instrucciones previas del bloque ya se ejecutaron
+                falla = ~siguiente
+                ejecutadas += falla - pc
+                pc = falla
+            elif bloque is not None:
+                # El bloque completo excede el límite: se avanza con un handler suelto
+                try:
+                    pc = self._compilar_instruccion(pc, self.mem_inst.leer(pc))()
+                    ejecutadas += 1
+                    continue
+                except Exception:
+                    pass
+
+            self.PC = pc
+            if not self.ejecutar_ciclo():
+                break
+            ejecutadas += 1
+            pc = self.PC
+        self.PC = pc
+        self.log(NIVEL_RESUMEN, "Modo bloques: {} instrucciones ejecutadas, {} bloques traducidos", ejecutadas, self.cache_bloques.traducciones)
+        return ejecutadas
+
+    def ejecutar_todo(self, rapido=False, bloques=False):
+        if bloques:
+            self.ejecutar_bloques()
+        elif rapido:
+            self.ejecutar_rapido()
+        else:
+            while self.ejecutar_ciclo():
+                pass
+        self.log(NIVEL_RESUMEN, "\n--- EJECUCIÓN FINALIZADA ---")
         self.guardar_memoria_en_archivo("memoria_salida.txt")
-        self.log_file.close()
+        self.bitacora.cerrar()
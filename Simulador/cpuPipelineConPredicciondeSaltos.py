@@ -1,7 +1,19 @@
-from pipelineEtapas import EtapaStore, Fetch, RegisterFile, Execute, Decode
-from componentes import Memoria
+from pipelineEtapas import (EtapaStore, Fetch, RegisterFile, Execute, Decode, decodificar_programa, separar_labels,
+                           saltar_ciclos_ociosos)
+from pipelineEtapas.ejecucion import (CICLOS_MAX_POR_DEFECTO, FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP, FIN_CANCELADO,
+                                      presupuesto_agotado, estado_etapa, restaurar_etapa)
+from pipelineEtapas.bitacora import (Bitacora, SalidaArchivo, SalidaConsola, BITACORA_CONSOLA,
+                                     NIVEL_RESUMEN, NIVEL_COMMIT, NIVEL_CICLO)
+from pipelineEtapas.hazards import (POLITICA_NINGUNA, POLITICA_FORWARDING, POLITICA_INTERLOCK, validar_politica,
+                                    UnidadAdelantamiento, MarcadorRegistros)
+from pipelineEtapas.codificador import codificar_programa, decodificar_palabra, DecodificadorPalabras
+from pipelineEtapas.decodificador import OP_BEQ, OP_JAL, OP_JALR
+from componentes import (Memoria, MemoriaInstrucciones, EscritorTraza, escribir_checkpoint, leer_checkpoint,
+                         PredictorBimodal, PredictorGshare, PredictorTage, PredictorPerceptron,
+                         BufferDestinos, SALTO_BEQ, SALTO_JAL, SALTO_RETORNO)
 from control import UnidadControl
 import os
+from collections import deque
 from pathlib import Path
 pathGen=((os.getcwd()).replace('\\','/'))+"/"
 
@@ -11,11 +23,39 @@ class BranchPredictor:
     Predictor de saltos simple (Always Taken por defecto).
     Puede extenderse con otras estrategias.
     """
-    def __init__(self, strategy='always_taken'):
+    def __init__(self, strategy='always_taken', bht_size=1024, history_bits=10,
+                 tage_budget_bits=8192, tage_tables=4, tage_max_history=64,
+                 perceptron_size=128, perceptron_history=24, btb_size=0, ras_size=8):
         """
-        strategy: 'always_taken', 'always_not_taken'
+        strategy: 'always_taken', 'always_not_taken', 'bimodal', 'gshare', 'tage', 'perceptron'
+        bht_size: entradas de la tabla de contadores de 'bimodal'/'gshare' (potencia de 2)
+        history_bits: largo del registro de historia global de 'gshare'
+        tage_budget_bits, tage_tables, tage_max_history: almacenamiento total, tablas con tag
+            e historia más larga de 'tage'
+        perceptron_size, perceptron_history: filas de pesos (potencia de 2) y largo de historia de 'perceptron'
+        btb_size: entradas del BTB (potencia de 2). Con 0 no hay BTB: los branches se
+            predicen en Decode y jal/jalr vacían el pipeline en Store, como antes
+        ras_size: entradas de la pila de direcciones de retorno (solo con BTB)
         """
         self.strategy = strategy
+        # Tabla de la estrategia dinámica (None en las estáticas)
+        if strategy == 'bimodal':
+            self.tabla = PredictorBimodal(bht_size)
+        elif strategy == 'gshare':
+            self.tabla = PredictorGshare(bht_size, history_bits)
+        elif strategy == 'tage':
+            self.tabla = PredictorTage(tage_budget_bits, tage_tables, historia_max=tage_max_history)
+        elif strategy == 'perceptron':
+            self.tabla = PredictorPerceptron(perceptron_size, perceptron_history)
+        else:
+            self.tabla = None
+        # Registro de historia global: el último branch en el bit 0 (vacío si la estrategia no lo usa)
+        self.bits_historia = self.tabla.bits_historia if self.tabla is not None else 0
+        self.historia = 0
+        # BTB y pila de retornos (la dirección más nueva al final): con BTB los saltos se predicen en Fetch
+        self.btb = BufferDestinos(btb_size) if btb_size else None
+        self.ras_size = ras_size if self.btb is not None else 0
+        self.pila = ()
         
         # Estadísticas
         self.predictions = 0
@@ -32,6 +72,8 @@ class BranchPredictor:
         
         self.predictions += 1
         
+        if self.tabla is not None:
+            return self.tabla.predecir(pc, self.historia)
         if self.strategy == 'always_taken':
             return True
         elif self.strategy == 'always_not_taken':
@@ -39,95 +81,535 @@ class BranchPredictor:
         
         return True  # Default: always taken
     
-    def update(self, pc, actual_taken, predicted_taken):
+    def update(self, pc, actual_taken, predicted_taken, historia=None):
         """
         Actualiza el predictor con el resultado real del branch.
+        historia: la historia global con la que se predijo (por defecto, la actual).
         """
         if predicted_taken == actual_taken:
             self.correct_predictions += 1
         else:
             self.mispredictions += 1
+        if self.tabla is not None:
+            self.tabla.actualizar(pc, self.historia if historia is None else historia, actual_taken)
+
+    def registrar_historia(self, tomado):
+        """Mete la dirección de un branch en la historia global (la predicha en Decode, la real al reparar)."""
+        self.historia = ((self.historia << 1) | bool(tomado)) & ((1 << self.bits_historia) - 1)
+
+    def restaurar_historia(self, historia):
+        """Vuelve la historia global a un valor guardado (al descartar branches del camino equivocado)."""
+        self.historia = historia
     
+    def apilar_retorno(self, direccion):
+        """Una llamada (jal con rd != x0) apila su PC + 4; con la pila llena se pierde la más vieja."""
+        if self.ras_size:
+            self.pila = (self.pila + (direccion,))[-self.ras_size:]
+
+    def desapilar_retorno(self):
+        """Destino predicho de un retorno (jalr x0), o None si la pila está vacía."""
+        if not self.pila:
+            return None
+        direccion = self.pila[-1]
+        self.pila = self.pila[:-1]
+        return direccion
+
+    def restaurar_pila(self, pila):
+        """Vuelve la pila de retornos a un valor guardado (como restaurar_historia)."""
+        self.pila = tuple(pila)
+
     def get_accuracy(self):
         """Retorna la precisión del predictor."""
         if self.predictions == 0:
             return 0.0
         return (self.correct_predictions / self.predictions) * 100
 
+    def bits(self):
+        """Almacenamiento del predictor en bits: tabla, historia global, BTB y pila de retornos."""
+        bits = (self.tabla.bits() if self.tabla is not None else 0) + self.bits_historia
+        if self.btb is not None:
+            bits += self.btb.bits() + self.ras_size * BufferDestinos.BITS_DESTINO
+        return bits
+
+    def snapshot(self):
+        """Estado del predictor (estrategia, contadores y tabla) en forma serializable."""
+        return {
+            'strategy': self.strategy,
+            'predictions': self.predictions,
+            'correct_predictions': self.correct_predictions,
+            'mispredictions': self.mispredictions,
+            'tabla': self.tabla.snapshot() if self.tabla is not None else None,
+            'historia': self.historia,
+            'btb': self.btb.snapshot() if self.btb is not None else None,
+            'pila': list(self.pila),
+        }
+
+    def restore(self, estado):
+        """Carga un snapshot(); sirve para reusar un predictor ya entrenado en otra corrida."""
+        self.strategy = estado['strategy']
+        self.predictions = estado['predictions']
+        self.correct_predictions = estado['correct_predictions']
+        self.mispredictions = estado['mispredictions']
+        if self.tabla is not None and estado.get('tabla'):
+            self.tabla.restore(estado['tabla'])
+        self.historia = estado.get('historia', 0)
+        if self.btb is not None and estado.get('btb'):
+            self.btb.restore(estado['btb'])
+        self.pila = tuple(estado.get('pila', ()))
+
+
+class ControlSaltos:
+    """
+    Manejo de predicciones, resolución de saltos y snapshot/restore comunes a los
+    CPU con predicción (CPUpipelineConPrediccionSaltos y
+    CPUPipelinePrediccionSaltosHazardControl).
+    Usa los atributos que arma cada CPU: branch_predictor, predicciones_en_vuelo,
+    ciclos_fetch_saltos, las etapas y los contadores de saltos.
+    """
+
+    def _sacar_prediccion(self, pc):
+        """
+        (target predicho, historia global, pila de retornos) del salto de ese PC que
+        llega a Store ((None, None, None) si no se predijo). Descarta las
+        predicciones más viejas que quedaron sin resolver.
+        """
+        prediccion = (None, None, None)
+        while self.predicciones_en_vuelo:
+            pc_predicho, target_predicho, historia, pila = self.predicciones_en_vuelo.popleft()
+            if pc_predicho == pc:
+                prediccion = (target_predicho, historia, pila)
+                break
+        self._actualizar_especulacion()
+        return prediccion
+
+    def _actualizar_especulacion(self):
+        """is_speculative y speculative_* siguen al branch más viejo sin resolver."""
+        if self.predicciones_en_vuelo:
+            self.is_speculative = True
+            self.speculative_branch_pc, self.speculative_target = self.predicciones_en_vuelo[0][:2]
+        else:
+            self.is_speculative = False
+            self.speculative_branch_pc = None
+            self.speculative_target = None
+
+    def _descartar_predicciones(self):
+        """
+        Flush: las predicciones en vuelo eran del camino equivocado. La historia
+        global y la pila de retornos vuelven a como estaban antes de la más vieja.
+        """
+        if self.predicciones_en_vuelo:
+            _, _, historia, pila = self.predicciones_en_vuelo[0]
+            self.branch_predictor.restaurar_historia(historia)
+            self.branch_predictor.restaurar_pila(pila)
+        self.predicciones_en_vuelo.clear()
+        self._actualizar_especulacion()
+
+    def _predecir_en_fetch(self, instr, pc):
+        """
+        Con BTB: predice el salto que Fetch acaba de traer (dirección con el
+        predictor, destino de un retorno con la pila) y guarda la predicción.
+        Devuelve (PC que sigue en Fetch, destino que Decode todavía tiene que
+        redirigir o None). Fetch redirige solo si el BTB tiene ese salto con el
+        mismo destino; si no, se trae la instrucción siguiente y Decode la descarta.
+        """
+        opcode = instr.opcode
+        if opcode != OP_BEQ and opcode != OP_JAL and opcode != OP_JALR:
+            return pc + 4, None
+        predictor = self.branch_predictor
+        historia, pila = predictor.historia, predictor.pila
+        destino = pc + 4
+        if opcode == OP_BEQ:
+            tipo = SALTO_BEQ
+            tomado = predictor.predict(pc, is_branch=True)
+            if tomado and instr.target is not None:
+                destino = instr.target
+            predictor.registrar_historia(destino != pc + 4)
+        elif opcode == OP_JAL:
+            tipo = SALTO_JAL
+            if instr.target is not None:
+                destino = instr.target
+            if instr.rd:
+                predictor.apilar_retorno(pc + 4)
+        else:
+            # Solo los retornos (jalr x0) se predicen; un jalr que enlaza sigue de largo
+            tipo = SALTO_RETORNO
+            retorno = predictor.desapilar_retorno() if instr.rd == 0 else None
+            if retorno is not None:
+                destino = retorno
+        self.predicciones_en_vuelo.append((pc, destino, historia, pila))
+        self._actualizar_especulacion()
+        if destino == pc + 4:
+            return destino, None
+        entrada = predictor.btb.buscar(pc)
+        if entrada is not None and entrada[0] == tipo and (tipo == SALTO_RETORNO or entrada[1] == destino):
+            self.log(NIVEL_COMMIT, "[FETCH] BTB: {} (PC={}) -> {}", instr, pc, destino)
+            self.redirecciones_fetch += 1
+            return destino, None
+        return pc + 4, destino
+
+    def _descartar_fetch(self):
+        """Decode redirige: la instrucción en Fetch es del camino equivocado (y su predicción también)."""
+        instr = self.etapa_fetch.instruccionEjecutando
+        if instr != "" and instr.opcode in (OP_BEQ, OP_JAL, OP_JALR):
+            if self.ciclos_fetch_saltos:
+                self.ciclos_fetch_saltos.pop()
+            if self.branch_predictor.btb is not None and self.predicciones_en_vuelo:
+                _, _, historia, pila = self.predicciones_en_vuelo.pop()
+                self.branch_predictor.restaurar_historia(historia)
+                self.branch_predictor.restaurar_pila(pila)
+                self._actualizar_especulacion()
+        self.etapa_fetch.instruccionEjecutando = ""
+        self.etapa_fetch.ocupada = False
+
+    def _registrar_destino(self, instr, destino):
+        """Store: un salto tomado entra (o se actualiza) en el BTB."""
+        btb = self.branch_predictor.btb
+        if btb is None:
+            return
+        if instr.opcode == OP_BEQ:
+            btb.registrar(instr.pc, SALTO_BEQ, destino)
+        elif instr.opcode == OP_JAL:
+            btb.registrar(instr.pc, SALTO_JAL, destino)
+        elif instr.opcode == OP_JALR and instr.rd == 0:
+            btb.registrar(instr.pc, SALTO_RETORNO, destino)
+
+    def _vaciar(self, nuevo_pc, ciclo_fetch, en_registerfile):
+        """
+        Flush por un salto mal predicho: se descartan las instrucciones más nuevas
+        (Fetch y Decode si se resolvió en RegisterFile; si no, también RegisterFile
+        y Execute) y Fetch sigue en nuevo_pc. La penalización son los ciclos desde
+        que el salto entró a Fetch hasta la redirección, menos la latencia de Fetch
+        (lo que tarda en llegar el destino de un salto bien predicho en Fetch).
+        """
+        self.indice_instruccion = nuevo_pc
+        self.etapa_fetch.instruccionEjecutando = ""
+        self.etapa_fetch.ocupada = False
+        self.etapa_decode.instruccionEjecutando = ""
+        self.etapa_decode.ocupada = False
+        if not en_registerfile:
+            self.etapa_registerFile.instruccionEjecutando = ""
+            self.etapa_registerFile.ocupada = False
+            self.etapa_execute.instruccionEjecutando = ""
+            self.etapa_execute.ocupada = False
+            if self.marcador is not None:
+                self.marcador.limpiar()
+        if ciclo_fetch is not None:
+            self.ciclos_penalizacion += self.ciclo_actual - ciclo_fetch - self.etapa_fetch.latencia
+        self.ciclos_fetch_saltos.clear()
+
+    def _sacar_ciclo_fetch(self, pc):
+        """Ciclo en que entró a Fetch el salto de ese PC que se resuelve (None si no se sabe)."""
+        while self.ciclos_fetch_saltos:
+            pc_salto, ciclo = self.ciclos_fetch_saltos.popleft()
+            if pc_salto == pc:
+                return ciclo
+        return None
+
+    def _resuelve_en_registerfile(self, instr):
+        """
+        Con resolucion_temprana, beq, jal y retornos (jalr x0) se resuelven al pasar
+        de RegisterFile a Execute. Un jalr que enlaza sigue resolviéndose en Store:
+        su destino no está en el CFG y los NOPs de controlar_hazards no cubren
+        llegar ahí con instrucciones en vuelo.
+        """
+        if not self.resolucion_temprana:
+            return False
+        opcode = instr.opcode
+        return opcode == OP_BEQ or opcode == OP_JAL or (opcode == OP_JALR and instr.rd == 0)
+
+    def _espera_salto_indirecto(self):
+        """True si un jalr que enlaza sigue sin resolverse en Execute/Store (los saltos más nuevos lo esperan en RegisterFile)."""
+        for etapa in (self.etapa_execute, self.etapa_store):
+            instr = etapa.instruccionEjecutando
+            if instr != "" and instr.opcode == OP_JALR and instr.rd != 0:
+                return True
+        return False
+
+    def _resolver_en_registerfile(self, instr, params):
+        """Comparador de RegisterFile: resuelve el salto con los operandos que pasan a Execute."""
+        if instr.opcode == OP_BEQ:
+            val_rs1, val_rs2, target = params[4], params[5], params[6]
+            self._resolver_branch(instr, val_rs1 == val_rs2, target, True)
+        elif instr.opcode == OP_JAL:
+            target = params[3]
+            self._resolver_salto(instr, target if target is not None else instr.pc + 4, True)
+        else:
+            val_rs1, imm = params[5], params[4]
+            self._resolver_salto(instr, (val_rs1 + imm) & ~1, True)
+
+    def _resolver_branch(self, instr, branch_taken, target, en_registerfile):
+        """
+        beq resuelto (en Store, o en RegisterFile con resolucion_temprana): actualiza
+        el predictor y, si la predicción falló, vacía el pipeline y corrige el PC.
+        """
+        etapa = "REGISTER_FILE" if en_registerfile else "STORE"
+        self.branch_count += 1
+        
+        # El PC viaja con la instrucción; su predicción se guardó en Decode (en Fetch con BTB)
+        branch_pc = instr.pc
+        target_predicho, historia, _ = self._sacar_prediccion(branch_pc)
+        ciclo_fetch = self._sacar_ciclo_fetch(branch_pc)
+        
+        # Determinar target real (ya resuelto desde la decodificación)
+        if branch_taken:
+            actual_target = target if target is not None else branch_pc + 4
+            self._registrar_destino(instr, actual_target)
+        else:
+            actual_target = branch_pc + 4  # Secuencial
+        
+        # Verificar si la predicción fue correcta
+        if target_predicho is not None:
+            # Determinar si predijimos "tomado"
+            predicted_taken = (target_predicho != (branch_pc + 4))
+            
+            # Verificar si la predicción del target fue correcta
+            # Comparamos el target real con el target predicho (guardado)
+            prediction_correct = (actual_target == target_predicho)
+            
+            # Actualizar predictor
+            self.branch_predictor.update(branch_pc, branch_taken, predicted_taken, historia)
+            
+            if prediction_correct:
+                self.log(NIVEL_COMMIT, "[{}] Branch PREDICCIÓN CORRECTA: PC={}, target={}", etapa, branch_pc, actual_target)
+                if self.traza is not None:
+                    self.traza.salto(branch_taken, actual_target, False)
+                # No hacer nada, seguir con ejecución especulativa
+            else:
+                # Misprediction: FLUSH y corregir PC
+                self.log(NIVEL_COMMIT, "[{}] Branch MISPREDICTION: predicho={}, real={}", etapa, target_predicho, actual_target)
+                if self.traza is not None:
+                    self.traza.salto(branch_taken, actual_target, True)
+                self.log(NIVEL_COMMIT, "[{}] FLUSH pipeline y corregir PC: {} -> {}", etapa, self.indice_instruccion, actual_target)
+                
+                self.total_flushes += 1
+                self._vaciar(actual_target, ciclo_fetch, en_registerfile)
+                # Los saltos más nuevos iban por el camino equivocado; la historia
+                # global vuelve a la de este branch con su dirección real
+                self._descartar_predicciones()
+                self.branch_predictor.restaurar_historia(historia)
+                self.branch_predictor.registrar_historia(branch_taken)
+        else:
+            # Branch sin predicción previa (no debería pasar normalmente)
+            self.log(NIVEL_COMMIT, "[{}] Branch procesado sin predicción previa", etapa)
+            if self.traza is not None:
+                self.traza.salto(branch_taken, actual_target, False)
+            if branch_taken:
+                self.indice_instruccion = actual_target
 
-class CPUpipelineConPrediccionSaltos:
-    def __init__(self, predictor_strategy='always_taken'):
+    def _resolver_salto(self, instr, nuevo_pc, en_registerfile):
+        """
+        jal/jalr resuelto: sin BTB no se predice y vacía el pipeline; con BTB solo
+        si el destino predicho (en Fetch/Decode, retornos con la pila) no era ese.
+        """
+        etapa = "REGISTER_FILE" if en_registerfile else "STORE"
+        pc_jal = instr.pc
+        ciclo_fetch = self._sacar_ciclo_fetch(pc_jal)
+        
+        target_predicho = None
+        if self.branch_predictor.btb is not None:
+            target_predicho = self._sacar_prediccion(pc_jal)[0]
+            self._registrar_destino(instr, nuevo_pc)
+            if instr.opcode == OP_JALR and instr.rd == 0:
+                self.retornos += 1
+                if target_predicho == nuevo_pc:
+                    self.retornos_acertados += 1
+        
+        if target_predicho == nuevo_pc:
+            self.log(NIVEL_COMMIT, "[{}] JAL: PC = {} -> {} (destino predicho)", etapa, pc_jal, nuevo_pc)
+            if self.traza is not None:
+                self.traza.salto(True, nuevo_pc, False)
+        else:
+            self.log(NIVEL_COMMIT, "[{}] JAL: PC = {} -> {}", etapa, pc_jal, nuevo_pc)
+            if self.traza is not None:
+                self.traza.salto(True, nuevo_pc, True)
+            self.flushes_saltos += 1
+            self._vaciar(nuevo_pc, ciclo_fetch, en_registerfile)
+            # Los saltos descartados ya habían entrado en la historia global (y en la pila de retornos)
+            self._descartar_predicciones()
+            self.log(NIVEL_COMMIT, "[{}] Pipeline flushed (JAL)", etapa)
+
+    def snapshot(self):
+        """
+        Estado completo de la simulación en forma compacta y serializable (solo
+        tipos básicos): registros, memorias, programa, contenido y ciclos
+        restantes de cada etapa, estado especulativo y tablas del predictor.
+        Las instrucciones en las etapas se guardan por PC. No incluye bitácora ni traza.
+        """
+        return {
+            'clase': type(self).__name__,
+            'ciclo_actual': self.ciclo_actual,
+            'indice_instruccion': self.indice_instruccion,
+            'ciclos_saltados': self.ciclos_saltados,
+            'instrucciones_completadas': self.instrucciones_completadas,
+            'PC': self.PC,
+            'data_pointer': self.data_pointer,
+            'regs': list(self.regs),
+            'mem_data': list(self.mem_data.data),
+            'mem_inst': self.mem_inst.data.tolist(),
+            'labels': dict(self.labels),
+            'codigo': list(self.codigo),
+            'instrucciones_cola': list(self.instrucciones_cola),
+            'etapas': [estado_etapa(etapa) for etapa in self.etapas],
+            'adelantamiento': self.adelantamiento.snapshot() if self.adelantamiento is not None else None,
+            'marcador': self.marcador.snapshot() if self.marcador is not None else None,
+            'especulacion': (self.is_speculative, self.speculative_branch_pc, self.speculative_target),
+            'predicciones_en_vuelo': list(self.predicciones_en_vuelo),
+            'ciclos_fetch_saltos': list(self.ciclos_fetch_saltos),
+            'ciclos_penalizacion': self.ciclos_penalizacion,
+            'total_flushes': self.total_flushes,
+            'branch_count': self.branch_count,
+            'saltos': (self.flushes_saltos, self.redirecciones_fetch, self.redirecciones_decode,
+                       self.retornos, self.retornos_acertados),
+            'predictor': self.branch_predictor.snapshot(),
+        }
+
+    def restore(self, estado):
+        """Vuelve al estado de un snapshot() (de esta misma clase de CPU); se puede restaurar varias veces."""
+        if estado['clase'] != type(self).__name__:
+            raise ValueError(f"El snapshot es de {estado['clase']}, no de {type(self).__name__}")
+        # En el lugar: RegisterFile y Execute tienen referencias a regs y mem_data
+        self.regs[:] = estado['regs']
+        self.mem_data.data[:] = estado['mem_data']
+        self.mem_inst.cargar_programa(estado['mem_inst'])
+        self.labels = dict(estado['labels'])
+        self.codigo = list(estado['codigo'])
+        self.instrucciones_cola = list(estado['instrucciones_cola'])
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, self.mem_inst.data.tolist(),
+                                                   decodificar_programa(self.instrucciones_cola, self.labels))
+        self.programa = [self._instruccion_en(4 * i) for i in range(len(self.instrucciones_cola))]
+        self.PC = estado['PC']
+        self.data_pointer = estado['data_pointer']
+        self.indice_instruccion = estado['indice_instruccion']
+        self.ciclo_actual = estado['ciclo_actual']
+        self.ciclos_saltados = estado['ciclos_saltados']
+        self.instrucciones_completadas = estado['instrucciones_completadas']
+        for etapa, estado_etapa_guardado in zip(self.etapas, estado['etapas']):
+            restaurar_etapa(etapa, estado_etapa_guardado, self._instruccion_en)
+        if self.adelantamiento is not None and estado.get('adelantamiento'):
+            self.adelantamiento.restore(estado['adelantamiento'])
+        if self.marcador is not None:
+            # Las escrituras pendientes salen de las instrucciones restauradas en las etapas
+            self.marcador.reconstruir((self.etapa_registerFile, self.etapa_execute, self.etapa_store))
+            if estado.get('marcador'):
+                self.marcador.restore(estado['marcador'])
+        self.is_speculative, self.speculative_branch_pc, self.speculative_target = estado['especulacion']
+        # Las pilas vuelven como listas del JSON; sin pila, el snapshot es de antes del BTB
+        self.predicciones_en_vuelo = deque((pc, target, historia, tuple(pila[0] if pila else ()))
+                                           for pc, target, historia, *pila in estado.get('predicciones_en_vuelo', ()))
+        self.ciclos_fetch_saltos = deque(tuple(entrada) for entrada in estado.get('ciclos_fetch_saltos', ()))
+        self.ciclos_penalizacion = estado.get('ciclos_penalizacion', 0)
+        self.total_flushes = estado['total_flushes']
+        self.branch_count = estado['branch_count']
+        (self.flushes_saltos, self.redirecciones_fetch, self.redirecciones_decode,
+         self.retornos, self.retornos_acertados) = estado.get('saltos', (0, 0, 0, 0, 0))
+        self.branch_predictor.restore(estado['predictor'])
+
+
+class CPUpipelineConPrediccionSaltos(ControlSaltos):
+    def __init__(self, predictor_strategy='always_taken', bitacora=None, politica_hazards=POLITICA_NINGUNA,
+                 predictor_opciones=None, resolucion_temprana=False):
         # Componentes del Pipeline
-        self.mem_inst = Memoria(64)
+        self.mem_inst = MemoriaInstrucciones(64)  # Palabras RV32I de 32 bits
         self.mem_data = Memoria(256)
         # Banco de registros simple para la simulación pipelined
         self.regs = [0] * 32
+        # Las etapas comparten la bitácora del CPU si se pasa una; si no, imprimen por consola
+        self.bitacora_etapas = bitacora if bitacora is not None else BITACORA_CONSOLA
         self.etapa_fetch = Fetch()
         self.etapa_decode = Decode()
-        self.etapa_registerFile = RegisterFile(regs=self.regs)
-        self.etapa_execute = Execute(mem_data=self.mem_data)
+        self.etapa_registerFile = RegisterFile(regs=self.regs, bitacora=self.bitacora_etapas)
+        self.etapa_execute = Execute(mem_data=self.mem_data, bitacora=self.bitacora_etapas)
         self.etapa_store = EtapaStore()
+        self.etapas = (self.etapa_fetch, self.etapa_decode, self.etapa_registerFile,
+                       self.etapa_execute, self.etapa_store)
+        # Hazards de datos: POLITICA_NINGUNA (como siempre), POLITICA_FORWARDING o POLITICA_INTERLOCK
+        self.politica_hazards = validar_politica(politica_hazards, (POLITICA_NINGUNA, POLITICA_FORWARDING, POLITICA_INTERLOCK))
+        self.adelantamiento = UnidadAdelantamiento(self.regs) if politica_hazards == POLITICA_FORWARDING else None
+        self.marcador = MarcadorRegistros() if politica_hazards == POLITICA_INTERLOCK else None
         
         # *** NUEVO: Branch Predictor ***
-        self.branch_predictor = BranchPredictor(strategy=predictor_strategy)
+        # predictor_opciones: parámetros de la estrategia, p. ej. {'bht_size': 256} para 'bimodal'
+        self.branch_predictor = BranchPredictor(strategy=predictor_strategy, **(predictor_opciones or {}))
+        # resolucion_temprana: beq, jal y retornos se resuelven al pasar de RegisterFile a Execute
+        # (comparador con los operandos ya adelantados) y un fallo solo vacía Fetch y Decode
+        self.resolucion_temprana = resolucion_temprana
         
         self.PC = 0
         self.labels = {}
         self.data_pointer = 0
         self.codigo = []
         self.instrucciones_cola = []
+        self.programa = []  # Instrucciones decodificadas (una por entrada de la cola)
+        self.decodificador = DecodificadorPalabras()  # Decodifica las palabras leídas en Fetch
         self.indice_instruccion = 0
         self.ciclo_actual = 0
+        self.ciclos_saltados = 0  # Ciclos adelantados por el kernel por eventos
+        self.traza = None  # EscritorTraza opcional (ver activar_traza)
+        self.instrucciones_completadas = 0  # Instrucciones que salieron de Store (presupuesto por instrucciones)
+        self.motivo_fin = None  # FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO al terminar ejecutar()
+        self.detener_pedido = False  # lo pone detener(); se revisa al inicio de cada ciclo
         
         # Tracking de branches especulativos
         self.speculative_branch_pc = None  # PC del branch en ejecución especulativa
         self.speculative_target = None     # Target predicho
         self.is_speculative = False        # ¿Estamos en modo especulativo?
+        # (PC, target predicho, historia global y pila de retornos al predecir) de cada salto
+        # entre Decode (Fetch con BTB) y Store, del más viejo al más nuevo; los speculative_*
+        # de arriba muestran el más viejo
+        self.predicciones_en_vuelo = deque()
+        # (PC, ciclo en que entró a Fetch) de cada salto en vuelo, para medir la penalización de los flushes
+        self.ciclos_fetch_saltos = deque()
         
         # Estadísticas
         self.total_flushes = 0
         self.branch_count = 0
+        self.flushes_saltos = 0        # vaciados del pipeline por jal/jalr (no cuentan en total_flushes)
+        self.redirecciones_fetch = 0   # saltos predichos tomados que el BTB redirigió en Fetch
+        self.redirecciones_decode = 0  # los que recién redirigió Decode (fallo o destino distinto en el BTB)
+        self.retornos = 0              # jalr x0 que llegaron a Store
+        self.retornos_acertados = 0    # los que la pila de retornos predijo bien
+        self.ciclos_penalizacion = 0   # ciclos perdidos por los flushes respecto de un salto bien predicho en Fetch
         
-        # Log
-        self.log_file = open(pathGen+"log_prediccion.txt", "w", encoding="utf-8")
-        self.log_file.write("=== LOG DE EJECUCIÓN DEL CPU PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
-        self.log_file.write(f"Estrategia de predicción: {predictor_strategy}\n")
-        self.log_file.write("=" * 80 + "\n\n")
+        # Log (por defecto todos los niveles, como antes)
+        self.bitacora = bitacora if bitacora is not None else Bitacora(
+            NIVEL_CICLO, [SalidaArchivo(pathGen+"log_prediccion.txt"), SalidaConsola()])
+        self.log(NIVEL_RESUMEN, "=== LOG DE EJECUCIÓN DEL CPU PIPELINE CON PREDICCIÓN DE SALTOS ===")
+        self.log(NIVEL_RESUMEN, "Estrategia de predicción: {}", predictor_strategy)
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
 
-    def log(self, mensaje):
-        print(mensaje)
-        self.log_file.write(mensaje + "\n")
+    def log(self, nivel, mensaje, *args):
+        self.bitacora.log(nivel, mensaje, *args)
 
     def cargarCodigo(self, codigo):
         """Carga el código (lista de instrucciones) en la cola."""
-        self.codigo = []
-        self.labels = {}
-        for linea in codigo:
-            linea = linea.split("#")[0].strip()
-            if linea:
-                if ':' in linea and not '(' in linea:
-                    label_name = linea.split(':')[0].strip()
-                    self.labels[label_name] = len(self.codigo) * 4
-                    resto = linea.split(':', 1)[1].strip()
-                    if resto:
-                        self.codigo.append(resto)
-                else:
-                    self.codigo.append(linea)
+        self.codigo, self.labels = separar_labels(codigo)
         self.instrucciones_cola = self.codigo.copy()
+        # Decodificar una sola vez; las etapas reciben estos registros en vez del texto
+        self.programa = decodificar_programa(self.instrucciones_cola, self.labels)
         
-        for i, instr in enumerate(self.instrucciones_cola):
-            try:
-                self.mem_inst.escribir(i, instr)
-            except Exception:
-                pass
+
+        # Ensamblar a palabras RV32I y cargarlas en la memoria de instrucciones
+        palabras = codificar_programa(self.programa)
+        self.mem_inst.cargar_programa(palabras)
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, palabras, self.programa)
         
         try:
-            self.log(f"{len(self.instrucciones_cola)} instrucciones cargadas desde lista `riscv_code`")
+            self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde lista `riscv_code`", len(self.instrucciones_cola))
             for idx, ins in enumerate(self.instrucciones_cola):
-                self.log(f"  [{idx:03d}] {ins}")
+                self.log(NIVEL_RESUMEN, "  [{:03d}] {}", idx, ins)
         except Exception:
             pass
 
+    def cargarImagen(self, imagen):
+        """Carga una imagen binaria RV32I (bytes little-endian) directamente en la memoria de instrucciones."""
+        self.mem_inst.cargar_imagen(imagen)
+        self.labels = {}
+        self.programa = [decodificar_palabra(palabra, i * 4) for i, palabra in enumerate(self.mem_inst.data)]
+        self.codigo = [instr.texto for instr in self.programa]
+        self.instrucciones_cola = self.codigo.copy()
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, self.mem_inst.data.tolist())
+        self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde imagen binaria ({} bytes)", len(self.instrucciones_cola), len(imagen))
+
     def mostrar_estado_pipeline(self):
         """Imprime el estado actual de todas las etapas."""
         estado = f"\n[CICLO {self.ciclo_actual:3d}] [PC={self.indice_instruccion:3d}]"
@@ -142,27 +624,28 @@ class CPUpipelineConPrediccionSaltos:
         return estado
 
     def _is_branch_instruction(self, instr):
-        """Detecta si una instrucción es un branch."""
+        """Detecta si una instrucción (ya decodificada) es un branch."""
         if not instr:
             return False
-        parts = instr.split()
-        return len(parts) > 0 and parts[0] in ['beq']
+        return instr.opcode == OP_BEQ
     
     def _extract_branch_target(self, instr, current_pc):
-        """Extrae el target de un branch (label o offset)."""
-        parts = instr.replace(',', '').split()
-        if len(parts) >= 4:
-            target = parts[3]
-            # Si es un label, resolverlo
-            if target in self.labels:
-                return self.labels[target]
-            # Si es un offset numérico
-            try:
-                offset = int(target)
-                return current_pc + offset * 4
-            except:
-                pass
-        return None
+        """Retorna el target del branch, resuelto al decodificar el programa."""
+        return instr.target
+
+    def _libre(self, etapa):
+        """
+        True si la etapa puede recibir una instrucción. Con forwarding o interlock
+        cada etapa retiene la instrucción terminada hasta entregarla (no se pisa);
+        en los modos originales basta con que no esté ocupada.
+        """
+        if self.adelantamiento is None and self.marcador is None:
+            return etapa.esta_libre()
+        return etapa.instruccionEjecutando == ""
+
+    def _sin_dependencias(self, instr):
+        """Interlock: False (un ciclo de stall) si instr lee un registro que una instrucción en vuelo va a escribir."""
+        return self.marcador is None or self.marcador.puede_emitir(instr)
 
     def tick(self):
         """
@@ -178,7 +661,12 @@ class CPUpipelineConPrediccionSaltos:
         # 2. Store → Writeback (procesamiento de resultados)
         if self.etapa_store.getInstruccion() != "":
             instr_store = self.etapa_store.get_instruccion_actual()
-            self.log(f"[CICLO {self.ciclo_actual}] [COMPLETADA] {instr_store}")
+            self.log(NIVEL_COMMIT, "[CICLO {}] [COMPLETADA] {}", self.ciclo_actual, instr_store)
+            self.instrucciones_completadas += 1
+            if self.marcador is not None:
+                self.marcador.retirar(instr_store)
+            if self.traza is not None:
+                self.traza.completada(instr_store)
             
             try:
                 params = getattr(self.etapa_store, 'params', []) or []
@@ -189,123 +677,49 @@ class CPUpipelineConPrediccionSaltos:
                         rd, val = params[1], params[2]
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Registro x{rd} <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Registro x{} <- {}", rd, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     
                     elif accion == 'mem_write':
                         addr, val = params[1], params[2]
                         try:
                             self.mem_data.escribir(addr, val)
-                            self.log(f"[STORE] Mem[{addr}] <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Mem[{}] <- {}", addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_memoria(addr, val)
                         except Exception:
-                            self.log(f"[STORE] Error escribiendo Mem[{addr}]")
+                            self.log(NIVEL_COMMIT, "[STORE] Error escribiendo Mem[{}]", addr)
                     
                     elif accion == 'mem_read_and_reg_write':
                         rd, addr = params[1], params[2]
                         val = self.mem_data.leer(addr)
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Load: x{rd} <- Mem[{addr}] = {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Load: x{} <- Mem[{}] = {}", rd, addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     
                     elif accion == 'branch_result':
                         # *** PROCESAMIENTO DE BRANCH CON PREDICCIÓN ***
-                        self.branch_count += 1
-                        branch_taken, label_or_offset = params[1], params[2]
-                        
-                        # Calcular PC real del branch
-                        branch_pc = self.speculative_branch_pc if self.speculative_branch_pc else 0
-                        
-                        # Determinar target real
-                        if branch_taken:
-                            if label_or_offset in self.labels:
-                                actual_target = self.labels[label_or_offset]
-                            else:
-                                try:
-                                    actual_target = branch_pc + int(label_or_offset) * 4
-                                except:
-                                    actual_target = branch_pc + 4
-                        else:
-                            actual_target = branch_pc + 4  # Secuencial
-                        
-                        # Verificar si la predicción fue correcta
-                        if self.is_speculative:
-                            # Determinar si predijimos "tomado"
-                            predicted_taken = (self.speculative_target != (branch_pc + 4))
-                            
-                            # Verificar si la predicción del target fue correcta
-                            # Comparamos el target real con el target predicho (guardado)
-                            prediction_correct = (actual_target == self.speculative_target)
-                            
-                            # Actualizar predictor
-                            self.branch_predictor.update(branch_pc, branch_taken, predicted_taken)
-                            
-                            if prediction_correct:
-                                self.log(f"[STORE] Branch PREDICCIÓN CORRECTA: PC={branch_pc}, target={actual_target}")
-                                # No hacer nada, seguir con ejecución especulativa
-                            else:
-                                # Misprediction: FLUSH y corregir PC
-                                self.log(f"[STORE] Branch MISPREDICTION: predicho={self.speculative_target}, real={actual_target}")
-                                self.log(f"[STORE] FLUSH pipeline y corregir PC: {self.indice_instruccion} -> {actual_target}")
-                                
-                                self.indice_instruccion = actual_target
-                                self.total_flushes += 1
-                                
-                                # Flush pipeline
-                                self.etapa_fetch.instruccionEjecutando = ""
-                                self.etapa_fetch.ocupada = False
-                                self.etapa_decode.instruccionEjecutando = ""
-                                self.etapa_decode.ocupada = False
-                                self.etapa_registerFile.instruccionEjecutando = ""
-                                self.etapa_registerFile.ocupada = False
-                                self.etapa_execute.instruccionEjecutando = ""
-                                self.etapa_execute.ocupada = False
-                            
-                            # Salir del modo especulativo
-                            self.is_speculative = False
-                            self.speculative_branch_pc = None
-                            self.speculative_target = None
-                        else:
-                            # Branch sin predicción previa (no debería pasar normalmente)
-                            self.log(f"[STORE] Branch procesado sin predicción previa")
-                            if branch_taken:
-                                self.indice_instruccion = actual_target
+                        # (con resolución temprana ya se resolvió en RegisterFile)
+                        if not self._resuelve_en_registerfile(instr_store):
+                            self._resolver_branch(instr_store, params[1], params[2], False)
                     
                     elif accion == 'jump_result':
-                        # JAL - siempre se toma (no necesita predicción, es incondicional)
-                        rd, label = params[1], params[2]
+                        # JAL/JALR - siempre se toma; el PC de retorno se escribe aquí
+                        rd, target = params[1], params[2]
+                        pc_jal = instr_store.pc
                         
-                        instr_actual = self.etapa_store.get_instruccion_actual()
-                        pc_jal = -1
-                        for i, instr in enumerate(self.codigo):
-                            if instr == instr_actual:
-                                pc_jal = i * 4
-                                break
-                        
-                        if 0 < rd < len(self.regs) and pc_jal >= 0:
+                        if 0 < rd < len(self.regs):
                             return_addr = pc_jal + 4
                             self.regs[rd] = return_addr
-                            self.log(f"[STORE] JAL: x{rd} <- {return_addr} (return address)")
-                        
-                        if label in self.labels:
-                            nuevo_pc = self.labels[label]
-                        else:
-                            try:
-                                nuevo_pc = pc_jal + int(label) * 4
-                            except:
-                                nuevo_pc = pc_jal + 4
-                        
-                        self.log(f"[STORE] JAL: PC = {pc_jal} -> {nuevo_pc}")
-                        self.indice_instruccion = nuevo_pc
+                            self.log(NIVEL_COMMIT, "[STORE] JAL: x{} <- {} (return address)", rd, return_addr)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, return_addr)
                         
-                        # Flush pipeline
-                        self.etapa_fetch.instruccionEjecutando = ""
-                        self.etapa_fetch.ocupada = False
-                        self.etapa_decode.instruccionEjecutando = ""
-                        self.etapa_decode.ocupada = False
-                        self.etapa_registerFile.instruccionEjecutando = ""
-                        self.etapa_registerFile.ocupada = False
-                        self.etapa_execute.instruccionEjecutando = ""
-                        self.etapa_execute.ocupada = False
-                        self.log(f"[STORE] Pipeline flushed (JAL)")
+                        if not self._resuelve_en_registerfile(instr_store):
+                            self._resolver_salto(instr_store, target if target is not None else pc_jal + 4, False)
             except Exception:
                 pass
             
@@ -313,7 +727,7 @@ class CPUpipelineConPrediccionSaltos:
             self.etapa_store.ocupada = False
 
         # Execute → Store
-        if self.etapa_execute.getInstruccion() != "" and self.etapa_store.esta_libre():
+        if self.etapa_execute.getInstruccion() != "" and self._libre(self.etapa_store):
             instr = self.etapa_execute.getInstruccion()
             params = getattr(self.etapa_execute, 'params', []) or []
             
@@ -322,60 +736,84 @@ class CPUpipelineConPrediccionSaltos:
             self.etapa_execute.ocupada = False
 
         # RegisterFile → Execute
-        if self.etapa_registerFile.getInstruccion() != "" and self.etapa_execute.esta_libre():
+        if self.etapa_registerFile.getInstruccion() != "" and self._libre(self.etapa_execute):
             instr = self.etapa_registerFile.getInstruccion()
             params = getattr(self.etapa_registerFile, 'params', []) or []
-            self.etapa_execute.cargarInstruccion(instr, params)
-            self.etapa_registerFile.instruccionEjecutando = ""
-            self.etapa_registerFile.ocupada = False
+            temprana = self._resuelve_en_registerfile(instr)
+            if temprana and self._espera_salto_indirecto():
+                params = None
+                self.log(NIVEL_CICLO, "[REGISTER_FILE] {} espera que se resuelva el jalr más viejo", instr)
+            elif self.adelantamiento is not None:
+                # Operandos desde los latches de Execute/Store (None: load-use, esperar un ciclo)
+                params = self.adelantamiento.operandos(params, (self.etapa_execute, self.etapa_store))
+                if params is None:
+                    self.log(NIVEL_CICLO, "[FORWARDING] {} espera el load en Store", instr)
+            if params is not None:
+                self.etapa_execute.cargarInstruccion(instr, params)
+                self.etapa_registerFile.instruccionEjecutando = ""
+                self.etapa_registerFile.ocupada = False
+                if temprana:
+                    self._resolver_en_registerfile(instr, params)
 
         # Decode → RegisterFile (*** AQUÍ DETECTAMOS BRANCHES ***)
-        if self.etapa_decode.getInstruccion() != "" and self.etapa_registerFile.esta_libre():
+        if (self.etapa_decode.getInstruccion() != "" and self._libre(self.etapa_registerFile)
+                and self._sin_dependencias(self.etapa_decode.getInstruccion())):
             instr = self.etapa_decode.getInstruccion()
             
-            # Obtener el PC guardado en params de Decode
-            params_decode = getattr(self.etapa_decode, 'params', []) or []
-            branch_pc = params_decode[0] if len(params_decode) > 0 else self.indice_instruccion - 12
+            # El PC viaja con la instrucción decodificada
+            branch_pc = instr.pc
             
             # *** PREDICCIÓN DE BRANCH ***
-            if self._is_branch_instruction(instr):
-                # Hacer predicción
+            if self.branch_predictor.btb is not None:
+                # Ya se predijo en Fetch; falta redirigir si el BTB no tenía el destino
+                params_decode = self.etapa_decode.params
+                destino = params_decode[1] if len(params_decode) > 1 else None
+                if destino is not None:
+                    self.log(NIVEL_COMMIT, "[DECODE] Salto {} (PC={}) sin destino en el BTB -> {}", instr, branch_pc, destino)
+                    self.redirecciones_decode += 1
+                    self.indice_instruccion = destino
+                    self._descartar_fetch()
+            elif self._is_branch_instruction(instr):
+                # Hacer predicción (se guarda la historia global con que se hizo)
+                historia = self.branch_predictor.historia
                 prediction = self.branch_predictor.predict(branch_pc, is_branch=True)
                 
                 if prediction:
                     # Predicción: TOMADO
                     target = self._extract_branch_target(instr, branch_pc)
-                    if target:
-                        self.log(f"[DECODE] Branch detectado: {instr} (PC={branch_pc})")
-                        self.log(f"[DECODE] PREDICCIÓN: TOMADO -> target={target}")
+                    if target is not None:
+                        self.log(NIVEL_COMMIT, "[DECODE] Branch detectado: {} (PC={})", instr, branch_pc)
+                        self.log(NIVEL_COMMIT, "[DECODE] PREDICCIÓN: TOMADO -> target={}", target)
                         
                         # Entrar en modo especulativo
-                        self.is_speculative = True
-                        self.speculative_branch_pc = branch_pc
-                        self.speculative_target = target
+                        self.predicciones_en_vuelo.append((branch_pc, target, historia, ()))
                         
-                        # Cambiar PC especulativamente
-                        # NOTA: NO hacemos flush aquí, solo cambiamos PC
-                        # Las instrucciones ya en pipeline continúan
+                        # Cambiar PC especulativamente; la instrucción que sigue al
+                        # branch (ya en Fetch) es del camino no tomado y se descarta
                         self.indice_instruccion = target
+                        self._descartar_fetch()
                     else:
-                        self.log(f"[DECODE] Branch detectado pero no se pudo extraer target")
+                        self.log(NIVEL_COMMIT, "[DECODE] Branch detectado pero no se pudo extraer target")
+                        self.predicciones_en_vuelo.append((branch_pc, branch_pc + 4, historia, ()))
                 else:
                     # Predicción: NO TOMADO
-                    self.log(f"[DECODE] Branch detectado: {instr} (PC={branch_pc})")
-                    self.log(f"[DECODE] PREDICCIÓN: NO TOMADO (continuar secuencial)")
+                    self.log(NIVEL_COMMIT, "[DECODE] Branch detectado: {} (PC={})", instr, branch_pc)
+                    self.log(NIVEL_COMMIT, "[DECODE] PREDICCIÓN: NO TOMADO (continuar secuencial)")
                     
-                    self.is_speculative = True
-                    self.speculative_branch_pc = branch_pc
                     # Target secuencial es PC del branch + 4
-                    self.speculative_target = branch_pc + 4
+                    self.predicciones_en_vuelo.append((branch_pc, branch_pc + 4, historia, ()))
+                # Historia especulativa: entra la dirección predicha; Store la repara si falla
+                self.branch_predictor.registrar_historia(self.predicciones_en_vuelo[-1][1] != branch_pc + 4)
+                self._actualizar_especulacion()
             
             self.etapa_registerFile.cargarInstruccion(instr)
+            if self.marcador is not None:
+                self.marcador.emitir(instr)
             self.etapa_decode.instruccionEjecutando = ""
             self.etapa_decode.ocupada = False
 
         # Fetch → Decode
-        if self.etapa_fetch.getInstruccion() != "" and self.etapa_decode.esta_libre():
+        if self.etapa_fetch.getInstruccion() != "" and self._libre(self.etapa_decode):
             instr = self.etapa_fetch.getInstruccion()
             # Pasar el PC guardado en params de Fetch a Decode
             params_fetch = getattr(self.etapa_fetch, 'params', []) or []
@@ -384,24 +822,93 @@ class CPUpipelineConPrediccionSaltos:
             self.etapa_fetch.ocupada = False
 
         # Cargar siguiente instrucción en Fetch
-        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self.etapa_fetch.esta_libre():
-            instr = self.instrucciones_cola[self.indice_instruccion // 4]
+        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self._libre(self.etapa_fetch):
+            # Fetch lee la palabra de 32 bits y la decodifica por campos de bits
+            palabra = self.mem_inst.leer(self.indice_instruccion // 4)
+            instr = self.decodificador.decodificar(self.indice_instruccion, palabra)
             # *** GUARDAR EL PC CON LA INSTRUCCIÓN ***
             current_pc = self.indice_instruccion
-            self.etapa_fetch.cargarInstruccion(instr, [current_pc])
-            self.indice_instruccion += 4
+            if instr.opcode in (OP_BEQ, OP_JAL, OP_JALR):
+                self.ciclos_fetch_saltos.append((current_pc, self.ciclo_actual))
+            if self.branch_predictor.btb is not None:
+                self.indice_instruccion, destino_decode = self._predecir_en_fetch(instr, current_pc)
+                self.etapa_fetch.cargarInstruccion(instr, [current_pc, destino_decode])
+            else:
+                self.etapa_fetch.cargarInstruccion(instr, [current_pc])
+                self.indice_instruccion += 4
 
         self.ciclo_actual += 1
 
-    def ejecutar(self):
-        """Ejecuta el programa completo con predicción de saltos."""
-        self.log("\n=== INICIANDO SIMULACIÓN DEL PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
+    def activar_traza(self, ruta, al_ciclo=None):
+        """
+        Además del log, escribe una traza binaria por ciclo (ver componentes/traza.py).
+        al_ciclo(dict) recibe cada ciclo ya registrado (vista en vivo del Front).
+        """
+        self.traza = EscritorTraza(ruta if os.path.isabs(ruta) else pathGen + ruta, al_ciclo=al_ciclo)
+
+    def detener(self):
+        """Pide terminar ejecutar() al comienzo del próximo ciclo (se puede llamar desde otro hilo)."""
+        self.detener_pedido = True
+
+    def _saltar_ciclos_ociosos(self, ciclos_max):
+        """
+        Adelanta el reloj hasta el próximo ciclo en que alguna etapa progresa.
+        Retorna False si el pipeline está trabado (ninguna etapa va a progresar).
+        """
+        fetch_pendiente = self.indice_instruccion < len(self.instrucciones_cola) * 4
+        limite = ciclos_max - self.ciclo_actual if ciclos_max is not None else None
+        saltados = saltar_ciclos_ociosos(self.etapas, fetch_pendiente, limite, self._libre)
+        if saltados is None:
+            return False
+        if saltados:
+            self.log(NIVEL_CICLO, "\n[CICLOS {}-{}] Sin eventos: reloj adelantado {} ciclos", self.ciclo_actual, self.ciclo_actual + saltados - 1, saltados)
+            self.ciclo_actual += saltados
+            self.ciclos_saltados += saltados
+        return True
+
+    def ejecutar(self, modo_eventos=False, max_ciclos=CICLOS_MAX_POR_DEFECTO, max_instrucciones=None,
+                 checkpoint=None, checkpoint_cada=None):
+        """
+        Ejecuta el programa completo con predicción de saltos.
+        max_ciclos / max_instrucciones: presupuesto de la corrida (None = sin límite).
+        checkpoint: ruta donde guardar el estado completo cada 'checkpoint_cada' ciclos;
+        para reanudar: cargar_checkpoint(ruta) y volver a llamar ejecutar().
+        Retorna el motivo de fin (FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO), también en self.motivo_fin.
+        """
+        self.log(NIVEL_RESUMEN, "\n=== INICIANDO SIMULACIÓN DEL PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
         
-        ciclos_max = 1000
+        self.motivo_fin = None
+        proximo_checkpoint = None
+        if checkpoint is not None and checkpoint_cada:
+            proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        while self.ciclo_actual < ciclos_max:
-            self.log(self.mostrar_estado_pipeline())
-            self.tick()
+        while True:
+            if self.detener_pedido:
+                self.detener_pedido = False
+                self.motivo_fin = FIN_CANCELADO
+                break
+            if presupuesto_agotado(self.ciclo_actual, self.instrucciones_completadas, max_ciclos, max_instrucciones):
+                self.motivo_fin = FIN_PRESUPUESTO
+                break
+            # Kernel por eventos: si ninguna etapa puede progresar, saltar al próximo evento
+            if modo_eventos:
+                if not self._saltar_ciclos_ociosos(max_ciclos):
+                    self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: pipeline trabado, ninguna etapa puede progresar",
+                             self.ciclo_actual)
+                    self.motivo_fin = FIN_TRAP
+                    break
+                if max_ciclos is not None and self.ciclo_actual >= max_ciclos:
+                    self.motivo_fin = FIN_PRESUPUESTO
+                    break
+            self.log(NIVEL_CICLO, self.mostrar_estado_pipeline)
+            if self.traza is not None:
+                self.traza.ciclo(self.ciclo_actual, self.indice_instruccion, self.etapas)
+            try:
+                self.tick()
+            except Exception as e:
+                self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: {}: {}", self.ciclo_actual, type(e).__name__, e)
+                self.motivo_fin = FIN_TRAP
+                break
             
             if (self.indice_instruccion >= len(self.instrucciones_cola) * 4 and
                 self.etapa_fetch.get_instruccion_actual() == "" and
@@ -409,28 +916,69 @@ class CPUpipelineConPrediccionSaltos:
                 self.etapa_registerFile.get_instruccion_actual() == "" and
                 self.etapa_execute.get_instruccion_actual() == "" and
                 self.etapa_store.get_instruccion_actual() == ""):
+                self.motivo_fin = FIN_HALT
                 break
+
+            if proximo_checkpoint is not None and self.ciclo_actual >= proximo_checkpoint:
+                self.guardar_checkpoint(checkpoint)
+                proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        self.log("\n" + "=" * 80)
-        self.log(f"[SIMULACIÓN COMPLETADA] Total de ciclos: {self.ciclo_actual}")
-        self.log(f"[ESTADÍSTICAS DE PREDICCIÓN]")
-        self.log(f"  Total branches: {self.branch_count}")
-        self.log(f"  Predicciones: {self.branch_predictor.predictions}")
-        self.log(f"  Correctas: {self.branch_predictor.correct_predictions}")
-        self.log(f"  Incorrectas: {self.branch_predictor.mispredictions}")
-        self.log(f"  Precisión: {self.branch_predictor.get_accuracy():.2f}%")
-        self.log(f"  Total flushes: {self.total_flushes}")
-        self.log("=" * 80 + "\n")
+        self.log(NIVEL_RESUMEN, "\n" + "=" * 80)
+        self.log(NIVEL_RESUMEN, "[SIMULACIÓN COMPLETADA] Total de ciclos: {}", self.ciclo_actual)
+        if self.motivo_fin != FIN_HALT:
+            self.log(NIVEL_RESUMEN, "[FIN] Motivo: {} (instrucciones completadas: {})", self.motivo_fin, self.instrucciones_completadas)
+        if modo_eventos:
+            self.log(NIVEL_RESUMEN, "[KERNEL POR EVENTOS] Ciclos saltados: {}", self.ciclos_saltados)
+        if self.adelantamiento is not None:
+            self.log(NIVEL_RESUMEN, "[FORWARDING] Operandos adelantados: {}, ciclos de stall (load-use): {}",
+                     self.adelantamiento.adelantados, self.adelantamiento.ciclos_stall)
+        if self.marcador is not None:
+            self.log(NIVEL_RESUMEN, "[INTERLOCK] Ciclos de stall Decode -> RegisterFile: {}", self.marcador.ciclos_stall)
+        self.log(NIVEL_RESUMEN, "[ESTADÍSTICAS DE PREDICCIÓN]")
+        self.log(NIVEL_RESUMEN, "  Total branches: {}", self.branch_count)
+        self.log(NIVEL_RESUMEN, "  Predicciones: {}", self.branch_predictor.predictions)
+        self.log(NIVEL_RESUMEN, "  Correctas: {}", self.branch_predictor.correct_predictions)
+        self.log(NIVEL_RESUMEN, "  Incorrectas: {}", self.branch_predictor.mispredictions)
+        self.log(NIVEL_RESUMEN, "  Precisión: {:.2f}%", self.branch_predictor.get_accuracy())
+        self.log(NIVEL_RESUMEN, "  Almacenamiento del predictor: {} bits", self.branch_predictor.bits())
+        self.log(NIVEL_RESUMEN, "  Total flushes: {}", self.total_flushes)
+        self.log(NIVEL_RESUMEN, "  Flushes por jal/jalr: {}", self.flushes_saltos)
+        if self.branch_predictor.btb is not None:
+            self.log(NIVEL_RESUMEN, "  Saltos redirigidos en Fetch (BTB): {}, en Decode: {}",
+                     self.redirecciones_fetch, self.redirecciones_decode)
+            self.log(NIVEL_RESUMEN, "  Retornos predichos con la pila: {} de {}", self.retornos_acertados, self.retornos)
+        flushes = self.total_flushes + self.flushes_saltos
+        self.log(NIVEL_RESUMEN, "  Saltos resueltos en: {}", "RegisterFile" if self.resolucion_temprana else "Store")
+        self.log(NIVEL_RESUMEN, "  Penalización de los flushes: {} ciclos ({:.2f} por flush)",
+                 self.ciclos_penalizacion, self.ciclos_penalizacion / flushes if flushes else 0.0)
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
         
         try:
             self.guardar_memoria_en_archivo("memoria_salida_prediccion.txt")
         except Exception:
             pass
-        self.log_file.close()
+        if self.traza is not None:
+            self.traza.cerrar()
+        self.bitacora.cerrar()
+        return self.motivo_fin
+
+    def _instruccion_en(self, pc):
+        """Instrucción decodificada en ese PC, como la entrega Fetch."""
+        return self.decodificador.decodificar(pc, self.mem_inst.leer(pc // 4))
+
+    def guardar_checkpoint(self, ruta):
+        """Guarda el estado completo en disco (ver componentes/checkpoint.py)."""
+        escribir_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta, self.snapshot())
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Ciclo {}: estado guardado en {}", self.ciclo_actual, ruta)
+
+    def cargar_checkpoint(self, ruta):
+        """Restaura un checkpoint; después ejecutar() sigue desde ese ciclo."""
+        self.restore(leer_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta))
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Reanudando desde el ciclo {} ({})", self.ciclo_actual, ruta)
 
     def guardar_memoria_en_archivo(self, ruta):
         """Guarda el contenido de la memoria de datos en un archivo."""
         with open(pathGen+ruta, "w", encoding="utf-8") as f:
             for i, valor in enumerate(self.mem_data.data):
                 f.write(f"[{i:03d}] -> {valor}\n")
-        self.log(f"Estado de memoria escrito en {ruta}")
+        self.log(NIVEL_RESUMEN, "Estado de memoria escrito en {}", ruta)
@@ -1,228 +1,127 @@
-from pipelineEtapas import EtapaStore, Fetch, RegisterFile, Execute, Decode
-from componentes import Memoria
+from pipelineEtapas import (EtapaStore, Fetch, RegisterFile, Execute, Decode, decodificar_programa, separar_labels,
+                           saltar_ciclos_ociosos)
+from pipelineEtapas.ejecucion import (CICLOS_MAX_POR_DEFECTO, FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP, FIN_CANCELADO,
+                                      presupuesto_agotado)
+from pipelineEtapas.bitacora import (Bitacora, SalidaArchivo, SalidaConsola, BITACORA_CONSOLA,
+                                     NIVEL_RESUMEN, NIVEL_COMMIT, NIVEL_CICLO)
+from pipelineEtapas.hazards import (POLITICA_NOPS, POLITICA_FORWARDING, POLITICA_INTERLOCK, POLITICA_PLANIFICADOR,
+                                    validar_politica,
+                                    UnidadAdelantamiento, MarcadorRegistros, nops_necesarios, insertar_nops,
+                                    reubicar_labels)
+from pipelineEtapas.planificador import reordenar_programa
+from pipelineEtapas.codificador import codificar_programa, decodificar_palabra, DecodificadorPalabras
+from pipelineEtapas.decodificador import OP_BEQ, OP_JAL, OP_JALR
+from componentes import Memoria, MemoriaInstrucciones, EscritorTraza, escribir_checkpoint, leer_checkpoint
 from control import UnidadControl
 import os
+from collections import deque
 from pathlib import Path
-from cpuPipelineConPredicciondeSaltos import BranchPredictor
+from cpuPipelineConPredicciondeSaltos import BranchPredictor, ControlSaltos
 pathGen=((os.getcwd()).replace('\\','/'))+"/"
 
-class CPUPipelinePrediccionSaltosHazardControl:
-    def __init__(self, predictor_strategy='always_taken'):
+class CPUPipelinePrediccionSaltosHazardControl(ControlSaltos):
+    def __init__(self, predictor_strategy='always_taken', bitacora=None, politica_hazards=POLITICA_NOPS,
+                 predictor_opciones=None, resolucion_temprana=False):
         # Componentes del Pipeline
-        self.mem_inst = Memoria(64)
+        self.mem_inst = MemoriaInstrucciones(64)  # Palabras RV32I de 32 bits
         self.mem_data = Memoria(256)
         # Banco de registros simple para la simulación pipelined
         self.regs = [0] * 32
+        # Las etapas comparten la bitácora del CPU si se pasa una; si no, imprimen por consola
+        self.bitacora_etapas = bitacora if bitacora is not None else BITACORA_CONSOLA
         self.etapa_fetch = Fetch()
         self.etapa_decode = Decode()
-        self.etapa_registerFile = RegisterFile(regs=self.regs)
-        self.etapa_execute = Execute(mem_data=self.mem_data)
+        self.etapa_registerFile = RegisterFile(regs=self.regs, bitacora=self.bitacora_etapas)
+        self.etapa_execute = Execute(mem_data=self.mem_data, bitacora=self.bitacora_etapas)
         self.etapa_store = EtapaStore()
+        self.etapas = (self.etapa_fetch, self.etapa_decode, self.etapa_registerFile,
+                       self.etapa_execute, self.etapa_store)
+        # Hazards de datos: POLITICA_NOPS (controlar_hazards, como siempre), POLITICA_FORWARDING, POLITICA_INTERLOCK
+        # o POLITICA_PLANIFICADOR (reordenar cada bloque antes de controlar_hazards)
+        self.politica_hazards = validar_politica(politica_hazards, (POLITICA_NOPS, POLITICA_FORWARDING, POLITICA_INTERLOCK,
+                                                                    POLITICA_PLANIFICADOR))
+        self.adelantamiento = UnidadAdelantamiento(self.regs) if politica_hazards == POLITICA_FORWARDING else None
+        self.marcador = MarcadorRegistros() if politica_hazards == POLITICA_INTERLOCK else None
+        self.nops_antes = []  # con forwarding/interlock: NOPs que controlar_hazards pondría antes de cada instrucción;
+                              # con el planificador: los que se ahorró cada instrucción al reordenar
+        self.nops_evitados = 0  # NOPs de controlar_hazards que se habrían ejecutado en esta corrida
         
         # *** NUEVO: Branch Predictor ***
-        self.branch_predictor = BranchPredictor(strategy=predictor_strategy)
+        # predictor_opciones: parámetros de la estrategia, p. ej. {'bht_size': 256} para 'bimodal'
+        self.branch_predictor = BranchPredictor(strategy=predictor_strategy, **(predictor_opciones or {}))
+        # resolucion_temprana: beq, jal y retornos se resuelven al pasar de RegisterFile a Execute
+        # (comparador con los operandos ya adelantados) y un fallo solo vacía Fetch y Decode
+        self.resolucion_temprana = resolucion_temprana
         
         self.PC = 0
         self.labels = {}
         self.data_pointer = 0
         self.codigo = []
         self.instrucciones_cola = []
+        self.programa = []  # Instrucciones decodificadas (una por entrada de la cola)
+        self.decodificador = DecodificadorPalabras()  # Decodifica las palabras leídas en Fetch
         self.indice_instruccion = 0
         self.ciclo_actual = 0
+        self.ciclos_saltados = 0  # Ciclos adelantados por el kernel por eventos
+        self.traza = None  # EscritorTraza opcional (ver activar_traza)
+        self.instrucciones_completadas = 0  # Instrucciones que salieron de Store (presupuesto por instrucciones)
+        self.motivo_fin = None  # FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO al terminar ejecutar()
+        self.detener_pedido = False  # lo pone detener(); se revisa al inicio de cada ciclo
         
         # Tracking de branches especulativos
         self.speculative_branch_pc = None  # PC del branch en ejecución especulativa
         self.speculative_target = None     # Target predicho
         self.is_speculative = False        # ¿Estamos en modo especulativo?
+        # (PC, target predicho, historia global y pila de retornos al predecir) de cada salto
+        # entre Decode (Fetch con BTB) y Store, del más viejo al más nuevo; los speculative_*
+        # de arriba muestran el más viejo
+        self.predicciones_en_vuelo = deque()
+        # (PC, ciclo en que entró a Fetch) de cada salto en vuelo, para medir la penalización de los flushes
+        self.ciclos_fetch_saltos = deque()
         
         # Estadísticas
         self.total_flushes = 0
         self.branch_count = 0
+        self.flushes_saltos = 0        # vaciados del pipeline por jal/jalr (no cuentan en total_flushes)
+        self.redirecciones_fetch = 0   # saltos predichos tomados que el BTB redirigió en Fetch
+        self.redirecciones_decode = 0  # los que recién redirigió Decode (fallo o destino distinto en el BTB)
+        self.retornos = 0              # jalr x0 que llegaron a Store
+        self.retornos_acertados = 0    # los que la pila de retornos predijo bien
+        self.ciclos_penalizacion = 0   # ciclos perdidos por los flushes respecto de un salto bien predicho en Fetch
         
-        # Log
-        self.log_file = open(pathGen+"log_prediccion_hazard_control.txt", "w", encoding="utf-8")
-        self.log_file.write("=== LOG DE EJECUCIÓN DEL CPU PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
-        self.log_file.write(f"Estrategia de predicción: {predictor_strategy}\n")
-        self.log_file.write("=" * 80 + "\n\n")
+        # Log (por defecto todos los niveles, como antes)
+        self.bitacora = bitacora if bitacora is not None else Bitacora(
+            NIVEL_CICLO, [SalidaArchivo(pathGen+"log_prediccion_hazard_control.txt"), SalidaConsola()])
+        self.log(NIVEL_RESUMEN, "=== LOG DE EJECUCIÓN DEL CPU PIPELINE CON PREDICCIÓN DE SALTOS ===")
+        self.log(NIVEL_RESUMEN, "Estrategia de predicción: {}", predictor_strategy)
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
 
-    def log(self, mensaje):
-        print(mensaje)
-        self.log_file.write(mensaje + "\n")
+    def log(self, nivel, mensaje, *args):
+        self.bitacora.log(nivel, mensaje, *args)
 
-    def controlar_hazards(self, codigo: list[str]) -> list[str]:
+    def controlar_hazards(self, codigo: list[str], nops_antes=None) -> list[str]:
         """
         Inserta NOPs en la lista de instrucciones para garantizar que
         cualquier consumidor de un registro 'rd' no llegue a su etapa
         RegisterFile antes de que el productor haya completado su Store.
 
-        Se calcula la distancia mínima en instrucciones usando la latencia
-        de Execute de la instrucción productora:
-            required_gap = exec_latency + 2
-        Si la distancia actual entre producer (i) y consumer (j) es menor,
-        se insertan NOPs antes del consumer.
+        La cantidad sale de nops_necesarios: por cada bloque básico, una tabla
+        registro -> ciclo en que su último escritor completa Store, usando
+        las latencias de etapa y de instrucción de latencias_config. El destino
+        de un beq se trata como si entrara detrás del salto (predicción tomada);
+        con BTB o resolucion_temprana, también el de un jal y la vuelta de un retorno.
+        nops_antes: resultado de nops_necesarios ya calculado, si lo hay.
 
         Devuelve la nueva lista con NOPs insertados.
         """
-        # import local para obtener latencias de instrucción
-        from pipelineEtapas.latencias_config import get_instruction_latency
-
-        def parse_regs(inst: str):
-            """
-            Extrae (opcode, rd, rs1, rs2) en forma normalizada:
-            rd/rs1/rs2 devueltos como strings 'xN' o None.
-            """
-            if not inst:
-                return None, None, None, None
-            text = inst.split("#")[0].strip()
-            if not text:
-                return None, None, None, None
-            parts = text.replace(",", " ").replace("(", " ").replace(")", " ").split()
-            if not parts:
-                return None, None, None, None
-            op = parts[0]
-            rd = rs1 = rs2 = None
-
-            # R-type: add rd, rs1, rs2
-            if op in ["add", "sub", "and", "or", "xor", "sll", "srl", "sra", "mul", "div", "rem", "slt"]:
-                if len(parts) >= 4:
-                    rd, rs1, rs2 = parts[1], parts[2], parts[3]
-
-            # I-type arith: addi rd, rs1, imm
-            elif op in ["addi", "andi", "ori", "xori", "slti", "sltiu"]:
-                if len(parts) >= 3:
-                    rd, rs1 = parts[1], parts[2]
-
-            # loads: lw rd, offset(rs1)
-            elif op == "lw":
-                if len(parts) >= 3:
-                    rd = parts[1]
-                    # parts may be like ['lw','x4','0','x10'] after splitting parens
-                    if len(parts) >= 4:
-                        rs1 = parts[3]
-                    else:
-                        rs1 = parts[2]
-
-            # stores: sw rs2, offset(rs1)
-            elif op == "sw":
-                if len(parts) >= 3:
-                    rs2 = parts[1]
-                    # base register after split parens
-                    if len(parts) >= 4:
-                        rs1 = parts[3]
-                    else:
-                        rs1 = parts[2]
-
-            # branches use rs1, rs2
-            elif op in ["beq", "bne", "blt", "bge", "bltu", "bgeu"]:
-                if len(parts) >= 3:
-                    rs1, rs2 = parts[1], parts[2]
-
-            # jal rd, label
-            elif op == "jal":
-                if len(parts) >= 2:
-                    rd = parts[1]
-
-            # jalr rd, rs1, imm  (approx)
-            elif op == "jalr":
-                if len(parts) >= 3:
-                    rd, rs1 = parts[1], parts[2]
-
-            return op, rd, rs1, rs2
-
-        nuevo: list[str] = []
-        i = 0
-        n = len(codigo)
-
-        while i < n:
-            inst = codigo[i]
-            # siempre copiamos la instrucción actual (producer) al output;
-            # si detectamos que hay que insertar nops antes de un consumidor
-            # más adelante, lo haremos en el flujo de lookahead.
-            nuevo.append(inst)
-
-            op_i, rd_i, rs1_i, rs2_i = parse_regs(inst)
-            # Si la instrucción no escribe un registro útil (rd None o x0), saltar lookahead.
-            if rd_i is None or rd_i == "x0":
-                i += 1
-                continue
-
-            # obtenemos la latencia de execute de la instrucción productora
-            # si get_instruction_latency falla con el opcode, asumimos lat 1
-            try:
-                exec_lat = get_instruction_latency(op_i)
-                if exec_lat is None:
-                    exec_lat = 1
-            except Exception:
-                exec_lat = 1
-
-            # required minimum gap in number of instructions between producer(i) and consumer(j)
-            required_gap = exec_lat + 2  # derivado: j - i >= L + 2
-
-            # mirar hacia adelante cada instrucción j y si encuentra un consumidor,
-            # insertar la cantidad necesaria de NOPs *antes* del consumidor
-            # (es decir, en la salida 'nuevo' entre lo que ya copié y la copia del consumidor).
-            # Nota: si insertamos, tenemos que "copiar" las instrucciones intermedias ya leídas.
-            look = 1
-            inserted_total = 0
-            while i + look < n:
-                j = i + look
-                inst_j = codigo[j]
-                op_j, rd_j, rs1_j, rs2_j = parse_regs(inst_j)
-
-                # si la instrucción j usa rd_i como rs1 o rs2 -> hazard detected
-                uses_rd = (rs1_j == rd_i) or (rs2_j == rd_i)
-
-                if uses_rd:
-                    current_gap = look  # j - i
-                    if current_gap < required_gap:
-                        needed = required_gap - current_gap
-                        # Insert 'needed' nops BEFORE the consumer (inst_j)
-                        # But en 'nuevo' ya tenemos las producer y las instrucciones previas (hasta i),
-                        # necesitamos migrar las instrucciones entre i+1 .. j-1 también a 'nuevo' before inserting nop,
-                        # because we only appended inst (producer) so far. So append the intermediate ones now.
-                        for k in range(1, look):
-                            nuevo.append(codigo[i + k])
-                            inserted_total += 0  # intermediate appended, not nops
-                        # ahora insertamos los NOPs
-                        for _ in range(needed):
-                            nuevo.append("nop")
-                        # ahora el consumidor (inst_j) será procesado en la próxima iteración del loop principal
-                        # pero hemos avanzado la copia: necesitamos mover i to j (we'll skip the copied inters next)
-                        i = j  # colocamos i en la posición del consumidor (estará copiada en próxima iteración)
-                        break
-                    else:
-                        # no se necesita nop para este consumidor (la distancia ya es suficiente)
-                        # no hacemos nada y continuamos buscando; pero si hay un consumidor, no necesitamos
-                        # mirar consumidores más lejanos para el mismo rd (podrían existir, pero ya están a mayor gap)
-                        break
-                else:
-                    # seguir mirando adelante
-                    look += 1
-                    continue
-
-            else:
-                # no se encontró consumidor en el futuro que use rd_i
-                i += 1
-                continue
-
-            # si llegamos aquí, significa que hicimos un 'break' por haber insertado y pusimos i=j (consumer)
-            # NO incrementamos i de otra forma (la próxima iteración copiará el consumer)
-            # si el while look encontró uses_rd pero no necesitó insertar nop, no se modificó i y rompió -> incrementamos
-            if i < n and codigo[i] == inst:
-                # caso donde no avanzamos i arriba
-                i += 1
-            # si i fue puesto en j por el break, no incrementamos aquí (la siguiente iteración manejará consumer)
-
-        # nota: el algoritmo anterior puede haber duplicado intermedios si no se cuida;
-        # para mayor seguridad, normalizamos la salida: eliminamos secuencias superfluas de NOPs repetidos
-        # pero evitando tocar la semántica. Esto es opcional; aquí lo dejamos tal cual.
-
-        # debug simple
+        if nops_antes is None:
+            nops_antes = nops_necesarios(codigo, self.labels, salto_especulativo=True,
+                                         destino_predicho=self.branch_predictor.btb is not None or self.resolucion_temprana)[0]
+        nuevo = insertar_nops(codigo, nops_antes)
         if len(nuevo) > len(codigo):
-            print(f"[HAZARD_CTRL] Se agregaron {len(nuevo)-len(codigo)} NOP(s). Nueva longitud: {len(nuevo)}")
+            self.bitacora_etapas.log(NIVEL_RESUMEN, "[HAZARD_CTRL] Se agregaron {} NOP(s). Nueva longitud: {}", len(nuevo)-len(codigo), len(nuevo))
         else:
-            print("[HAZARD_CTRL] No se agregaron NOPs.")
-
+            self.bitacora_etapas.log(NIVEL_RESUMEN, "[HAZARD_CTRL] No se agregaron NOPs.")
         return nuevo
 
 
@@ -230,36 +129,59 @@ class CPUPipelinePrediccionSaltosHazardControl:
 
     def cargarCodigo(self, codigo:list[str]):
         """Carga el código (lista de instrucciones) en la cola."""
-        self.codigo = []
-        self.labels = {}
-        for linea in codigo:
-            linea = linea.split("#")[0].strip()
-            if linea:
-                if ':' in linea and not '(' in linea:
-                    label_name = linea.split(':')[0].strip()
-                    self.labels[label_name] = len(self.codigo) * 4
-                    resto = linea.split(':', 1)[1].strip()
-                    if resto:
-                        self.codigo.append(resto)
-                else:
-                    self.codigo.append(linea)
-
-        self.codigo=self.controlar_hazards(self.codigo)
+        self.codigo, self.labels = separar_labels(codigo)
+
+        # Con BTB (o resolviendo en RegisterFile) los jal y los retornos no vacían todo el pipeline
+        destino_predicho = self.branch_predictor.btb is not None or self.resolucion_temprana
+        if self.politica_hazards == POLITICA_PLANIFICADOR:
+            # Primero se reordena cada bloque básico; los NOPs cubren lo que el reordenamiento no alcanzó
+            sin_reordenar = nops_necesarios(self.codigo, self.labels, salto_especulativo=True,
+                                            destino_predicho=destino_predicho)[0]
+            self.codigo, origen = reordenar_programa(self.codigo, self.labels)
+        nops_antes, relleno = nops_necesarios(self.codigo, self.labels, salto_especulativo=True,
+                                              destino_predicho=destino_predicho)
+        if self.politica_hazards in (POLITICA_NOPS, POLITICA_PLANIFICADOR):
+            if self.politica_hazards == POLITICA_PLANIFICADOR:
+                self.log(NIVEL_RESUMEN, "[PLANIFICADOR] NOPs en el programa: {} sin reordenar, {} reordenando",
+                         sum(sin_reordenar), sum(nops_antes))
+                # NOPs ahorrados por cada instrucción; los NOPs agregados no ahorran nada
+                self.nops_antes = []
+                for nops, o in zip(nops_antes, origen):
+                    self.nops_antes.extend([0] * nops)
+                    self.nops_antes.append(sin_reordenar[o] - nops)
+            self.codigo=self.controlar_hazards(self.codigo, nops_antes)
+            # Los labels se calcularon sin los NOPs: se corren a su nueva posición
+            self.labels = reubicar_labels(self.labels, nops_antes, relleno)
+        else:
+            # Con forwarding/interlock el programa queda sin NOPs; se cuentan los evitados al completar cada instrucción
+            self.nops_antes = nops_antes
         self.instrucciones_cola = self.codigo.copy()
+        # Decodificar una sola vez; las etapas reciben estos registros en vez del texto
+        self.programa = decodificar_programa(self.instrucciones_cola, self.labels)
         
-        for i, instr in enumerate(self.instrucciones_cola):
-            try:
-                self.mem_inst.escribir(i, instr)
-            except Exception:
-                pass
+
+        # Ensamblar a palabras RV32I y cargarlas en la memoria de instrucciones
+        palabras = codificar_programa(self.programa)
+        self.mem_inst.cargar_programa(palabras)
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, palabras, self.programa)
         
         try:
-            self.log(f"{len(self.instrucciones_cola)} instrucciones cargadas desde lista `riscv_code`")
+            self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde lista `riscv_code`", len(self.instrucciones_cola))
             for idx, ins in enumerate(self.instrucciones_cola):
-                self.log(f"  [{idx:03d}] {ins}")
+                self.log(NIVEL_RESUMEN, "  [{:03d}] {}", idx, ins)
         except Exception:
             pass
 
+    def cargarImagen(self, imagen):
+        """Carga una imagen binaria RV32I (bytes little-endian) directamente en la memoria de instrucciones."""
+        self.mem_inst.cargar_imagen(imagen)
+        self.labels = {}
+        self.programa = [decodificar_palabra(palabra, i * 4) for i, palabra in enumerate(self.mem_inst.data)]
+        self.codigo = [instr.texto for instr in self.programa]
+        self.instrucciones_cola = self.codigo.copy()
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, self.mem_inst.data.tolist())
+        self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde imagen binaria ({} bytes)", len(self.instrucciones_cola), len(imagen))
+
     def mostrar_estado_pipeline(self):
         """Imprime el estado actual de todas las etapas."""
         estado = f"\n[CICLO {self.ciclo_actual:3d}] [PC={self.indice_instruccion:3d}]"
@@ -274,27 +196,26 @@ class CPUPipelinePrediccionSaltosHazardControl:
         return estado
 
     def _is_branch_instruction(self, instr):
-        """Detecta si una instrucción es un branch."""
+        """Detecta si una instrucción (ya decodificada) es un branch."""
         if not instr:
             return False
-        parts = instr.split()
-        return len(parts) > 0 and parts[0] in ['beq']
+        return instr.opcode == OP_BEQ
     
     def _extract_branch_target(self, instr, current_pc):
-        """Extrae el target de un branch (label o offset)."""
-        parts = instr.replace(',', '').split()
-        if len(parts) >= 4:
-            target = parts[3]
-            # Si es un label, resolverlo
-            if target in self.labels:
-                return self.labels[target]
-            # Si es un offset numérico
-            try:
-                offset = int(target)
-                return current_pc + offset * 4
-            except:
-                pass
-        return None
+        """Retorna el target del branch, resuelto al decodificar el programa."""
+        return instr.target
+
+    def _libre(self, etapa):
+        """
+        True si la etapa puede recibir una instrucción. En todas las políticas de
+        estos CPU cada etapa retiene la instrucción terminada hasta entregarla
+        (no se pisa): los NOPs de controlar_hazards cuentan con eso.
+        """
+        return etapa.instruccionEjecutando == ""
+
+    def _sin_dependencias(self, instr):
+        """Interlock: False (un ciclo de stall) si instr lee un registro que una instrucción en vuelo va a escribir."""
+        return self.marcador is None or self.marcador.puede_emitir(instr)
 
     def tick(self):
         """
@@ -310,7 +231,14 @@ class CPUPipelinePrediccionSaltosHazardControl:
         # 2. Store → Writeback (procesamiento de resultados)
         if self.etapa_store.getInstruccion() != "":
             instr_store = self.etapa_store.get_instruccion_actual()
-            self.log(f"[CICLO {self.ciclo_actual}] [COMPLETADA] {instr_store}")
+            self.log(NIVEL_COMMIT, "[CICLO {}] [COMPLETADA] {}", self.ciclo_actual, instr_store)
+            self.instrucciones_completadas += 1
+            if self.nops_antes:
+                self.nops_evitados += self.nops_antes[instr_store.pc // 4]
+            if self.marcador is not None:
+                self.marcador.retirar(instr_store)
+            if self.traza is not None:
+                self.traza.completada(instr_store)
             
             try:
                 params = getattr(self.etapa_store, 'params', []) or []
@@ -321,123 +249,49 @@ class CPUPipelinePrediccionSaltosHazardControl:
                         rd, val = params[1], params[2]
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Registro x{rd} <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Registro x{} <- {}", rd, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     
                     elif accion == 'mem_write':
                         addr, val = params[1], params[2]
                         try:
                             self.mem_data.escribir(addr, val)
-                            self.log(f"[STORE] Mem[{addr}] <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Mem[{}] <- {}", addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_memoria(addr, val)
                         except Exception:
-                            self.log(f"[STORE] Error escribiendo Mem[{addr}]")
+                            self.log(NIVEL_COMMIT, "[STORE] Error escribiendo Mem[{}]", addr)
                     
                     elif accion == 'mem_read_and_reg_write':
                         rd, addr = params[1], params[2]
                         val = self.mem_data.leer(addr)
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Load: x{rd} <- Mem[{addr}] = {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Load: x{} <- Mem[{}] = {}", rd, addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     
                     elif accion == 'branch_result':
                         # *** PROCESAMIENTO DE BRANCH CON PREDICCIÓN ***
-                        self.branch_count += 1
-                        branch_taken, label_or_offset = params[1], params[2]
-                        
-                        # Calcular PC real del branch
-                        branch_pc = self.speculative_branch_pc if self.speculative_branch_pc else 0
-                        
-                        # Determinar target real
-                        if branch_taken:
-                            if label_or_offset in self.labels:
-                                actual_target = self.labels[label_or_offset]
-                            else:
-                                try:
-                                    actual_target = branch_pc + int(label_or_offset) * 4
-                                except:
-                                    actual_target = branch_pc + 4
-                        else:
-                            actual_target = branch_pc + 4  # Secuencial
-                        
-                        # Verificar si la predicción fue correcta
-                        if self.is_speculative:
-                            # Determinar si predijimos "tomado"
-                            predicted_taken = (self.speculative_target != (branch_pc + 4))
-                            
-                            # Verificar si la predicción del target fue correcta
-                            # Comparamos el target real con el target predicho (guardado)
-                            prediction_correct = (actual_target == self.speculative_target)
-                            
-                            # Actualizar predictor
-                            self.branch_predictor.update(branch_pc, branch_taken, predicted_taken)
-                            
-                            if prediction_correct:
-                                self.log(f"[STORE] Branch PREDICCIÓN CORRECTA: PC={branch_pc}, target={actual_target}")
-                                # No hacer nada, seguir con ejecución especulativa
-                            else:
-                                # Misprediction: FLUSH y corregir PC
-                                self.log(f"[STORE] Branch MISPREDICTION: predicho={self.speculative_target}, real={actual_target}")
-                                self.log(f"[STORE] FLUSH pipeline y corregir PC: {self.indice_instruccion} -> {actual_target}")
-                                
-                                self.indice_instruccion = actual_target
-                                self.total_flushes += 1
-                                
-                                # Flush pipeline
-                                self.etapa_fetch.instruccionEjecutando = ""
-                                self.etapa_fetch.ocupada = False
-                                self.etapa_decode.instruccionEjecutando = ""
-                                self.etapa_decode.ocupada = False
-                                self.etapa_registerFile.instruccionEjecutando = ""
-                                self.etapa_registerFile.ocupada = False
-                                self.etapa_execute.instruccionEjecutando = ""
-                                self.etapa_execute.ocupada = False
-                            
-                            # Salir del modo especulativo
-                            self.is_speculative = False
-                            self.speculative_branch_pc = None
-                            self.speculative_target = None
-                        else:
-                            # Branch sin predicción previa (no debería pasar normalmente)
-                            self.log(f"[STORE] Branch procesado sin predicción previa")
-                            if branch_taken:
-                                self.indice_instruccion = actual_target
+                        # (con resolución temprana ya se resolvió en RegisterFile)
+                        if not self._resuelve_en_registerfile(instr_store):
+                            self._resolver_branch(instr_store, params[1], params[2], False)
                     
                     elif accion == 'jump_result':
-                        # JAL - siempre se toma (no necesita predicción, es incondicional)
-                        rd, label = params[1], params[2]
-                        
-                        instr_actual = self.etapa_store.get_instruccion_actual()
-                        pc_jal = -1
-                        for i, instr in enumerate(self.codigo):
-                            if instr == instr_actual:
-                                pc_jal = i * 4
-                                break
+                        # JAL/JALR - siempre se toma; el PC de retorno se escribe aquí
+                        rd, target = params[1], params[2]
+                        pc_jal = instr_store.pc
                         
-                        if 0 < rd < len(self.regs) and pc_jal >= 0:
+                        if 0 < rd < len(self.regs):
                             return_addr = pc_jal + 4
                             self.regs[rd] = return_addr
-                            self.log(f"[STORE] JAL: x{rd} <- {return_addr} (return address)")
+                            self.log(NIVEL_COMMIT, "[STORE] JAL: x{} <- {} (return address)", rd, return_addr)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, return_addr)
                         
-                        if label in self.labels:
-                            nuevo_pc = self.labels[label]
-                        else:
-                            try:
-                                nuevo_pc = pc_jal + int(label) * 4
-                            except:
-                                nuevo_pc = pc_jal + 4
-                        
-                        self.log(f"[STORE] JAL: PC = {pc_jal} -> {nuevo_pc}")
-                        self.indice_instruccion = nuevo_pc
-                        
-                        # Flush pipeline
-                        self.etapa_fetch.instruccionEjecutando = ""
-                        self.etapa_fetch.ocupada = False
-                        self.etapa_decode.instruccionEjecutando = ""
-                        self.etapa_decode.ocupada = False
-                        self.etapa_registerFile.instruccionEjecutando = ""
-                        self.etapa_registerFile.ocupada = False
-                        self.etapa_execute.instruccionEjecutando = ""
-                        self.etapa_execute.ocupada = False
-                        self.log(f"[STORE] Pipeline flushed (JAL)")
+                        if not self._resuelve_en_registerfile(instr_store):
+                            self._resolver_salto(instr_store, target if target is not None else pc_jal + 4, False)
             except Exception:
                 pass
             
@@ -445,7 +299,7 @@ class CPUPipelinePrediccionSaltosHazardControl:
             self.etapa_store.ocupada = False
 
         # Execute → Store
-        if self.etapa_execute.getInstruccion() != "" and self.etapa_store.esta_libre():
+        if self.etapa_execute.getInstruccion() != "" and self._libre(self.etapa_store):
             instr = self.etapa_execute.getInstruccion()
             params = getattr(self.etapa_execute, 'params', []) or []
             
@@ -454,60 +308,84 @@ class CPUPipelinePrediccionSaltosHazardControl:
             self.etapa_execute.ocupada = False
 
         # RegisterFile → Execute
-        if self.etapa_registerFile.getInstruccion() != "" and self.etapa_execute.esta_libre():
+        if self.etapa_registerFile.getInstruccion() != "" and self._libre(self.etapa_execute):
             instr = self.etapa_registerFile.getInstruccion()
             params = getattr(self.etapa_registerFile, 'params', []) or []
-            self.etapa_execute.cargarInstruccion(instr, params)
-            self.etapa_registerFile.instruccionEjecutando = ""
-            self.etapa_registerFile.ocupada = False
+            temprana = self._resuelve_en_registerfile(instr)
+            if temprana and self._espera_salto_indirecto():
+                params = None
+                self.log(NIVEL_CICLO, "[REGISTER_FILE] {} espera que se resuelva el jalr más viejo", instr)
+            elif self.adelantamiento is not None:
+                # Operandos desde los latches de Execute/Store (None: load-use, esperar un ciclo)
+                params = self.adelantamiento.operandos(params, (self.etapa_execute, self.etapa_store))
+                if params is None:
+                    self.log(NIVEL_CICLO, "[FORWARDING] {} espera el load en Store", instr)
+            if params is not None:
+                self.etapa_execute.cargarInstruccion(instr, params)
+                self.etapa_registerFile.instruccionEjecutando = ""
+                self.etapa_registerFile.ocupada = False
+                if temprana:
+                    self._resolver_en_registerfile(instr, params)
 
         # Decode → RegisterFile (*** AQUÍ DETECTAMOS BRANCHES ***)
-        if self.etapa_decode.getInstruccion() != "" and self.etapa_registerFile.esta_libre():
+        if (self.etapa_decode.getInstruccion() != "" and self._libre(self.etapa_registerFile)
+                and self._sin_dependencias(self.etapa_decode.getInstruccion())):
             instr = self.etapa_decode.getInstruccion()
             
-            # Obtener el PC guardado en params de Decode
-            params_decode = getattr(self.etapa_decode, 'params', []) or []
-            branch_pc = params_decode[0] if len(params_decode) > 0 else self.indice_instruccion - 12
+            # El PC viaja con la instrucción decodificada
+            branch_pc = instr.pc
             
             # *** PREDICCIÓN DE BRANCH ***
-            if self._is_branch_instruction(instr):
-                # Hacer predicción
+            if self.branch_predictor.btb is not None:
+                # Ya se predijo en Fetch; falta redirigir si el BTB no tenía el destino
+                params_decode = self.etapa_decode.params
+                destino = params_decode[1] if len(params_decode) > 1 else None
+                if destino is not None:
+                    self.log(NIVEL_COMMIT, "[DECODE] Salto {} (PC={}) sin destino en el BTB -> {}", instr, branch_pc, destino)
+                    self.redirecciones_decode += 1
+                    self.indice_instruccion = destino
+                    self._descartar_fetch()
+            elif self._is_branch_instruction(instr):
+                # Hacer predicción (se guarda la historia global con que se hizo)
+                historia = self.branch_predictor.historia
                 prediction = self.branch_predictor.predict(branch_pc, is_branch=True)
                 
                 if prediction:
                     # Predicción: TOMADO
                     target = self._extract_branch_target(instr, branch_pc)
-                    if target:
-                        self.log(f"[DECODE] Branch detectado: {instr} (PC={branch_pc})")
-                        self.log(f"[DECODE] PREDICCIÓN: TOMADO -> target={target}")
+                    if target is not None:
+                        self.log(NIVEL_COMMIT, "[DECODE] Branch detectado: {} (PC={})", instr, branch_pc)
+                        self.log(NIVEL_COMMIT, "[DECODE] PREDICCIÓN: TOMADO -> target={}", target)
                         
                         # Entrar en modo especulativo
-                        self.is_speculative = True
-                        self.speculative_branch_pc = branch_pc
-                        self.speculative_target = target
+                        self.predicciones_en_vuelo.append((branch_pc, target, historia, ()))
                         
-                        # Cambiar PC especulativamente
-                        # NOTA: NO hacemos flush aquí, solo cambiamos PC
-                        # Las instrucciones ya en pipeline continúan
+                        # Cambiar PC especulativamente; la instrucción que sigue al
+                        # branch (ya en Fetch) es del camino no tomado y se descarta
                         self.indice_instruccion = target
+                        self._descartar_fetch()
                     else:
-                        self.log(f"[DECODE] Branch detectado pero no se pudo extraer target")
+                        self.log(NIVEL_COMMIT, "[DECODE] Branch detectado pero no se pudo extraer target")
+                        self.predicciones_en_vuelo.append((branch_pc, branch_pc + 4, historia, ()))
                 else:
                     # Predicción: NO TOMADO
-                    self.log(f"[DECODE] Branch detectado: {instr} (PC={branch_pc})")
-                    self.log(f"[DECODE] PREDICCIÓN: NO TOMADO (continuar secuencial)")
+                    self.log(NIVEL_COMMIT, "[DECODE] Branch detectado: {} (PC={})", instr, branch_pc)
+                    self.log(NIVEL_COMMIT, "[DECODE] PREDICCIÓN: NO TOMADO (continuar secuencial)")
                     
-                    self.is_speculative = True
-                    self.speculative_branch_pc = branch_pc
                     # Target secuencial es PC del branch + 4
-                    self.speculative_target = branch_pc + 4
+                    self.predicciones_en_vuelo.append((branch_pc, branch_pc + 4, historia, ()))
+                # Historia especulativa: entra la dirección predicha; Store la repara si falla
+                self.branch_predictor.registrar_historia(self.predicciones_en_vuelo[-1][1] != branch_pc + 4)
+                self._actualizar_especulacion()
             
             self.etapa_registerFile.cargarInstruccion(instr)
+            if self.marcador is not None:
+                self.marcador.emitir(instr)
             self.etapa_decode.instruccionEjecutando = ""
             self.etapa_decode.ocupada = False
 
         # Fetch → Decode
-        if self.etapa_fetch.getInstruccion() != "" and self.etapa_decode.esta_libre():
+        if self.etapa_fetch.getInstruccion() != "" and self._libre(self.etapa_decode):
             instr = self.etapa_fetch.getInstruccion()
             # Pasar el PC guardado en params de Fetch a Decode
             params_fetch = getattr(self.etapa_fetch, 'params', []) or []
@@ -516,24 +394,93 @@ class CPUPipelinePrediccionSaltosHazardControl:
             self.etapa_fetch.ocupada = False
 
         # Cargar siguiente instrucción en Fetch
-        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self.etapa_fetch.esta_libre():
-            instr = self.instrucciones_cola[self.indice_instruccion // 4]
+        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self._libre(self.etapa_fetch):
+            # Fetch lee la palabra de 32 bits y la decodifica por campos de bits
+            palabra = self.mem_inst.leer(self.indice_instruccion // 4)
+            instr = self.decodificador.decodificar(self.indice_instruccion, palabra)
             # *** GUARDAR EL PC CON LA INSTRUCCIÓN ***
             current_pc = self.indice_instruccion
-            self.etapa_fetch.cargarInstruccion(instr, [current_pc])
-            self.indice_instruccion += 4
+            if instr.opcode in (OP_BEQ, OP_JAL, OP_JALR):
+                self.ciclos_fetch_saltos.append((current_pc, self.ciclo_actual))
+            if self.branch_predictor.btb is not None:
+                self.indice_instruccion, destino_decode = self._predecir_en_fetch(instr, current_pc)
+                self.etapa_fetch.cargarInstruccion(instr, [current_pc, destino_decode])
+            else:
+                self.etapa_fetch.cargarInstruccion(instr, [current_pc])
+                self.indice_instruccion += 4
 
         self.ciclo_actual += 1
 
-    def ejecutar(self):
-        """Ejecuta el programa completo con predicción de saltos."""
-        self.log("\n=== INICIANDO SIMULACIÓN DEL PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
+    def activar_traza(self, ruta, al_ciclo=None):
+        """
+        Además del log, escribe una traza binaria por ciclo (ver componentes/traza.py).
+        al_ciclo(dict) recibe cada ciclo ya registrado (vista en vivo del Front).
+        """
+        self.traza = EscritorTraza(ruta if os.path.isabs(ruta) else pathGen + ruta, al_ciclo=al_ciclo)
+
+    def detener(self):
+        """Pide terminar ejecutar() al comienzo del próximo ciclo (se puede llamar desde otro hilo)."""
+        self.detener_pedido = True
+
+    def _saltar_ciclos_ociosos(self, ciclos_max):
+        """
+        Adelanta el reloj hasta el próximo ciclo en que alguna etapa progresa.
+        Retorna False si el pipeline está trabado (ninguna etapa va a progresar).
+        """
+        fetch_pendiente = self.indice_instruccion < len(self.instrucciones_cola) * 4
+        limite = ciclos_max - self.ciclo_actual if ciclos_max is not None else None
+        saltados = saltar_ciclos_ociosos(self.etapas, fetch_pendiente, limite, self._libre)
+        if saltados is None:
+            return False
+        if saltados:
+            self.log(NIVEL_CICLO, "\n[CICLOS {}-{}] Sin eventos: reloj adelantado {} ciclos", self.ciclo_actual, self.ciclo_actual + saltados - 1, saltados)
+            self.ciclo_actual += saltados
+            self.ciclos_saltados += saltados
+        return True
+
+    def ejecutar(self, modo_eventos=False, max_ciclos=CICLOS_MAX_POR_DEFECTO, max_instrucciones=None,
+                 checkpoint=None, checkpoint_cada=None):
+        """
+        Ejecuta el programa completo con predicción de saltos.
+        max_ciclos / max_instrucciones: presupuesto de la corrida (None = sin límite).
+        checkpoint: ruta donde guardar el estado completo cada 'checkpoint_cada' ciclos;
+        para reanudar: cargar_checkpoint(ruta) y volver a llamar ejecutar().
+        Retorna el motivo de fin (FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO), también en self.motivo_fin.
+        """
+        self.log(NIVEL_RESUMEN, "\n=== INICIANDO SIMULACIÓN DEL PIPELINE CON PREDICCIÓN DE SALTOS ===\n")
         
-        ciclos_max = 1000
+        self.motivo_fin = None
+        proximo_checkpoint = None
+        if checkpoint is not None and checkpoint_cada:
+            proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        while self.ciclo_actual < ciclos_max:
-            self.log(self.mostrar_estado_pipeline())
-            self.tick()
+        while True:
+            if self.detener_pedido:
+                self.detener_pedido = False
+                self.motivo_fin = FIN_CANCELADO
+                break
+            if presupuesto_agotado(self.ciclo_actual, self.instrucciones_completadas, max_ciclos, max_instrucciones):
+                self.motivo_fin = FIN_PRESUPUESTO
+                break
+            # Kernel por eventos: si ninguna etapa puede progresar, saltar al próximo evento
+            if modo_eventos:
+                if not self._saltar_ciclos_ociosos(max_ciclos):
+                    self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: pipeline trabado, ninguna etapa puede progresar",
+                             self.ciclo_actual)
+                    self.motivo_fin = FIN_TRAP
+                    break
+                if max_ciclos is not None and self.ciclo_actual >= max_ciclos:
+                    self.motivo_fin = FIN_PRESUPUESTO
+                    break
+            self.log(NIVEL_CICLO, self.mostrar_estado_pipeline)
+            if self.traza is not None:
+                self.traza.ciclo(self.ciclo_actual, self.indice_instruccion, self.etapas)
+            try:
+                self.tick()
+            except Exception as e:
+                self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: {}: {}", self.ciclo_actual, type(e).__name__, e)
+                self.motivo_fin = FIN_TRAP
+                break
             
             if (self.indice_instruccion >= len(self.instrucciones_cola) * 4 and
                 self.etapa_fetch.get_instruccion_actual() == "" and
@@ -541,28 +488,88 @@ class CPUPipelinePrediccionSaltosHazardControl:
                 self.etapa_registerFile.get_instruccion_actual() == "" and
                 self.etapa_execute.get_instruccion_actual() == "" and
                 self.etapa_store.get_instruccion_actual() == ""):
+                self.motivo_fin = FIN_HALT
                 break
+
+            if proximo_checkpoint is not None and self.ciclo_actual >= proximo_checkpoint:
+                self.guardar_checkpoint(checkpoint)
+                proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        self.log("\n" + "=" * 80)
-        self.log(f"[SIMULACIÓN COMPLETADA] Total de ciclos: {self.ciclo_actual}")
-        self.log(f"[ESTADÍSTICAS DE PREDICCIÓN]")
-        self.log(f"  Total branches: {self.branch_count}")
-        self.log(f"  Predicciones: {self.branch_predictor.predictions}")
-        self.log(f"  Correctas: {self.branch_predictor.correct_predictions}")
-        self.log(f"  Incorrectas: {self.branch_predictor.mispredictions}")
-        self.log(f"  Precisión: {self.branch_predictor.get_accuracy():.2f}%")
-        self.log(f"  Total flushes: {self.total_flushes}")
-        self.log("=" * 80 + "\n")
+        self.log(NIVEL_RESUMEN, "\n" + "=" * 80)
+        self.log(NIVEL_RESUMEN, "[SIMULACIÓN COMPLETADA] Total de ciclos: {}", self.ciclo_actual)
+        if self.motivo_fin != FIN_HALT:
+            self.log(NIVEL_RESUMEN, "[FIN] Motivo: {} (instrucciones completadas: {})", self.motivo_fin, self.instrucciones_completadas)
+        if modo_eventos:
+            self.log(NIVEL_RESUMEN, "[KERNEL POR EVENTOS] Ciclos saltados: {}", self.ciclos_saltados)
+        if self.adelantamiento is not None:
+            self.log(NIVEL_RESUMEN, "[FORWARDING] Operandos adelantados: {}, ciclos de stall (load-use): {}",
+                     self.adelantamiento.adelantados, self.adelantamiento.ciclos_stall)
+            self.log(NIVEL_RESUMEN, "[FORWARDING] NOPs de controlar_hazards evitados: {} (ahorro neto estimado: {} ciclos)",
+                     self.nops_evitados, self.nops_evitados - self.adelantamiento.ciclos_stall)
+        if self.marcador is not None:
+            self.log(NIVEL_RESUMEN, "[INTERLOCK] Ciclos de stall Decode -> RegisterFile: {}", self.marcador.ciclos_stall)
+            self.log(NIVEL_RESUMEN, "[INTERLOCK] NOPs de controlar_hazards evitados: {} (ahorro neto estimado: {} ciclos)",
+                     self.nops_evitados, self.nops_evitados - self.marcador.ciclos_stall)
+        if self.politica_hazards == POLITICA_PLANIFICADOR:
+            self.log(NIVEL_RESUMEN, "[PLANIFICADOR] NOPs evitados al reordenar: {} (ciclos ahorrados estimados)", self.nops_evitados)
+        self.log(NIVEL_RESUMEN, "[ESTADÍSTICAS DE PREDICCIÓN]")
+        self.log(NIVEL_RESUMEN, "  Total branches: {}", self.branch_count)
+        self.log(NIVEL_RESUMEN, "  Predicciones: {}", self.branch_predictor.predictions)
+        self.log(NIVEL_RESUMEN, "  Correctas: {}", self.branch_predictor.correct_predictions)
+        self.log(NIVEL_RESUMEN, "  Incorrectas: {}", self.branch_predictor.mispredictions)
+        self.log(NIVEL_RESUMEN, "  Precisión: {:.2f}%", self.branch_predictor.get_accuracy())
+        self.log(NIVEL_RESUMEN, "  Almacenamiento del predictor: {} bits", self.branch_predictor.bits())
+        self.log(NIVEL_RESUMEN, "  Total flushes: {}", self.total_flushes)
+        self.log(NIVEL_RESUMEN, "  Flushes por jal/jalr: {}", self.flushes_saltos)
+        if self.branch_predictor.btb is not None:
+            self.log(NIVEL_RESUMEN, "  Saltos redirigidos en Fetch (BTB): {}, en Decode: {}",
+                     self.redirecciones_fetch, self.redirecciones_decode)
+            self.log(NIVEL_RESUMEN, "  Retornos predichos con la pila: {} de {}", self.retornos_acertados, self.retornos)
+        flushes = self.total_flushes + self.flushes_saltos
+        self.log(NIVEL_RESUMEN, "  Saltos resueltos en: {}", "RegisterFile" if self.resolucion_temprana else "Store")
+        self.log(NIVEL_RESUMEN, "  Penalización de los flushes: {} ciclos ({:.2f} por flush)",
+                 self.ciclos_penalizacion, self.ciclos_penalizacion / flushes if flushes else 0.0)
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
         
         try:
             self.guardar_memoria_en_archivo("memoria_salida_prediccion_hazard_control.txt")
         except Exception:
             pass
-        self.log_file.close()
+        if self.traza is not None:
+            self.traza.cerrar()
+        self.bitacora.cerrar()
+        return self.motivo_fin
+
+    def snapshot(self):
+        """snapshot() de ControlSaltos más los NOPs que insertó controlar_hazards."""
+        estado = super().snapshot()
+        estado['nops_antes'] = list(self.nops_antes)
+        estado['nops_evitados'] = self.nops_evitados
+        return estado
+
+    def restore(self, estado):
+        """Vuelve al estado de un snapshot() (de esta misma clase de CPU); se puede restaurar varias veces."""
+        super().restore(estado)
+        self.nops_antes = list(estado.get('nops_antes', []))
+        self.nops_evitados = estado.get('nops_evitados', 0)
+
+    def _instruccion_en(self, pc):
+        """Instrucción decodificada en ese PC, como la entrega Fetch."""
+        return self.decodificador.decodificar(pc, self.mem_inst.leer(pc // 4))
+
+    def guardar_checkpoint(self, ruta):
+        """Guarda el estado completo en disco (ver componentes/checkpoint.py)."""
+        escribir_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta, self.snapshot())
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Ciclo {}: estado guardado en {}", self.ciclo_actual, ruta)
+
+    def cargar_checkpoint(self, ruta):
+        """Restaura un checkpoint; después ejecutar() sigue desde ese ciclo."""
+        self.restore(leer_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta))
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Reanudando desde el ciclo {} ({})", self.ciclo_actual, ruta)
 
     def guardar_memoria_en_archivo(self, ruta):
         """Guarda el contenido de la memoria de datos en un archivo."""
         with open(pathGen+ruta, "w", encoding="utf-8") as f:
             for i, valor in enumerate(self.mem_data.data):
                 f.write(f"[{i:03d}] -> {valor}\n")
-        self.log(f"Estado de memoria escrito en {ruta}")
+        self.log(NIVEL_RESUMEN, "Estado de memoria escrito en {}", ruta)
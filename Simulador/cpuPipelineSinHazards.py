@@ -1,75 +1,93 @@
-from Simulador.pipelineEtapas import EtapaStore, Fetch, RegisterFile, Execute, Decode
-from Simulador.componentes import Memoria
+from Simulador.pipelineEtapas import (EtapaStore, Fetch, RegisterFile, Execute, Decode, decodificar_programa, separar_labels,
+                                     saltar_ciclos_ociosos)
+from Simulador.pipelineEtapas.ejecucion import (CICLOS_MAX_POR_DEFECTO, FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP, FIN_CANCELADO,
+                                                presupuesto_agotado, estado_etapa, restaurar_etapa)
+from Simulador.pipelineEtapas.bitacora import (Bitacora, SalidaArchivo, SalidaConsola, BITACORA_CONSOLA,
+                                               NIVEL_RESUMEN, NIVEL_COMMIT, NIVEL_CICLO)
+from Simulador.pipelineEtapas.hazards import (POLITICA_NINGUNA, POLITICA_FORWARDING, POLITICA_INTERLOCK, validar_politica,
+                                              UnidadAdelantamiento, MarcadorRegistros)
+from Simulador.pipelineEtapas.codificador import codificar_programa, decodificar_palabra, DecodificadorPalabras
+from Simulador.componentes import Memoria, MemoriaInstrucciones, EscritorTraza, escribir_checkpoint, leer_checkpoint
 from Simulador.control import UnidadControl
 import os
 from pathlib import Path
 pathGen=((os.getcwd()).replace('\\','/'))+"/"
 
 class CPUpipelineNoHazard:
-    def __init__(self):
+    def __init__(self, bitacora=None, politica_hazards=POLITICA_NINGUNA):
         # Componentes del Pipeline
-        self.mem_inst = Memoria(64)
+        self.mem_inst = MemoriaInstrucciones(64)  # Palabras RV32I de 32 bits
         self.mem_data = Memoria(256)
         # Banco de registros simple para la simulación pipelined
         self.regs = [0] * 32
+        # Las etapas comparten la bitácora del CPU si se pasa una; si no, imprimen por consola
+        self.bitacora_etapas = bitacora if bitacora is not None else BITACORA_CONSOLA
         self.etapa_fetch = Fetch()
         self.etapa_decode = Decode()
-        self.etapa_registerFile = RegisterFile(regs=self.regs)
-        self.etapa_execute = Execute(mem_data=self.mem_data)
+        self.etapa_registerFile = RegisterFile(regs=self.regs, bitacora=self.bitacora_etapas)
+        self.etapa_execute = Execute(mem_data=self.mem_data, bitacora=self.bitacora_etapas)
         self.etapa_store = EtapaStore()
+        self.etapas = (self.etapa_fetch, self.etapa_decode, self.etapa_registerFile,
+                       self.etapa_execute, self.etapa_store)
+        # Hazards de datos: POLITICA_NINGUNA (como siempre), POLITICA_FORWARDING o POLITICA_INTERLOCK
+        self.politica_hazards = validar_politica(politica_hazards, (POLITICA_NINGUNA, POLITICA_FORWARDING, POLITICA_INTERLOCK))
+        self.adelantamiento = UnidadAdelantamiento(self.regs) if politica_hazards == POLITICA_FORWARDING else None
+        self.marcador = MarcadorRegistros() if politica_hazards == POLITICA_INTERLOCK else None
         self.PC = 0
         self.labels = {}
         self.data_pointer = 0
         self.codigo = []
         self.instrucciones_cola = []  # Cola de instrucciones a cargar en Fetch
+        self.programa = []  # Instrucciones decodificadas (una por entrada de la cola)
+        self.decodificador = DecodificadorPalabras()  # Decodifica las palabras leídas en Fetch
         self.indice_instruccion = 0  # Índice de siguiente instrucción a cargar
         self.ciclo_actual = 0  # Contador de ciclos de reloj
+        self.ciclos_saltados = 0  # Ciclos adelantados por el kernel por eventos
+        self.traza = None  # EscritorTraza opcional (ver activar_traza)
+        self.instrucciones_completadas = 0  # Instrucciones que salieron de Store (presupuesto por instrucciones)
+        self.motivo_fin = None  # FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO al terminar ejecutar()
+        self.detener_pedido = False  # lo pone detener(); se revisa al inicio de cada ciclo
         
-        # Log
-        self.log_file = open(pathGen+"log.txt", "w", encoding="utf-8")
-        self.log_file.write("=== LOG DE EJECUCIÓN DEL CPU PIPELINE ===\n")
-        self.log_file.write("Latencias: Fetch=1, Decode=1, RegisterFile=1, Execute=2(var), Store=1\n")
-        self.log_file.write("=" * 80 + "\n\n")
+        # Log (por defecto todos los niveles, como antes)
+        self.bitacora = bitacora if bitacora is not None else Bitacora(
+            NIVEL_CICLO, [SalidaArchivo(pathGen+"log.txt")])
+        self.log(NIVEL_RESUMEN, "=== LOG DE EJECUCIÓN DEL CPU PIPELINE ===")
+        self.log(NIVEL_RESUMEN, "Latencias: Fetch=1, Decode=1, RegisterFile=1, Execute=2(var), Store=1")
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
 
-    def log(self, mensaje):
-        self.log_file.write(mensaje + "\n")
+    def log(self, nivel, mensaje, *args):
+        self.bitacora.log(nivel, mensaje, *args)
 
     def cargarCodigo(self, codigo):
         """Carga el código (lista de instrucciones) en la cola."""
         # Filtrar comentarios y líneas vacías, detectar labels
-        self.codigo = []
-        self.labels = {}
-        for linea in codigo:
-            linea = linea.split("#")[0].strip()
-            if linea:
-                # Detectar labels (formato: "label:")
-                if ':' in linea and not '(' in linea:  # Evitar confusión con offset(reg)
-                    label_name = linea.split(':')[0].strip()
-                    self.labels[label_name] = len(self.codigo) * 4  # PC en múltiplos de 4
-                    # Si hay instrucción después del label en la misma línea
-                    resto = linea.split(':', 1)[1].strip()
-                    if resto:
-                        self.codigo.append(resto)
-                else:
-                    self.codigo.append(linea)
+        self.codigo, self.labels = separar_labels(codigo)
         self.instrucciones_cola = self.codigo.copy()
-        # Escribir también en la memoria de instrucciones para compatibilidad
-        # con el comportamiento anterior de `CPU.cargar_programa_desde_archivo`.
-        for i, instr in enumerate(self.instrucciones_cola):
-            try:
-                self.mem_inst.escribir(i, instr)
-            except Exception:
-                # ignorar errores de escritura fuera de rango
-                pass
+        # Decodificar una sola vez; las etapas reciben estos registros en vez del texto
+        self.programa = decodificar_programa(self.instrucciones_cola, self.labels)
+        # Ensamblar a palabras RV32I y cargarlas en la memoria de instrucciones
+        palabras = codificar_programa(self.programa)
+        self.mem_inst.cargar_programa(palabras)
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, palabras, self.programa)
         # Registrar en el log cuántas instrucciones se cargaron y listarlas
         try:
-            self.log(f"{len(self.instrucciones_cola)} instrucciones cargadas desde lista `riscv_code`")
+            self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde lista `riscv_code`", len(self.instrucciones_cola))
             for idx, ins in enumerate(self.instrucciones_cola):
-                self.log(f"  [{idx:03d}] {ins}")
+                self.log(NIVEL_RESUMEN, "  [{:03d}] {}", idx, ins)
         except Exception:
             # si el log no está disponible por alguna razón, no interrumpir
             pass
 
+    def cargarImagen(self, imagen):
+        """Carga una imagen binaria RV32I (bytes little-endian) directamente en la memoria de instrucciones."""
+        self.mem_inst.cargar_imagen(imagen)
+        self.labels = {}
+        self.programa = [decodificar_palabra(palabra, i * 4) for i, palabra in enumerate(self.mem_inst.data)]
+        self.codigo = [instr.texto for instr in self.programa]
+        self.instrucciones_cola = self.codigo.copy()
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, self.mem_inst.data.tolist())
+        self.log(NIVEL_RESUMEN, "{} instrucciones cargadas desde imagen binaria ({} bytes)", len(self.instrucciones_cola), len(imagen))
+
     def mostrar_estado_pipeline(self):
         """Imprime el estado actual de todas las etapas."""
         estado = f"\n[CICLO {self.ciclo_actual:3d}] [PC={self.indice_instruccion:3d}] Estado del Pipeline:\n"
@@ -80,6 +98,20 @@ class CPUpipelineNoHazard:
         estado += f"  Store:        {self.etapa_store.get_estado()}\n"
         return estado
 
+    def _libre(self, etapa):
+        """
+        True si la etapa puede recibir una instrucción. Con forwarding o interlock
+        cada etapa retiene la instrucción terminada hasta entregarla (no se pisa);
+        en los modos originales basta con que no esté ocupada.
+        """
+        if self.adelantamiento is None and self.marcador is None:
+            return etapa.esta_libre()
+        return etapa.instruccionEjecutando == ""
+
+    def _sin_dependencias(self, instr):
+        """Interlock: False (un ciclo de stall) si instr lee un registro que una instrucción en vuelo va a escribir."""
+        return self.marcador is None or self.marcador.puede_emitir(instr)
+
     def tick(self):
         """
         Simula un ciclo de reloj discreto del pipeline.
@@ -102,7 +134,12 @@ class CPUpipelineNoHazard:
         # Store → Writeback (si completa, ejecutar efecto: mem/reg write)
         if self.etapa_store.getInstruccion() != "":
             instr_store = self.etapa_store.get_instruccion_actual()
-            self.log(f"[CICLO {self.ciclo_actual}] [COMPLETADA] {instr_store}")
+            self.log(NIVEL_COMMIT, "[CICLO {}] [COMPLETADA] {}", self.ciclo_actual, instr_store)
+            self.instrucciones_completadas += 1
+            if self.marcador is not None:
+                self.marcador.retirar(instr_store)
+            if self.traza is not None:
+                self.traza.completada(instr_store)
             # Ejecutar efectos pasados en params (si existen)
             try:
                 params = getattr(self.etapa_store, 'params', []) or []
@@ -112,36 +149,37 @@ class CPUpipelineNoHazard:
                         rd, val = params[1], params[2]
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Registro x{rd} <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Registro x{} <- {}", rd, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     elif accion == 'mem_write':
                         addr, val = params[1], params[2]
                         # escribir en memoria de datos
                         try:
                             self.mem_data.escribir(addr, val)
-                            self.log(f"[STORE] Mem[{addr}] <- {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Mem[{}] <- {}", addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_memoria(addr, val)
                         except Exception:
-                            self.log(f"[STORE] Error escribiendo Mem[{addr}]")
+                            self.log(NIVEL_COMMIT, "[STORE] Error escribiendo Mem[{}]", addr)
                     elif accion == 'mem_read_and_reg_write':
                         rd, addr = params[1], params[2]
                         val = self.mem_data.leer(addr)
                         if 0 <= rd < len(self.regs):
                             self.regs[rd] = val
-                            self.log(f"[STORE] Load: x{rd} <- Mem[{addr}] = {val}")
+                            self.log(NIVEL_COMMIT, "[STORE] Load: x{} <- Mem[{}] = {}", rd, addr, val)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, val)
                     elif accion == 'branch_result':
                         # Branch evaluation result
-                        branch_taken, label_or_offset = params[1], params[2]
+                        branch_taken, target = params[1], params[2]
                         if branch_taken:
-                            # Resolver label o usar offset directo
-                            if label_or_offset in self.labels:
-                                nuevo_pc = self.labels[label_or_offset]
-                            else:
-                                # Asumir offset relativo (en bytes, múltiplo de 4)
-                                try:
-                                    nuevo_pc = self.indice_instruccion + int(label_or_offset) * 4
-                                except:
-                                    nuevo_pc = self.indice_instruccion
+                            # El target ya viene resuelto desde la decodificación
+                            nuevo_pc = target if target is not None else self.indice_instruccion
                             
-                            self.log(f"[STORE] Branch TOMADO: PC = {self.indice_instruccion} -> {nuevo_pc}")
+                            self.log(NIVEL_COMMIT, "[STORE] Branch TOMADO: PC = {} -> {}", self.indice_instruccion, nuevo_pc)
+                            if self.traza is not None:
+                                self.traza.salto(True, nuevo_pc, True)
                             self.indice_instruccion = nuevo_pc
                             
                             # Flush pipeline (limpiar Fetch, Decode, RegisterFile, Execute)
@@ -153,39 +191,34 @@ class CPUpipelineNoHazard:
                             self.etapa_registerFile.ocupada = False
                             self.etapa_execute.instruccionEjecutando = ""
                             self.etapa_execute.ocupada = False
-                            self.log(f"[STORE] Pipeline flushed (Fetch/Decode/RegFile/Execute)")
+                            if self.marcador is not None:
+                                self.marcador.limpiar()
+                            self.log(NIVEL_COMMIT, "[STORE] Pipeline flushed (Fetch/Decode/RegFile/Execute)")
                         else:
-                            self.log(f"[STORE] Branch NO tomado")
+                            self.log(NIVEL_COMMIT, "[STORE] Branch NO tomado")
+                            if self.traza is not None:
+                                self.traza.salto(False, self.indice_instruccion, False)
                     elif accion == 'jump_result':
                         # Jump (jal) - siempre se toma
-                        rd, label = params[1], params[2]
+                        rd, target = params[1], params[2]
                         
-                        # Buscar el PC de la instrucción jal actual
-                        # La instrucción está en etapa_store, necesitamos encontrar su índice original
-                        instr_actual = self.etapa_store.get_instruccion_actual()
-                        pc_jal = -1
-                        for i, instr in enumerate(self.codigo):
-                            if instr == instr_actual:
-                                pc_jal = i * 4  # PC en múltiplos de 4
-                                break
+                        # La instrucción decodificada conserva su propio PC
+                        pc_jal = self.etapa_store.get_instruccion_actual().pc
                         
                         # Guardar dirección de retorno (PC de jal + 4) en rd
-                        if 0 < rd < len(self.regs) and pc_jal >= 0:  # x0 no puede ser escrito
+                        if 0 < rd < len(self.regs):  # x0 no puede ser escrito
                             return_addr = pc_jal + 4
                             self.regs[rd] = return_addr
-                            self.log(f"[STORE] JAL: x{rd} <- {return_addr} (return address)")
+                            self.log(NIVEL_COMMIT, "[STORE] JAL: x{} <- {} (return address)", rd, return_addr)
+                            if self.traza is not None:
+                                self.traza.escritura_registro(rd, return_addr)
                         
-                        # Resolver label y actualizar PC
-                        if label in self.labels:
-                            nuevo_pc = self.labels[label]
-                        else:
-                            # Asumir offset relativo desde PC de jal (en bytes)
-                            try:
-                                nuevo_pc = pc_jal + int(label) * 4
-                            except:
-                                nuevo_pc = pc_jal + 4
+                        # El target ya viene resuelto desde la decodificación
+                        nuevo_pc = target if target is not None else pc_jal + 4
                         
-                        self.log(f"[STORE] JAL: PC = {pc_jal} -> {nuevo_pc}")
+                        self.log(NIVEL_COMMIT, "[STORE] JAL: PC = {} -> {}", pc_jal, nuevo_pc)
+                        if self.traza is not None:
+                            self.traza.salto(True, nuevo_pc, True)
                         self.indice_instruccion = nuevo_pc
                         
                         # Flush pipeline (limpiar Fetch, Decode, RegisterFile, Execute)
@@ -197,7 +230,9 @@ class CPUpipelineNoHazard:
                         self.etapa_registerFile.ocupada = False
                         self.etapa_execute.instruccionEjecutando = ""
                         self.etapa_execute.ocupada = False
-                        self.log(f"[STORE] Pipeline flushed (Fetch/Decode/RegFile/Execute)")
+                        if self.marcador is not None:
+                            self.marcador.limpiar()
+                        self.log(NIVEL_COMMIT, "[STORE] Pipeline flushed (Fetch/Decode/RegFile/Execute)")
             except Exception:
                 pass
             # Limpiar la etapa Store después de completar
@@ -205,7 +240,7 @@ class CPUpipelineNoHazard:
             self.etapa_store.ocupada = False
 
         # Execute → Store (si Execute completa y Store está libre)
-        if self.etapa_execute.getInstruccion() != "" and self.etapa_store.esta_libre():
+        if self.etapa_execute.getInstruccion() != "" and self._libre(self.etapa_store):
             instr = self.etapa_execute.getInstruccion()
             # Obtener params que Execute.py ya calculó
             params = getattr(self.etapa_execute, 'params', []) or []
@@ -216,25 +251,34 @@ class CPUpipelineNoHazard:
             self.etapa_execute.ocupada = False
 
         # RegisterFile → Execute (si RegFile completa y Execute está libre)
-        if self.etapa_registerFile.getInstruccion() != "" and self.etapa_execute.esta_libre():
+        if self.etapa_registerFile.getInstruccion() != "" and self._libre(self.etapa_execute):
             instr = self.etapa_registerFile.getInstruccion()
             # Pasar los params (operandos leídos) que RegisterFile calculó
             params = getattr(self.etapa_registerFile, 'params', []) or []
-            self.etapa_execute.cargarInstruccion(instr, params)
-            # Limpiar RegisterFile
-            self.etapa_registerFile.instruccionEjecutando = ""
-            self.etapa_registerFile.ocupada = False
+            if self.adelantamiento is not None:
+                # Operandos desde los latches de Execute/Store (None: load-use, esperar un ciclo)
+                params = self.adelantamiento.operandos(params, (self.etapa_execute, self.etapa_store))
+                if params is None:
+                    self.log(NIVEL_CICLO, "[FORWARDING] {} espera el load en Store", instr)
+            if params is not None:
+                self.etapa_execute.cargarInstruccion(instr, params)
+                # Limpiar RegisterFile
+                self.etapa_registerFile.instruccionEjecutando = ""
+                self.etapa_registerFile.ocupada = False
 
         # Decode → RegisterFile (si Decode completa y RegFile está libre)
-        if self.etapa_decode.getInstruccion() != "" and self.etapa_registerFile.esta_libre():
+        if (self.etapa_decode.getInstruccion() != "" and self._libre(self.etapa_registerFile)
+                and self._sin_dependencias(self.etapa_decode.getInstruccion())):
             instr = self.etapa_decode.getInstruccion()
             self.etapa_registerFile.cargarInstruccion(instr)
+            if self.marcador is not None:
+                self.marcador.emitir(instr)
             # Limpiar Decode
             self.etapa_decode.instruccionEjecutando = ""
             self.etapa_decode.ocupada = False
 
         # Fetch → Decode (si Fetch completa y Decode está libre)
-        if self.etapa_fetch.getInstruccion() != "" and self.etapa_decode.esta_libre():
+        if self.etapa_fetch.getInstruccion() != "" and self._libre(self.etapa_decode):
             instr = self.etapa_fetch.getInstruccion()
             self.etapa_decode.cargarInstruccion(instr, [])
             # Limpiar Fetch
@@ -242,26 +286,89 @@ class CPUpipelineNoHazard:
             self.etapa_fetch.ocupada = False
 
         # 3. Cargar siguiente instrucción en Fetch (si hay y Fetch está libre)
-        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self.etapa_fetch.esta_libre():
-            instr = self.instrucciones_cola[self.indice_instruccion // 4]
+        if self.indice_instruccion < len(self.instrucciones_cola) * 4 and self._libre(self.etapa_fetch):
+            # Fetch lee la palabra de 32 bits y la decodifica por campos de bits
+            palabra = self.mem_inst.leer(self.indice_instruccion // 4)
+            instr = self.decodificador.decodificar(self.indice_instruccion, palabra)
             self.etapa_fetch.cargarInstruccion(instr, [])
             self.indice_instruccion += 4
 
         self.ciclo_actual += 1
 
-    def ejecutar(self):
-        """Ejecuta el programa completo en ciclos de reloj discretos."""
-        self.log("\n=== INICIANDO SIMULACIÓN DEL PIPELINE ===\n")
+    def activar_traza(self, ruta, al_ciclo=None):
+        """
+        Además del log, escribe una traza binaria por ciclo (ver componentes/traza.py).
+        al_ciclo(dict) recibe cada ciclo ya registrado (vista en vivo del Front).
+        """
+        self.traza = EscritorTraza(ruta if os.path.isabs(ruta) else pathGen + ruta, al_ciclo=al_ciclo)
+
+    def detener(self):
+        """Pide terminar ejecutar() al comienzo del próximo ciclo (se puede llamar desde otro hilo)."""
+        self.detener_pedido = True
+
+    def _saltar_ciclos_ociosos(self, ciclos_max):
+        """
+        Adelanta el reloj hasta el próximo ciclo en que alguna etapa progresa.
+        Retorna False si el pipeline está trabado (ninguna etapa va a progresar).
+        """
+        fetch_pendiente = self.indice_instruccion < len(self.instrucciones_cola) * 4
+        limite = ciclos_max - self.ciclo_actual if ciclos_max is not None else None
+        saltados = saltar_ciclos_ociosos(self.etapas, fetch_pendiente, limite, self._libre)
+        if saltados is None:
+            return False
+        if saltados:
+            self.log(NIVEL_CICLO, "\n[CICLOS {}-{}] Sin eventos: reloj adelantado {} ciclos", self.ciclo_actual, self.ciclo_actual + saltados - 1, saltados)
+            self.ciclo_actual += saltados
+            self.ciclos_saltados += saltados
+        return True
+
+    def ejecutar(self, modo_eventos=False, max_ciclos=CICLOS_MAX_POR_DEFECTO, max_instrucciones=None,
+                 checkpoint=None, checkpoint_cada=None):
+        """
+        Ejecuta el programa completo en ciclos de reloj discretos.
+        max_ciclos / max_instrucciones: presupuesto de la corrida (None = sin límite).
+        checkpoint: ruta donde guardar el estado completo cada 'checkpoint_cada' ciclos;
+        para reanudar: cargar_checkpoint(ruta) y volver a llamar ejecutar().
+        Retorna el motivo de fin (FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP o FIN_CANCELADO), también en self.motivo_fin.
+        """
+        self.log(NIVEL_RESUMEN, "\n=== INICIANDO SIMULACIÓN DEL PIPELINE ===\n")
         
-        # Simulación de ciclos de reloj
-        ciclos_max = 1000  # Prevención de bucle infinito
+        self.motivo_fin = None
+        proximo_checkpoint = None
+        if checkpoint is not None and checkpoint_cada:
+            proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        while self.ciclo_actual < ciclos_max:
+        while True:
+            if self.detener_pedido:
+                self.detener_pedido = False
+                self.motivo_fin = FIN_CANCELADO
+                break
+            if presupuesto_agotado(self.ciclo_actual, self.instrucciones_completadas, max_ciclos, max_instrucciones):
+                self.motivo_fin = FIN_PRESUPUESTO
+                break
+            # Kernel por eventos: si ninguna etapa puede progresar, saltar al próximo evento
+            if modo_eventos:
+                if not self._saltar_ciclos_ociosos(max_ciclos):
+                    self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: pipeline trabado, ninguna etapa puede progresar",
+                             self.ciclo_actual)
+                    self.motivo_fin = FIN_TRAP
+                    break
+                if max_ciclos is not None and self.ciclo_actual >= max_ciclos:
+                    self.motivo_fin = FIN_PRESUPUESTO
+                    break
+
             # Mostrar estado antes del tick
-            self.log(self.mostrar_estado_pipeline())
+            self.log(NIVEL_CICLO, self.mostrar_estado_pipeline)
+            if self.traza is not None:
+                self.traza.ciclo(self.ciclo_actual, self.indice_instruccion, self.etapas)
             
             # Ejecutar un ciclo
-            self.tick()
+            try:
+                self.tick()
+            except Exception as e:
+                self.log(NIVEL_RESUMEN, "[TRAP] Ciclo {}: {}: {}", self.ciclo_actual, type(e).__name__, e)
+                self.motivo_fin = FIN_TRAP
+                break
             
             # Condición de salida: no hay más instrucciones y pipeline está vacío
             if (self.indice_instruccion >= len(self.instrucciones_cola) * 4 and
@@ -270,21 +377,108 @@ class CPUpipelineNoHazard:
                 self.etapa_registerFile.get_instruccion_actual() == "" and
                 self.etapa_execute.get_instruccion_actual() == "" and
                 self.etapa_store.get_instruccion_actual() == ""):
+                self.motivo_fin = FIN_HALT
                 break
+
+            if proximo_checkpoint is not None and self.ciclo_actual >= proximo_checkpoint:
+                self.guardar_checkpoint(checkpoint)
+                proximo_checkpoint = self.ciclo_actual + checkpoint_cada
         
-        self.log("\n" + "=" * 80)
-        self.log(f"[SIMULACIÓN COMPLETADA] Total de ciclos: {self.ciclo_actual}")
-        self.log("=" * 80 + "\n")
+        self.log(NIVEL_RESUMEN, "\n" + "=" * 80)
+        self.log(NIVEL_RESUMEN, "[SIMULACIÓN COMPLETADA] Total de ciclos: {}", self.ciclo_actual)
+        if self.motivo_fin != FIN_HALT:
+            self.log(NIVEL_RESUMEN, "[FIN] Motivo: {} (instrucciones completadas: {})", self.motivo_fin, self.instrucciones_completadas)
+        if modo_eventos:
+            self.log(NIVEL_RESUMEN, "[KERNEL POR EVENTOS] Ciclos saltados: {}", self.ciclos_saltados)
+        if self.adelantamiento is not None:
+            self.log(NIVEL_RESUMEN, "[FORWARDING] Operandos adelantados: {}, ciclos de stall (load-use): {}",
+                     self.adelantamiento.adelantados, self.adelantamiento.ciclos_stall)
+        if self.marcador is not None:
+            self.log(NIVEL_RESUMEN, "[INTERLOCK] Ciclos de stall Decode -> RegisterFile: {}", self.marcador.ciclos_stall)
+        self.log(NIVEL_RESUMEN, "=" * 80 + "\n")
         # Guardar memoria de datos en archivo (mismo comportamiento que CPU)
         try:
             self.guardar_memoria_en_archivo("memoria_salida.txt")
         except Exception:
             pass
-        self.log_file.close()
+        if self.traza is not None:
+            self.traza.cerrar()
+        self.bitacora.cerrar()
+        return self.motivo_fin
+
+    def snapshot(self):
+        """
+        Estado completo de la simulación en forma compacta y serializable (solo
+        tipos básicos): registros, memorias, programa, contenido y ciclos
+        restantes de cada etapa.
+        Las instrucciones en las etapas se guardan por PC. No incluye bitácora ni traza.
+        """
+        return {
+            'clase': type(self).__name__,
+            'ciclo_actual': self.ciclo_actual,
+            'indice_instruccion': self.indice_instruccion,
+            'ciclos_saltados': self.ciclos_saltados,
+            'instrucciones_completadas': self.instrucciones_completadas,
+            'PC': self.PC,
+            'data_pointer': self.data_pointer,
+            'regs': list(self.regs),
+            'mem_data': list(self.mem_data.data),
+            'mem_inst': self.mem_inst.data.tolist(),
+            'labels': dict(self.labels),
+            'codigo': list(self.codigo),
+            'instrucciones_cola': list(self.instrucciones_cola),
+            'etapas': [estado_etapa(etapa) for etapa in self.etapas],
+            'adelantamiento': self.adelantamiento.snapshot() if self.adelantamiento is not None else None,
+            'marcador': self.marcador.snapshot() if self.marcador is not None else None,
+        }
+
+    def restore(self, estado):
+        """Vuelve al estado de un snapshot() (de esta misma clase de CPU); se puede restaurar varias veces."""
+        if estado['clase'] != type(self).__name__:
+            raise ValueError(f"El snapshot es de {estado['clase']}, no de {type(self).__name__}")
+        # En el lugar: RegisterFile y Execute tienen referencias a regs y mem_data
+        self.regs[:] = estado['regs']
+        self.mem_data.data[:] = estado['mem_data']
+        self.mem_inst.cargar_programa(estado['mem_inst'])
+        self.labels = dict(estado['labels'])
+        self.codigo = list(estado['codigo'])
+        self.instrucciones_cola = list(estado['instrucciones_cola'])
+        self.decodificador = DecodificadorPalabras(self.instrucciones_cola, self.mem_inst.data.tolist(),
+                                                   decodificar_programa(self.instrucciones_cola, self.labels))
+        self.programa = [self._instruccion_en(4 * i) for i in range(len(self.instrucciones_cola))]
+        self.PC = estado['PC']
+        self.data_pointer = estado['data_pointer']
+        self.indice_instruccion = estado['indice_instruccion']
+        self.ciclo_actual = estado['ciclo_actual']
+        self.ciclos_saltados = estado['ciclos_saltados']
+        self.instrucciones_completadas = estado['instrucciones_completadas']
+        for etapa, estado_etapa_guardado in zip(self.etapas, estado['etapas']):
+            restaurar_etapa(etapa, estado_etapa_guardado, self._instruccion_en)
+        if self.adelantamiento is not None and estado.get('adelantamiento'):
+            self.adelantamiento.restore(estado['adelantamiento'])
+        if self.marcador is not None:
+            # Las escrituras pendientes salen de las instrucciones restauradas en las etapas
+            self.marcador.reconstruir((self.etapa_registerFile, self.etapa_execute, self.etapa_store))
+            if estado.get('marcador'):
+                self.marcador.restore(estado['marcador'])
+
+    def _instruccion_en(self, pc):
+        """Instrucción decodificada en ese PC, como la entrega Fetch."""
+        return self.decodificador.decodificar(pc, self.mem_inst.leer(pc // 4))
+
+    def guardar_checkpoint(self, ruta):
+        """Guarda el estado completo en disco (ver componentes/checkpoint.py)."""
+        escribir_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta, self.snapshot())
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Ciclo {}: estado guardado en {}", self.ciclo_actual, ruta)
+
+    def cargar_checkpoint(self, ruta):
+        """Restaura un checkpoint; después ejecutar() sigue desde ese ciclo."""
+        self.restore(leer_checkpoint(ruta if os.path.isabs(ruta) else pathGen + ruta))
+        self.log(NIVEL_RESUMEN, "[CHECKPOINT] Reanudando desde el ciclo {} ({})", self.ciclo_actual, ruta)
 
     def guardar_memoria_en_archivo(self, ruta):
         """Guarda el contenido de la memoria de datos en un archivo."""
         with open(pathGen+ruta, "w", encoding="utf-8") as f:
             for i, valor in enumerate(self.mem_data.data):
                 f.write(f"[{i:03d}] -> {valor}\n")
-        self.log(f"Estado de memoria escrito en {ruta}")
+        self.log(NIVEL_RESUMEN, "Estado de memoria escrito en {}", ruta)
@@ -0,0 +1,244 @@
+# Evaluación de predictores de saltos dirigida por traza (trace-driven).
+# registrar_saltos corre el programa una sola vez a nivel de ISA (sin pipeline
+# ni latencias) y guarda cada beq dinámico: PC, si se tomó y su destino.
+# evaluar_predictores pasa esa traza por muchas configuraciones de
+# BranchPredictor (estrategia, tamaño de tabla, largo de historia), repartidas
+# en lotes entre procesos, y devuelve la precisión y los fallos cada mil
+# instrucciones (MPKI) de cada una. Cada branch actualiza el predictor apenas se
+# predice y la historia global recibe su dirección real, como queda en el CPU
+# después de reparar un fallo. Los PCs son los del programa sin los NOPs de
+# controlar_hazards (los mismos que ve el CPU con forwarding o interlock).
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import os
+import struct
+import sys
+
+from pipelineEtapas import decodificar_programa, separar_labels, operar_alu
+from pipelineEtapas.decodificador import OP_ALU, OP_ADDI, OP_LW, OP_SW, OP_BEQ, OP_JAL, OP_JALR
+from componentes import Memoria
+from cpuPipelineConPredicciondeSaltos import BranchPredictor
+
+INSTRUCCIONES_MAX_POR_DEFECTO = 1_000_000
+
+_CABECERA = struct.Struct('<4sIQ')  # marca, branches, instrucciones ejecutadas
+_MARCA = b'TRSZ'
+
+
+class TrazaSaltos:
+    """Branches (beq) de una corrida en orden: PC, tomado (0/1) y destino, más las instrucciones ejecutadas."""
+    __slots__ = ('pcs', 'tomados', 'destinos', 'instrucciones')
+
+    def __init__(self):
+        self.pcs = array('l')
+        self.tomados = bytearray()
+        self.destinos = array('l')
+        self.instrucciones = 0
+
+    def agregar(self, pc, tomado, destino):
+        self.pcs.append(pc)
+        self.tomados.append(1 if tomado else 0)
+        self.destinos.append(destino)
+
+    def __len__(self):
+        return len(self.pcs)
+
+    def guardar(self, ruta):
+        """Escribe la traza en binario (cabecera y los tres arreglos seguidos)."""
+        with open(ruta, 'wb') as f:
+            f.write(_CABECERA.pack(_MARCA, len(self.pcs), self.instrucciones))
+            f.write(array('q', self.pcs).tobytes())
+            f.write(bytes(self.tomados))
+            f.write(array('q', self.destinos).tobytes())
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Lee una traza escrita con guardar()."""
+        with open(ruta, 'rb') as f:
+            marca, n, instrucciones = _CABECERA.unpack(f.read(_CABECERA.size))
+            if marca != _MARCA:
+                raise ValueError(f"{ruta} no es una traza de saltos")
+            traza = cls()
+            traza.instrucciones = instrucciones
+            pcs = array('q')
+            pcs.frombytes(f.read(8 * n))
+            traza.pcs = array('l', pcs)
+            traza.tomados = bytearray(f.read(n))
+            destinos = array('q')
+            destinos.frombytes(f.read(8 * n))
+            traza.destinos = array('l', destinos)
+        return traza
+
+
+def registrar_saltos(codigo, max_instrucciones=INSTRUCCIONES_MAX_POR_DEFECTO, tam_memoria=256):
+    """
+    Corre 'codigo' (lista de líneas, con labels) a nivel de ISA con la misma
+    semántica que Execute/Store de los CPU pipeline y devuelve su TrazaSaltos.
+    Se detiene al salir del programa o tras max_instrucciones.
+    """
+    instrucciones, labels = separar_labels(codigo)
+    programa = decodificar_programa(instrucciones, labels)
+    regs = [0] * 32
+    mem = Memoria(tam_memoria)
+    traza = TrazaSaltos()
+    n = len(programa)
+    pc = 0
+    ejecutadas = 0
+    while 0 <= pc < n * 4 and ejecutadas < max_instrucciones:
+        instr = programa[pc // 4]
+        ejecutadas += 1
+        siguiente = pc + 4
+        opcode = instr.opcode
+        escrito = valor = None
+        if opcode == OP_ALU:
+            escrito, valor = instr.rd, operar_alu(instr.mnemonico, regs[instr.rs1], regs[instr.rs2])
+        elif opcode == OP_ADDI:
+            escrito, valor = instr.rd, regs[instr.rs1] + instr.imm
+        elif opcode == OP_LW:
+            try:
+                escrito, valor = instr.rd, mem.leer(regs[instr.rs1] + instr.imm)
+            except IndexError:
+                pass  # Store tampoco escribe el registro
+        elif opcode == OP_SW:
+            try:
+                mem.escribir(regs[instr.rs1] + instr.imm, regs[instr.rs2])
+            except IndexError:
+                pass
+        elif opcode == OP_BEQ:
+            tomado = regs[instr.rs1] == regs[instr.rs2]
+            destino = instr.target if instr.target is not None else pc + 4
+            traza.agregar(pc, tomado, destino)
+            if tomado:
+                siguiente = destino
+        elif opcode == OP_JAL:
+            escrito, valor = instr.rd, pc + 4
+            if instr.target is not None:
+                siguiente = instr.target
+        elif opcode == OP_JALR:
+            siguiente = (regs[instr.rs1] + instr.imm) & ~1
+            escrito, valor = instr.rd, pc + 4
+        if escrito:
+            regs[escrito] = valor
+        pc = siguiente
+    traza.instrucciones = ejecutadas
+    return traza
+
+
+def configuraciones_barrido(strategy, **valores):
+    """
+    Configuraciones de BranchPredictor con todas las combinaciones de 'valores',
+    p. ej. configuraciones_barrido('gshare', bht_size=[256, 1024], history_bits=[4, 8]).
+    """
+    nombres = list(valores)
+    return [dict(strategy=strategy, **dict(zip(nombres, combinacion)))
+            for combinacion in product(*(valores[nombre] for nombre in nombres))]
+
+
+BARRIDO_POR_DEFECTO = (
+    [{'strategy': 'always_taken'}, {'strategy': 'always_not_taken'}]
+    + configuraciones_barrido('bimodal', bht_size=[16, 64, 256, 1024])
+    + configuraciones_barrido('gshare', bht_size=[256, 1024, 4096], history_bits=[4, 8, 12])
+    + configuraciones_barrido('tage', tage_budget_bits=[2048, 8192])
+    + configuraciones_barrido('perceptron', perceptron_history=[8, 16, 24])
+)
+
+
+def evaluar_configuracion(traza, configuracion):
+    """
+    Pasa la traza por un BranchPredictor(**configuracion). Devuelve un dict con
+    la configuración, predicciones, fallos, precisión (%), MPKI y bits.
+    """
+    predictor = BranchPredictor(**configuracion)
+    n = len(traza)
+    if predictor.tabla is None:
+        # Estrategias estáticas: los aciertos se cuentan de una vez
+        tomados = traza.tomados.count(1)
+        if predictor.strategy == 'always_not_taken':
+            aciertos = n - tomados
+        else:
+            aciertos = tomados
+        predictor.predictions = n
+        predictor.correct_predictions = aciertos
+        predictor.mispredictions = n - aciertos
+    else:
+        predecir = predictor.predict
+        actualizar = predictor.update
+        registrar_historia = predictor.registrar_historia
+        for pc, tomado in zip(traza.pcs, traza.tomados):
+            historia = predictor.historia
+            prediccion = predecir(pc)
+            actualizar(pc, tomado, prediccion, historia)
+            registrar_historia(tomado)
+    fallos = predictor.mispredictions
+    return {
+        'configuracion': dict(configuracion),
+        'predicciones': predictor.predictions,
+        'fallos': fallos,
+        'precision': predictor.get_accuracy(),
+        'mpki': 1000 * fallos / traza.instrucciones if traza.instrucciones else 0.0,
+        'bits': predictor.bits(),
+    }
+
+
+_traza_proceso = None  # traza de cada proceso del pool (se manda una sola vez, en el initializer)
+
+
+def _iniciar_proceso(traza):
+    global _traza_proceso
+    _traza_proceso = traza
+
+
+def _evaluar_lote(configuraciones):
+    return [evaluar_configuracion(_traza_proceso, configuracion) for configuracion in configuraciones]
+
+
+def evaluar_predictores(traza, configuraciones=BARRIDO_POR_DEFECTO, procesos=None, lote=None):
+    """
+    Evalúa cada configuración sobre la misma traza; devuelve los resultados en
+    el mismo orden. procesos: tamaño del pool (None = os.cpu_count(); 1 = sin
+    pool, en este proceso). lote: configuraciones por tarea (por defecto, unas
+    cuatro tareas por proceso).
+    """
+    configuraciones = list(configuraciones)
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = min(procesos, len(configuraciones))
+    if procesos <= 1:
+        return [evaluar_configuracion(traza, configuracion) for configuracion in configuraciones]
+    if lote is None:
+        lote = max(1, -(-len(configuraciones) // (4 * procesos)))
+    lotes = [configuraciones[i:i + lote] for i in range(0, len(configuraciones), lote)]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso, initargs=(traza,)) as pool:
+        return [resultado for resultados in pool.map(_evaluar_lote, lotes) for resultado in resultados]
+
+
+def describir_configuracion(configuracion):
+    """'gshare bht_size=256 history_bits=8' para una configuración."""
+    opciones = ' '.join(f"{clave}={valor}" for clave, valor in configuracion.items() if clave != 'strategy')
+    return f"{configuracion.get('strategy', 'always_taken')} {opciones}".strip()
+
+
+def formatear_resultados(resultados, traza=None):
+    """Tabla de texto con una fila por configuración."""
+    filas = []
+    if traza is not None:
+        filas.append(f"Traza: {len(traza)} branches en {traza.instrucciones} instrucciones")
+    filas.append(f"{'Configuración':<40} {'Bits':>8} {'Precisión':>10} {'Fallos':>8} {'MPKI':>8}")
+    for r in resultados:
+        filas.append(f"{describir_configuracion(r['configuracion']):<40} {r['bits']:>8} "
+                     f"{r['precision']:>9.2f}% {r['fallos']:>8} {r['mpki']:>8.2f}")
+    return "\n".join(filas)
+
+
+if __name__ == "__main__":
+    # python evaluacion_predictores.py programa.s [procesos]
+    if len(sys.argv) < 2:
+        print("Uso: python evaluacion_predictores.py <programa> [procesos]")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        codigo = f.read().splitlines()
+    traza = registrar_saltos(codigo)
+    resultados = evaluar_predictores(traza, procesos=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    print(formatear_resultados(resultados, traza))
@@ -409,6 +409,12 @@ elif codigo_pruebas==6:
 # 1-> hazard control 
 # 2-> prediccion de saltos (always_taken)
 # 3-> prediccion de saltos (always_not_taken)
+# 6-> prediccion de saltos con hazard control (bimodal: BHT de contadores de 2 bits)
+# 7-> prediccion de saltos con hazard control (gshare: PC XOR historia global)
+# 8-> prediccion de saltos con hazard control (tage: tablas con tag e historias geométricas)
+# 9-> prediccion de saltos con hazard control (perceptron: pesos por historia global)
+# 10-> prediccion de saltos con hazard control (gshare con BTB y pila de retornos)
+# 11-> prediccion de saltos con hazard control (gshare, saltos resueltos en RegisterFile)
 cpu_testear:int=4
 if(cpu_testear==0):
     cpuPipeline=CPUpipelineNoHazard()
@@ -422,6 +428,18 @@ elif cpu_testear==4:
     cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='always_taken')
 elif cpu_testear==5:
     cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='always_not_taken')
+elif cpu_testear==6:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='bimodal', predictor_opciones={'bht_size': 256})
+elif cpu_testear==7:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='gshare', predictor_opciones={'history_bits': 8})
+elif cpu_testear==8:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='tage', predictor_opciones={'tage_budget_bits': 4096})
+elif cpu_testear==9:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='perceptron', predictor_opciones={'perceptron_history': 16})
+elif cpu_testear==10:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='gshare', predictor_opciones={'btb_size': 64, 'ras_size': 8})
+elif cpu_testear==11:
+    cpuPipeline=CPUPipelinePrediccionSaltosHazardControl(predictor_strategy='gshare', resolucion_temprana=True)
 cpuPipeline.cargarCodigo(riscv_code)
 cpuPipeline.ejecutar()
 
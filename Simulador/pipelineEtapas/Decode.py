@@ -27,6 +27,11 @@ class Decode():
                 return True
         return False
 
+    def avanzar(self, ciclos):
+        """Adelanta 'ciclos' ciclos sin completar la instrucción (kernel por eventos)."""
+        if self.ocupada and self.ciclos_restantes > ciclos:
+            self.ciclos_restantes -= ciclos
+
     def esta_libre(self):
         """Retorna True si la etapa puede recibir una nueva instrucción."""
         return not self.ocupada
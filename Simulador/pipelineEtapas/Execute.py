@@ -1,20 +1,42 @@
 
+from .bitacora import BITACORA_CONSOLA, NIVEL_RESUMEN, NIVEL_CICLO
 from .latencias_config import get_stage_latency, get_instruction_latency
 
+# ALU de las instrucciones R-type: mnemónico -> resultado con los dos operandos
+OPERACIONES_ALU = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'div': lambda a, b: a // b if b != 0 else 0,
+    'xor': lambda a, b: a ^ b,
+    'and': lambda a, b: a & b,
+    'or': lambda a, b: a | b,
+    'slt': lambda a, b: 1 if a < b else 0,
+}
+
+
+def operar_alu(mnemonico, a, b):
+    """Resultado de la ALU para un R-type (0 si el mnemónico no está en OPERACIONES_ALU)."""
+    operacion = OPERACIONES_ALU.get(mnemonico)
+    return operacion(a, b) if operacion is not None else 0
+
+
 class Execute():
-    def __init__(self, mem_data=None):
+    def __init__(self, mem_data=None, bitacora=None):
         self.instruccionEjecutando = ""
         self.params = []
         self.ciclos_restantes = 0
         self.ocupada = False
         self.latencia_base = get_stage_latency('Execute')
         self.mem_data = mem_data if mem_data is not None else None  # Referencia a memoria de datos para lw
+        self.bitacora = bitacora if bitacora is not None else BITACORA_CONSOLA  # Mensajes de la etapa (NIVEL_CICLO)
 
     def cargarInstruccion(self, instruccion, params):
         """Carga una instrucción si la etapa está libre y ejecuta la ALU."""
         if not self.ocupada:
             self.instruccionEjecutando = instruccion
-            self.ciclos_restantes = get_instruction_latency(instruccion.split()[0] if instruccion else 'nop')
+            # La latencia ya viene resuelta en la instrucción decodificada
+            self.ciclos_restantes = instruccion.latencia if instruccion else get_instruction_latency('nop')
             self.ocupada = True
             
             # Ejecutar la ALU usando los params de RegisterFile
@@ -26,29 +48,21 @@ class Execute():
                     accion = params[0]
                     if accion == 'nop':
                         resultado_params = ['nop']
-                        print(f"[EXECUTE] NOP detectado, latencia={self.ciclos_restantes} ciclos")
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] NOP detectado, latencia={} ciclos", self.ciclos_restantes)
                     elif accion == 'alu_op':
                         # Estructura: ['alu_op', opcode, rd, rs1, rs2, val_rs1, val_rs2]
                         opcode, rd, rs1, rs2, val_rs1, val_rs2 = params[1:]
-                        if opcode == 'add': resultado = val_rs1 + val_rs2
-                        elif opcode == 'sub': resultado = val_rs1 - val_rs2
-                        elif opcode == 'mul': resultado = val_rs1 * val_rs2
-                        elif opcode == 'div': resultado = val_rs1 // val_rs2 if val_rs2 != 0 else 0
-                        elif opcode == 'xor': resultado = val_rs1 ^ val_rs2
-                        elif opcode == 'and': resultado = val_rs1 & val_rs2
-                        elif opcode == 'or': resultado = val_rs1 | val_rs2
-                        elif opcode == 'slt': resultado = 1 if val_rs1 < val_rs2 else 0
-                        else: resultado = 0
+                        resultado = operar_alu(opcode, val_rs1, val_rs2)
                         # Pasar a Store: ['reg_write', rd, resultado]
                         resultado_params = ['reg_write', rd, resultado]
-                        print(f"[EXECUTE] ALU: {opcode} x{rd} = {val_rs1} {opcode} {val_rs2} = {resultado}, latencia={self.ciclos_restantes} ciclos")
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] ALU: {} x{} = {} {} {} = {}, latencia={} ciclos", opcode, rd, val_rs1, opcode, val_rs2, resultado, self.ciclos_restantes)
                         
                     elif accion == 'alu_op_imm':
                         # Estructura: ['alu_op_imm', 'addi', rd, rs1, imm, val_rs1]
                         opcode, rd, rs1, imm, val_rs1 = params[1:]
                         resultado = val_rs1 + imm
                         resultado_params = ['reg_write', rd, resultado]
-                        print(f"[EXECUTE] ALU: {opcode} x{rd} = {val_rs1} + {imm} = {resultado}, latencia={self.ciclos_restantes} ciclos")
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] ALU: {} x{} = {} + {} = {}, latencia={} ciclos", opcode, rd, val_rs1, imm, resultado, self.ciclos_restantes)
                         
                     elif accion == 'mem_read':
                         # Estructura: ['mem_read', rd, rs1, offset, val_rs1]
@@ -56,7 +70,7 @@ class Execute():
                         # Calcular dirección (no se lee memoria aún, se hace en Store)
                         addr = val_rs1 + offset
                         resultado_params = ['mem_read_and_reg_write', rd, addr]
-                        print(f"[EXECUTE] ADDR_CALC (lw): addr = x{rs1}({val_rs1}) + {offset} = {addr}, latencia={self.ciclos_restantes} ciclos")
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] ADDR_CALC (lw): addr = x{}({}) + {} = {}, latencia={} ciclos", rs1, val_rs1, offset, addr, self.ciclos_restantes)
                         
                     elif accion == 'mem_write':
                         # Estructura: ['mem_write', rs2, rs1, offset, val_rs1, val_rs2]
@@ -64,11 +78,11 @@ class Execute():
                         # Calcular dirección
                         addr = val_rs1 + offset
                         resultado_params = ['mem_write', addr, val_rs2]
-                        print(f"[EXECUTE] ADDR_CALC (sw): addr = x{rs1}({val_rs1}) + {offset} = {addr}, val = x{rs2}({val_rs2}), latencia={self.ciclos_restantes} ciclos")
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] ADDR_CALC (sw): addr = x{}({}) + {} = {}, val = x{}({}), latencia={} ciclos", rs1, val_rs1, offset, addr, rs2, val_rs2, self.ciclos_restantes)
                     
                     elif accion == 'branch':
-                        # Estructura: ['branch', tipo, rs1, rs2, val_rs1, val_rs2, label_or_offset]
-                        tipo, rs1, rs2, val_rs1, val_rs2, label_or_offset = params[1:]
+                        # Estructura: ['branch', tipo, rs1, rs2, val_rs1, val_rs2, target]
+                        tipo, rs1, rs2, val_rs1, val_rs2, target = params[1:]
                         
                         # Evaluar condición
                         branch_taken = False
@@ -76,29 +90,37 @@ class Execute():
                             branch_taken = (val_rs1 == val_rs2)
                         
                         # Pasar info a Store (para actualizar PC si se toma)
-                        resultado_params = ['branch_result', branch_taken, label_or_offset]
-                        print(f"[EXECUTE] Branch {tipo}: x{rs1}({val_rs1}) vs x{rs2}({val_rs2}), taken={branch_taken}, target={label_or_offset}, latencia={self.ciclos_restantes} ciclos")
+                        resultado_params = ['branch_result', branch_taken, target]
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] Branch {}: x{}({}) vs x{}({}), taken={}, target={}, latencia={} ciclos", tipo, rs1, val_rs1, rs2, val_rs2, branch_taken, target, self.ciclos_restantes)
                     
                     elif accion == 'jump':
-                        # Estructura: ['jump', tipo, rd, label]
-                        tipo, rd, label = params[1:]
+                        # Estructura: ['jump', tipo, rd, target]
+                        tipo, rd, target = params[1:]
                         # jal siempre salta (incondicional) y guarda PC+1 en rd
-                        # Pasar a Store: ['jump_result', rd, label]
-                        resultado_params = ['jump_result', rd, label]
-                        print(f"[EXECUTE] Jump {tipo}: rd=x{rd}, target={label}, latencia={self.ciclos_restantes} ciclos")
+                        # Pasar a Store: ['jump_result', rd, target]
+                        resultado_params = ['jump_result', rd, target]
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] Jump {}: rd=x{}, target={}, latencia={} ciclos", tipo, rd, target, self.ciclos_restantes)
+
+                    elif accion == 'jump_reg':
+                        # Estructura: ['jump_reg', tipo, rd, rs1, imm, val_rs1]
+                        tipo, rd, rs1, imm, val_rs1 = params[1:]
+                        # El destino sale del registro (bit 0 en cero, como RISC-V)
+                        target = (val_rs1 + imm) & ~1
+                        resultado_params = ['jump_result', rd, target]
+                        self.bitacora.log(NIVEL_CICLO, "[EXECUTE] Jump {}: rd=x{}, target = x{}({}) + {} = {}, latencia={} ciclos", tipo, rd, rs1, val_rs1, imm, target, self.ciclos_restantes)
                         
                     else:
                         resultado_params = []
                         
             except Exception as e:
-                print(f"[EXECUTE] Error ejecutando {instruccion}: {e}")
+                self.bitacora.log(NIVEL_RESUMEN, "[EXECUTE] Error ejecutando {}: {}", instruccion, e)
                 resultado_params = []
             
             # Guardar params de resultado para pasarlos a Store
             self.params = resultado_params
             
             if instruccion:
-                print(f"[EXECUTE] Ejecutando en ALU: {instruccion}, latencia={self.ciclos_restantes} ciclos")
+                self.bitacora.log(NIVEL_CICLO, "[EXECUTE] Ejecutando en ALU: {}, latencia={} ciclos", instruccion, self.ciclos_restantes)
 
     def tick(self):
         """Reduce un ciclo. Retorna True si la etapa completó su instrucción."""
@@ -137,6 +159,11 @@ class Execute():
                 return True
         return False
 
+    def avanzar(self, ciclos):
+        """Adelanta 'ciclos' ciclos sin completar la instrucción (kernel por eventos)."""
+        if self.ocupada and self.ciclos_restantes > ciclos:
+            self.ciclos_restantes -= ciclos
+
     def esta_libre(self):
         """Retorna True si la etapa puede recibir una nueva instrucción."""
         return not self.ocupada
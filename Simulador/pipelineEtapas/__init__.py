@@ -3,16 +3,75 @@
 from .Decode import Decode
 from .RegisterFile import RegisterFile
 from .Fetch import Fetch
-from .Execute import Execute
+from .Execute import Execute, OPERACIONES_ALU, operar_alu
 from .EtapaStore import EtapaStore
 from .latencias_config import get_stage_latency, get_instruction_latency
+from .decodificador import InstruccionDecodificada, decodificar_instruccion, decodificar_programa, separar_labels
+from .codificador import (codificar_instruccion, codificar_programa, decodificar_palabra,
+                          desensamblar, DecodificadorPalabras)
+from .planificador import reordenar_programa
+from .bloques import BloqueBasico, construir_bloques, ARISTA_SECUENCIAL, ARISTA_SALTO
+from .eventos import ciclos_hasta_evento, saltar_ciclos_ociosos
+from .ejecucion import (CICLOS_MAX_POR_DEFECTO, FIN_HALT, FIN_PRESUPUESTO, FIN_TRAP, FIN_CANCELADO,
+                        presupuesto_agotado, estado_etapa, restaurar_etapa)
+from .hazards import (POLITICA_NINGUNA, POLITICA_NOPS, POLITICA_FORWARDING, POLITICA_INTERLOCK,
+                      POLITICA_PLANIFICADOR, POLITICAS,
+                      UnidadAdelantamiento, MarcadorRegistros, nops_necesarios, insertar_nops, reubicar_labels)
+from .bitacora import (Bitacora, SalidaArchivo, SalidaConsola, SalidaMemoria, nivel_desde,
+                       NIVEL_APAGADO, NIVEL_RESUMEN, NIVEL_COMMIT, NIVEL_CICLO)
 
 __all__ = [
     "Decode",
     "RegisterFile",
     "Fetch",
     "Execute",
+    "OPERACIONES_ALU",
+    "operar_alu",
     "EtapaStore",
     "get_stage_latency",
     "get_instruction_latency",
+    "InstruccionDecodificada",
+    "decodificar_instruccion",
+    "decodificar_programa",
+    "separar_labels",
+    "codificar_instruccion",
+    "codificar_programa",
+    "decodificar_palabra",
+    "desensamblar",
+    "DecodificadorPalabras",
+    "reordenar_programa",
+    "BloqueBasico",
+    "construir_bloques",
+    "ARISTA_SECUENCIAL",
+    "ARISTA_SALTO",
+    "ciclos_hasta_evento",
+    "saltar_ciclos_ociosos",
+    "CICLOS_MAX_POR_DEFECTO",
+    "FIN_HALT",
+    "FIN_PRESUPUESTO",
+    "FIN_TRAP",
+    "FIN_CANCELADO",
+    "presupuesto_agotado",
+    "estado_etapa",
+    "restaurar_etapa",
+    "POLITICA_NINGUNA",
+    "POLITICA_NOPS",
+    "POLITICA_FORWARDING",
+    "POLITICA_INTERLOCK",
+    "POLITICA_PLANIFICADOR",
+    "POLITICAS",
+    "UnidadAdelantamiento",
+    "MarcadorRegistros",
+    "nops_necesarios",
+    "insertar_nops",
+    "reubicar_labels",
+    "Bitacora",
+    "SalidaArchivo",
+    "SalidaConsola",
+    "SalidaMemoria",
+    "nivel_desde",
+    "NIVEL_APAGADO",
+    "NIVEL_RESUMEN",
+    "NIVEL_COMMIT",
+    "NIVEL_CICLO",
 ]
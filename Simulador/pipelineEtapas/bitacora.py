@@ -0,0 +1,99 @@
+# Bitácora (log) por niveles con formato diferido. Los CPU y las etapas llaman
+# log(nivel, mensaje, *args): si el nivel está apagado o no hay salidas, se
+# retorna sin armar el texto, así con el log apagado el costo por ciclo es solo
+# el de la simulación. 'mensaje' puede ser un formato (str.format) o un callable
+# que devuelve el texto (p. ej. mostrar_estado_pipeline).
+
+NIVEL_APAGADO = 0   # nada
+NIVEL_RESUMEN = 1   # encabezados, programa cargado, totales y estadísticas
+NIVEL_COMMIT = 2    # + instrucciones completadas, escrituras, saltos y flushes
+NIVEL_CICLO = 3     # + estado del pipeline en cada ciclo y mensajes de las etapas
+
+NIVELES = {
+    'off': NIVEL_APAGADO, 'apagado': NIVEL_APAGADO,
+    'summary': NIVEL_RESUMEN, 'resumen': NIVEL_RESUMEN,
+    'per-commit': NIVEL_COMMIT, 'commit': NIVEL_COMMIT,
+    'per-cycle': NIVEL_CICLO, 'ciclo': NIVEL_CICLO,
+}
+
+
+def nivel_desde(nivel):
+    """Acepta el número de nivel o su nombre ('off', 'summary', 'per-commit', 'per-cycle')."""
+    if isinstance(nivel, str):
+        try:
+            return NIVELES[nivel.lower()]
+        except KeyError:
+            raise ValueError(f"Nivel de log desconocido: {nivel!r} (opciones: {', '.join(NIVELES)})")
+    return int(nivel)
+
+
+class SalidaArchivo:
+    """
+    Escribe cada mensaje como una línea en un archivo de texto. Si se escribe
+    después de cerrar() (otro ejecutar() sobre el mismo CPU) se reabre para agregar.
+    """
+    def __init__(self, ruta, modo="w"):
+        self.ruta = ruta
+        self.archivo = open(ruta, modo, encoding="utf-8")
+
+    def escribir(self, texto):
+        if self.archivo.closed:
+            self.archivo = open(self.ruta, "a", encoding="utf-8")
+        self.archivo.write(texto + "\n")
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+class SalidaConsola:
+    """Imprime cada mensaje por stdout."""
+    def escribir(self, texto):
+        print(texto)
+
+    def cerrar(self):
+        pass
+
+
+class SalidaMemoria:
+    """Guarda los mensajes en una lista (pruebas, Front)."""
+    def __init__(self):
+        self.lineas = []
+
+    def escribir(self, texto):
+        self.lineas.append(texto)
+
+    def cerrar(self):
+        pass
+
+
+class Bitacora:
+    """
+    Log con nivel y lista de salidas. Sin salidas (salidas=[]) equivale a 'none':
+    no se formatea nada aunque el nivel lo permita.
+    """
+    def __init__(self, nivel=NIVEL_CICLO, salidas=None):
+        self.nivel = nivel_desde(nivel)
+        self.salidas = list(salidas) if salidas is not None else [SalidaConsola()]
+
+    def activo(self, nivel):
+        return nivel <= self.nivel and bool(self.salidas)
+
+    def log(self, nivel, mensaje, *args):
+        if nivel > self.nivel or not self.salidas:
+            return
+        if callable(mensaje):
+            texto = mensaje()
+        elif args:
+            texto = mensaje.format(*args)
+        else:
+            texto = mensaje
+        for salida in self.salidas:
+            salida.escribir(texto)
+
+    def cerrar(self):
+        for salida in self.salidas:
+            salida.cerrar()
+
+
+# Bitácora por defecto de las etapas (mismo comportamiento que los print originales)
+BITACORA_CONSOLA = Bitacora(NIVEL_CICLO, [SalidaConsola()])
@@ -0,0 +1,90 @@
+# Bloques básicos y grafo de flujo de control (CFG) de un programa ya
+# decodificado (PC = índice * 4, como queda en cargarCodigo). Un bloque empieza
+# en la primera instrucción, en cada destino de un beq/jal y en la instrucción
+# que sigue a un beq/jal/jalr; termina en un salto o justo antes del siguiente
+# inicio. Las aristas guardan su tipo: la secuencial (sin salto, o beq no
+# tomado), la de salto (beq tomado o jal) y la de retorno (de cada jalr x0 a
+# cada instrucción que sigue a un jal con rd != x0, adonde puede volver una
+# llamada). Ni jal ni jalr tienen arista secuencial; un jalr que no es retorno
+# no tiene sucesores conocidos.
+
+from .decodificador import OP_BEQ, OP_JAL, OP_JALR
+
+ARISTA_SECUENCIAL = 'secuencial'
+ARISTA_SALTO = 'salto'
+ARISTA_RETORNO = 'retorno'
+
+
+class BloqueBasico:
+    """Instrucciones [inicio, fin) del programa y sus aristas del CFG."""
+    __slots__ = ('indice', 'inicio', 'fin', 'predecesores', 'sucesores')
+
+    def __init__(self, indice, inicio, fin):
+        self.indice = indice
+        self.inicio = inicio
+        self.fin = fin
+        self.predecesores = []  # (bloque, tipo de arista)
+        self.sucesores = []     # (bloque, tipo de arista)
+
+    def __len__(self):
+        return self.fin - self.inicio
+
+    def __repr__(self):
+        return f"BloqueBasico({self.indice}, [{self.inicio}, {self.fin}))"
+
+
+def _destino(instr, n):
+    """Índice de la instrucción destino de un salto, o None si no cae dentro del programa."""
+    if instr.target is None or instr.target % 4:
+        return None
+    destino = instr.target // 4
+    return destino if 0 <= destino < n else None
+
+
+def construir_bloques(programa):
+    """
+    Parte 'programa' (lista de InstruccionDecodificada) en bloques básicos y los
+    conecta. Devuelve la lista de bloques en el orden del texto.
+    """
+    n = len(programa)
+    if n == 0:
+        return []
+    inicios = {0}
+    retornos = []  # instrucciones que siguen a una llamada (jal con rd != x0)
+    for i, instr in enumerate(programa):
+        if instr.opcode == OP_BEQ or instr.opcode == OP_JAL:
+            if i + 1 < n:
+                inicios.add(i + 1)
+                if instr.opcode == OP_JAL and instr.rd:
+                    retornos.append(i + 1)
+            destino = _destino(instr, n)
+            if destino is not None:
+                inicios.add(destino)
+        elif instr.opcode == OP_JALR and i + 1 < n:
+            inicios.add(i + 1)
+
+    orden = sorted(inicios)
+    bloques = []
+    bloque_de = {}  # índice de la primera instrucción -> bloque
+    for k, inicio in enumerate(orden):
+        fin = orden[k + 1] if k + 1 < len(orden) else n
+        bloque = BloqueBasico(k, inicio, fin)
+        bloques.append(bloque)
+        bloque_de[inicio] = bloque
+
+    def conectar(origen, destino, tipo):
+        origen.sucesores.append((destino, tipo))
+        destino.predecesores.append((origen, tipo))
+
+    for k, bloque in enumerate(bloques):
+        ultima = programa[bloque.fin - 1]
+        if ultima.opcode != OP_JAL and ultima.opcode != OP_JALR and k + 1 < len(bloques):
+            conectar(bloque, bloques[k + 1], ARISTA_SECUENCIAL)
+        if ultima.opcode == OP_BEQ or ultima.opcode == OP_JAL:
+            destino = _destino(ultima, n)
+            if destino is not None:
+                conectar(bloque, bloque_de[destino], ARISTA_SALTO)
+        elif ultima.opcode == OP_JALR and ultima.rd == 0:
+            for retorno in retornos:
+                conectar(bloque, bloque_de[retorno], ARISTA_RETORNO)
+    return bloques
@@ -0,0 +1,229 @@
+# Codificación binaria RV32I (+ mul/div de la extensión M) de las instrucciones
+# decodificadas, y decodificador por campos de bits usado al hacer Fetch.
+
+from .latencias_config import get_instruction_latency
+from .decodificador import (InstruccionDecodificada, OP_DESCONOCIDO, OP_NOP, OP_ALU,
+                            OP_ADDI, OP_LW, OP_SW, OP_BEQ, OP_JAL, OP_JALR)
+
+# Campos opcode (bits 6..0)
+OPCODE_OP = 0b0110011       # R-type
+OPCODE_OP_IMM = 0b0010011   # addi
+OPCODE_LOAD = 0b0000011     # lw
+OPCODE_STORE = 0b0100011    # sw
+OPCODE_BRANCH = 0b1100011   # beq
+OPCODE_JAL = 0b1101111      # jal
+OPCODE_JALR = 0b1100111     # jalr
+
+PALABRA_NOP = 0x00000013    # addi x0, x0, 0
+PALABRA_ILEGAL = 0x00000000 # instrucción ilegal: opcodes no soportados, directivas, pseudo-instrucciones
+
+# mnemónico -> (funct7, funct3)
+FUNCT_ALU = {
+    'add': (0b0000000, 0b000),
+    'sub': (0b0100000, 0b000),
+    'slt': (0b0000000, 0b010),
+    'xor': (0b0000000, 0b100),
+    'or':  (0b0000000, 0b110),
+    'and': (0b0000000, 0b111),
+    'mul': (0b0000001, 0b000),
+    'div': (0b0000001, 0b100),
+}
+ALU_POR_FUNCT = {funct: mnem for mnem, funct in FUNCT_ALU.items()}
+
+
+def _rango(valor, bits):
+    """Inmediato con signo como campo de 'bits' bits, o None si no entra."""
+    limite = 1 << (bits - 1)
+    if not -limite <= valor < limite:
+        return None
+    return valor & ((1 << bits) - 1)
+
+
+def codificar_instruccion(instr):
+    """
+    Codifica un InstruccionDecodificada como palabra de 32 bits.
+    Lo que no tiene codificación (inmediato u offset fuera de rango, target sin
+    resolver, registro inválido) se ensambla como PALABRA_ILEGAL; Fetch ejecuta
+    igual esas instrucciones a partir del registro decodificado (ver DecodificadorPalabras).
+    """
+    op = instr.opcode
+    if op == OP_NOP:
+        return PALABRA_NOP
+    if op == OP_DESCONOCIDO:
+        return PALABRA_ILEGAL
+
+    rd, rs1, rs2 = instr.rd, instr.rs1, instr.rs2
+    if not all(0 <= r < 32 for r in (rd, rs1, rs2)):
+        return PALABRA_ILEGAL
+
+    if op == OP_ALU:
+        funct7, funct3 = FUNCT_ALU[instr.mnemonico]
+        return (funct7 << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | OPCODE_OP
+
+    if op in (OP_ADDI, OP_LW, OP_JALR):
+        imm = _rango(instr.imm, 12)
+        if imm is None:
+            return PALABRA_ILEGAL
+        funct3, opcode = {OP_ADDI: (0b000, OPCODE_OP_IMM), OP_LW: (0b010, OPCODE_LOAD),
+                          OP_JALR: (0b000, OPCODE_JALR)}[op]
+        return (imm << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+    if op == OP_SW:
+        imm = _rango(instr.imm, 12)
+        if imm is None:
+            return PALABRA_ILEGAL
+        return (((imm >> 5) << 25) | (rs2 << 20) | (rs1 << 15) | (0b010 << 12)
+                | ((imm & 0x1F) << 7) | OPCODE_STORE)
+
+    if instr.target is None:
+        return PALABRA_ILEGAL
+    offset = instr.target - instr.pc
+
+    if op == OP_BEQ:
+        imm = _rango(offset, 13)
+        if imm is None:
+            return PALABRA_ILEGAL
+        return ((((imm >> 12) & 1) << 31) | (((imm >> 5) & 0x3F) << 25) | (rs2 << 20)
+                | (rs1 << 15) | (0b000 << 12) | (((imm >> 1) & 0xF) << 8)
+                | (((imm >> 11) & 1) << 7) | OPCODE_BRANCH)
+
+    if op == OP_JAL:
+        imm = _rango(offset, 21)
+        if imm is None:
+            return PALABRA_ILEGAL
+        return ((((imm >> 20) & 1) << 31) | (((imm >> 1) & 0x3FF) << 21)
+                | (((imm >> 11) & 1) << 20) | (((imm >> 12) & 0xFF) << 12)
+                | (rd << 7) | OPCODE_JAL)
+
+    return PALABRA_ILEGAL
+
+
+def codificar_programa(programa):
+    """Codifica una lista de instrucciones decodificadas (ver decodificar_programa)."""
+    return [codificar_instruccion(instr) for instr in programa]
+
+
+def _signo(valor, bits):
+    """Extiende el signo de un campo de 'bits' bits."""
+    return valor - (1 << bits) if valor & (1 << (bits - 1)) else valor
+
+
+def decodificar_palabra(palabra, pc=0, texto=None):
+    """
+    Decodifica una palabra de 32 bits por campos de bits.
+    'texto' es la línea fuente (si existe) que se usa para mostrar la instrucción;
+    si no se da, se genera con desensamblar().
+    """
+    opcode = palabra & 0x7F
+    rd = (palabra >> 7) & 0x1F
+    funct3 = (palabra >> 12) & 0x7
+    rs1 = (palabra >> 15) & 0x1F
+    rs2 = (palabra >> 20) & 0x1F
+    funct7 = palabra >> 25
+
+    instr = InstruccionDecodificada(texto, pc=pc)
+
+    if palabra == PALABRA_NOP:
+        instr.opcode, instr.mnemonico = OP_NOP, 'nop'
+
+    elif opcode == OPCODE_OP and (funct7, funct3) in ALU_POR_FUNCT:
+        instr.opcode, instr.mnemonico = OP_ALU, ALU_POR_FUNCT[(funct7, funct3)]
+        instr.rd, instr.rs1, instr.rs2 = rd, rs1, rs2
+
+    elif opcode == OPCODE_OP_IMM and funct3 == 0b000:
+        instr.opcode, instr.mnemonico = OP_ADDI, 'addi'
+        instr.rd, instr.rs1, instr.imm = rd, rs1, _signo(palabra >> 20, 12)
+
+    elif opcode == OPCODE_LOAD and funct3 == 0b010:
+        instr.opcode, instr.mnemonico = OP_LW, 'lw'
+        instr.rd, instr.rs1, instr.imm = rd, rs1, _signo(palabra >> 20, 12)
+
+    elif opcode == OPCODE_STORE and funct3 == 0b010:
+        instr.opcode, instr.mnemonico = OP_SW, 'sw'
+        instr.rs1, instr.rs2 = rs1, rs2
+        instr.imm = _signo(((palabra >> 25) << 5) | rd, 12)
+
+    elif opcode == OPCODE_BRANCH and funct3 == 0b000:
+        instr.opcode, instr.mnemonico = OP_BEQ, 'beq'
+        instr.rs1, instr.rs2 = rs1, rs2
+        imm = ((((palabra >> 31) & 1) << 12) | (((palabra >> 7) & 1) << 11)
+               | (((palabra >> 25) & 0x3F) << 5) | (((palabra >> 8) & 0xF) << 1))
+        instr.target = pc + _signo(imm, 13)
+
+    elif opcode == OPCODE_JAL:
+        instr.opcode, instr.mnemonico = OP_JAL, 'jal'
+        instr.rd = rd
+        imm = ((((palabra >> 31) & 1) << 20) | (((palabra >> 12) & 0xFF) << 12)
+               | (((palabra >> 20) & 1) << 11) | (((palabra >> 21) & 0x3FF) << 1))
+        instr.target = pc + _signo(imm, 21)
+
+    elif opcode == OPCODE_JALR and funct3 == 0b000:
+        instr.opcode, instr.mnemonico = OP_JALR, 'jalr'
+        instr.rd, instr.rs1, instr.imm = rd, rs1, _signo(palabra >> 20, 12)
+
+    if instr.opcode != OP_DESCONOCIDO:
+        instr.latencia = get_instruction_latency(instr.mnemonico)
+    elif texto:
+        # Directivas / pseudo-instrucciones: se conserva la latencia que daría el texto
+        instr.latencia = get_instruction_latency(texto.split()[0])
+
+    if texto is None:
+        instr.texto = desensamblar(instr)
+    return instr
+
+
+def desensamblar(instr):
+    """Genera el texto ensamblador de una instrucción decodificada (targets como offset)."""
+    op = instr.opcode
+    if op == OP_NOP:
+        return "nop"
+    if op == OP_ALU:
+        return f"{instr.mnemonico} x{instr.rd}, x{instr.rs1}, x{instr.rs2}"
+    if op == OP_ADDI:
+        return f"addi x{instr.rd}, x{instr.rs1}, {instr.imm}"
+    if op == OP_LW:
+        return f"lw x{instr.rd}, {instr.imm}(x{instr.rs1})"
+    if op == OP_SW:
+        return f"sw x{instr.rs2}, {instr.imm}(x{instr.rs1})"
+    if op == OP_BEQ:
+        return f"beq x{instr.rs1}, x{instr.rs2}, {(instr.target - instr.pc) // 4}"
+    if op == OP_JAL:
+        return f"jal x{instr.rd}, {(instr.target - instr.pc) // 4}"
+    if op == OP_JALR:
+        return f"jalr x{instr.rd}, x{instr.rs1}, {instr.imm}"
+    return "unimp"
+
+
+class DecodificadorPalabras:
+    """
+    Decodificador usado por Fetch: recibe la palabra leída de la memoria de
+    instrucciones y devuelve la instrucción decodificada. Guarda una entrada por
+    PC y solo vuelve a decodificar si la palabra en ese PC cambió.
+    'programa' son los registros decodificados del texto: para las instrucciones
+    que se ensamblaron como PALABRA_ILEGAL (sin codificación) se devuelve ese
+    registro, así se ejecutan igual que antes de pasar por la memoria.
+    """
+    def __init__(self, listado=None, palabras=None, programa=None):
+        # Texto fuente por índice (para logs); solo se usa mientras la palabra
+        # en memoria siga siendo la que se ensambló a partir de ese texto.
+        self.listado = listado if listado is not None else []
+        self.palabras = palabras if palabras is not None else []
+        self.programa = programa if programa is not None else []
+        self.cache = {}  # pc -> (palabra, InstruccionDecodificada)
+
+    def decodificar(self, pc, palabra):
+        entrada = self.cache.get(pc)
+        if entrada is not None and entrada[0] == palabra:
+            return entrada[1]
+        idx = pc // 4
+        texto = None
+        original = idx < len(self.palabras) and self.palabras[idx] == palabra
+        if original and palabra == PALABRA_ILEGAL and idx < len(self.programa):
+            instr = self.programa[idx]
+            self.cache[pc] = (palabra, instr)
+            return instr
+        if original and idx < len(self.listado):
+            texto = self.listado[idx]
+        instr = decodificar_palabra(palabra, pc, texto)
+        self.cache[pc] = (palabra, instr)
+        return instr
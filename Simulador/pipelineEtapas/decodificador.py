@@ -0,0 +1,153 @@
+# Decodificación única del programa en registros compactos.
+# cargarCodigo decodifica cada instrucción una sola vez y las etapas del
+# pipeline se pasan estos registros en lugar de volver a parsear el texto.
+
+from .latencias_config import get_instruction_latency
+
+# Identificadores de opcode
+OP_DESCONOCIDO = 0
+OP_NOP = 1
+OP_ALU = 2       # add, sub, mul, div, xor, and, or, slt
+OP_ADDI = 3
+OP_LW = 4
+OP_SW = 5
+OP_BEQ = 6
+OP_JAL = 7
+OP_JALR = 8
+
+OPCODES_ALU = ('add', 'sub', 'mul', 'div', 'xor', 'and', 'or', 'slt')
+
+
+class InstruccionDecodificada:
+    """Instrucción ya decodificada: opcode, registros, inmediato, target y latencia."""
+    __slots__ = ('opcode', 'mnemonico', 'rd', 'rs1', 'rs2', 'imm',
+                 'target', 'latencia', 'pc', 'texto')
+
+    def __init__(self, texto, pc=0, opcode=OP_DESCONOCIDO, mnemonico='',
+                 rd=0, rs1=0, rs2=0, imm=0, target=None, latencia=1):
+        self.texto = texto
+        self.pc = pc
+        self.opcode = opcode
+        self.mnemonico = mnemonico
+        self.rd = rd
+        self.rs1 = rs1
+        self.rs2 = rs2
+        self.imm = imm
+        self.target = target        # PC destino resuelto (beq/jal), None si no aplica
+        self.latencia = latencia    # Latencia de Execute para esta instrucción
+
+    def __str__(self):
+        return self.texto
+
+    def __repr__(self):
+        return f"InstruccionDecodificada({self.texto!r}, pc={self.pc})"
+
+
+def _resolver_target(destino, pc, labels):
+    """Resuelve un label o un offset numérico (en instrucciones) a un PC."""
+    if destino in labels:
+        return labels[destino]
+    try:
+        return pc + int(destino) * 4
+    except ValueError:
+        return None
+
+
+def decodificar_instruccion(texto, pc=0, labels=None):
+    """Decodifica una instrucción de texto en un InstruccionDecodificada."""
+    labels = labels if labels is not None else {}
+    partes_lat = texto.split()
+    latencia = get_instruction_latency(partes_lat[0] if partes_lat else 'nop')
+    instr = InstruccionDecodificada(texto, pc=pc, latencia=latencia)
+
+    partes = texto.replace(',', '').split()
+    opcode = partes[0] if partes else ''
+    instr.mnemonico = opcode
+    try:
+        if opcode == 'nop':
+            instr.opcode = OP_NOP
+
+        elif opcode in OPCODES_ALU:
+            # Format: add rd, rs1, rs2
+            instr.rd = int(partes[1][1:]) if len(partes) > 1 else 0
+            instr.rs1 = int(partes[2][1:]) if len(partes) > 2 else 0
+            instr.rs2 = int(partes[3][1:]) if len(partes) > 3 else 0
+            instr.opcode = OP_ALU
+
+        elif opcode == 'addi':
+            # Format: addi rd, rs1, imm
+            instr.rd = int(partes[1][1:]) if len(partes) > 1 else 0
+            instr.rs1 = int(partes[2][1:]) if len(partes) > 2 else 0
+            instr.imm = int(partes[3]) if len(partes) > 3 else 0
+            instr.opcode = OP_ADDI
+
+        elif opcode in ('lw', 'sw'):
+            # Format: lw rd, offset(rs1) / sw rs2, offset(rs1)
+            reg = int(partes[1][1:]) if len(partes) > 1 else 0
+            offset_reg = partes[2] if len(partes) > 2 else '0(x0)'
+            offset, rs1 = offset_reg.split('(')
+            instr.imm = int(offset)
+            instr.rs1 = int(rs1[1:-1])
+            if opcode == 'lw':
+                instr.rd = reg
+                instr.opcode = OP_LW
+            else:
+                instr.rs2 = reg
+                instr.opcode = OP_SW
+
+        elif opcode == 'beq':
+            # Format: beq rs1, rs2, label/offset
+            instr.rs1 = int(partes[1][1:]) if len(partes) > 1 else 0
+            instr.rs2 = int(partes[2][1:]) if len(partes) > 2 else 0
+            instr.target = _resolver_target(partes[3] if len(partes) > 3 else '0', pc, labels)
+            instr.opcode = OP_BEQ
+
+        elif opcode == 'jal':
+            # Format: jal rd, label
+            instr.rd = int(partes[1][1:]) if len(partes) > 1 else 0
+            instr.target = _resolver_target(partes[2] if len(partes) > 2 else '0', pc, labels)
+            instr.opcode = OP_JAL
+
+        elif opcode == 'jalr':
+            # Format: jalr rd, rs1, imm (destino = rs1 + imm, se conoce recién en Execute)
+            instr.rd = int(partes[1][1:]) if len(partes) > 1 else 0
+            instr.rs1 = int(partes[2][1:]) if len(partes) > 2 else 0
+            instr.imm = int(partes[3]) if len(partes) > 3 else 0
+            instr.opcode = OP_JALR
+
+    except (ValueError, IndexError):
+        # Parámetros inválidos: se trata como instrucción desconocida
+        instr.opcode = OP_DESCONOCIDO
+        instr.rd = instr.rs1 = instr.rs2 = instr.imm = 0
+        instr.target = None
+
+    return instr
+
+
+def decodificar_programa(codigo, labels=None):
+    """Decodifica la lista de instrucciones una sola vez (PC = índice * 4)."""
+    return [decodificar_instruccion(texto, idx * 4, labels) for idx, texto in enumerate(codigo)]
+
+
+def separar_labels(codigo):
+    """
+    Filtra comentarios y líneas vacías de 'codigo' (lista de líneas) y detecta
+    los labels. Devuelve (instrucciones, {label: PC}); el PC de un label es el
+    de la instrucción que lo sigue.
+    """
+    instrucciones = []
+    labels = {}
+    for linea in codigo:
+        linea = linea.split("#")[0].strip()
+        if linea:
+            # Detectar labels (formato: "label:")
+            if ':' in linea and not '(' in linea:  # Evitar confusión con offset(reg)
+                label_name = linea.split(':')[0].strip()
+                labels[label_name] = len(instrucciones) * 4  # PC en múltiplos de 4
+                # Si hay instrucción después del label en la misma línea
+                resto = linea.split(':', 1)[1].strip()
+                if resto:
+                    instrucciones.append(resto)
+            else:
+                instrucciones.append(linea)
+    return instrucciones, labels
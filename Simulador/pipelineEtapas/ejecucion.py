@@ -0,0 +1,34 @@
+# Presupuesto de ejecución y estado de las etapas para los CPU pipeline.
+# ejecutar() corre hasta que el programa termina (halt), se agota el
+# presupuesto de ciclos/instrucciones (budget), un ciclo lanza una
+# excepción (trap) o se pide cpu.detener() desde otro hilo (cancelled); el
+# motivo queda en cpu.motivo_fin.
+
+CICLOS_MAX_POR_DEFECTO = 1000  # Límite histórico de ejecutar(); None = sin límite
+
+FIN_HALT = 'halt'          # programa terminado y pipeline vacío
+FIN_PRESUPUESTO = 'budget'  # se alcanzó max_ciclos o max_instrucciones
+FIN_TRAP = 'trap'          # excepción durante un ciclo
+FIN_CANCELADO = 'cancelled'  # se llamó detener() durante la corrida
+
+
+def presupuesto_agotado(ciclo, completadas, max_ciclos, max_instrucciones):
+    """True si ya se alcanzó el límite de ciclos o de instrucciones completadas (None = sin límite)."""
+    return ((max_ciclos is not None and ciclo >= max_ciclos) or
+            (max_instrucciones is not None and completadas >= max_instrucciones))
+
+
+def estado_etapa(etapa):
+    """
+    Contenido de una etapa en forma serializable: (PC de la instrucción o None si
+    está vacía, params, ciclos restantes, ocupada).
+    """
+    instr = etapa.instruccionEjecutando
+    return (None if instr == "" else instr.pc, list(etapa.params), etapa.ciclos_restantes, etapa.ocupada)
+
+
+def restaurar_etapa(etapa, estado, instruccion_en):
+    """Inverso de estado_etapa; instruccion_en(pc) devuelve la instrucción decodificada de ese PC."""
+    pc, params, etapa.ciclos_restantes, etapa.ocupada = estado
+    etapa.instruccionEjecutando = "" if pc is None else instruccion_en(pc)
+    etapa.params = list(params)
@@ -0,0 +1,64 @@
+# Kernel por eventos: en lugar de hacer tick() ciclo a ciclo mientras el
+# pipeline solo espera (p. ej. un div de 10 ciclos en Execute), se calcula el
+# ciclo en que la próxima etapa queda lista y se adelanta el reloj hasta ahí.
+# El resultado (ciclos totales, registros, memoria) es idéntico al de tick().
+# Una etapa que terminó solo cuenta como evento si la siguiente puede recibirla
+# según el mismo criterio que usa tick() (el _libre de cada CPU): con forwarding,
+# interlock y los CPU con control de hazards cada etapa retiene la instrucción
+# terminada, así que detrás de un div no se mueve nada hasta que este termina.
+
+
+def _no_ocupada(etapa):
+    return not etapa.ocupada
+
+
+def ciclos_hasta_evento(etapas, fetch_pendiente, libre=_no_ocupada):
+    """
+    Cantidad de ticks que se pueden saltar sin que cambie nada salvo los
+    contadores de ciclos restantes.
+    'etapas' va en orden del pipeline (Fetch, Decode, RegisterFile, Execute, Store).
+    'libre(etapa)': True si la etapa puede recibir una instrucción (por defecto,
+    si no está ocupada).
+    Retorna 0 si el próximo tick hace algo (o el pipeline está vacío), o None
+    si hay etapas ocupadas pero ninguna va a progresar nunca (pipeline trabado).
+    """
+    if fetch_pendiente and libre(etapas[0]):
+        return 0  # Fetch carga una instrucción en el próximo tick
+
+    faltan = None
+    ocupadas = False
+    ultima = len(etapas) - 1
+    for i, etapa in enumerate(etapas):
+        if etapa.ocupada:
+            ocupadas = True
+            if etapa.ciclos_restantes > 0:
+                # La etapa queda lista en el tick número 'ciclos_restantes'
+                listo_en = etapa.ciclos_restantes - 1
+                if faltan is None or listo_en < faltan:
+                    faltan = listo_en
+        elif etapa.instruccionEjecutando != "":
+            # Completada esperando: Store se procesa siempre, el resto pasa si la siguiente está libre
+            if i == ultima or libre(etapas[i + 1]):
+                return 0
+    if not ocupadas:
+        return 0
+    return faltan
+
+
+def saltar_ciclos_ociosos(etapas, fetch_pendiente, limite, libre=_no_ocupada):
+    """
+    Adelanta las etapas hasta el próximo evento (como máximo 'limite' ciclos,
+    None = sin límite). Retorna cuántos ciclos se saltaron; el llamador suma
+    eso a su ciclo_actual. Retorna None si el pipeline está trabado (ver
+    ciclos_hasta_evento): el llamador lo reporta en vez de seguir haciendo tick().
+    """
+    faltan = ciclos_hasta_evento(etapas, fetch_pendiente, libre)
+    if faltan is None:
+        return None
+    if limite is not None and faltan > limite:
+        faltan = limite
+    if not faltan or faltan < 0:
+        return 0
+    for etapa in etapas:
+        etapa.avanzar(faltan)
+    return faltan
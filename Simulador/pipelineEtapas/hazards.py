@@ -0,0 +1,387 @@
+# Políticas de hazards de datos de los CPU pipeline y unidad de adelantamiento
+# (forwarding). Sin forwarding, RegisterFile lee self.regs al recibir la
+# instrucción y la corrección depende de los NOPs de controlar_hazards. Con
+# POLITICA_FORWARDING el programa no se modifica: al pasar de RegisterFile a
+# Execute los operandos se toman del resultado que está en los latches de
+# Execute/Store (el más nuevo primero) o, si nadie lo va a escribir, del banco
+# de registros ya actualizado. Un load todavía en Store no tiene el dato (la
+# memoria se lee al completar Store), así que el consumidor espera un ciclo.
+# Con POLITICA_INTERLOCK tampoco hay NOPs: un marcador (scoreboard) lleva los
+# registros destino de las instrucciones en vuelo y Decode no entrega a
+# RegisterFile una instrucción que lea uno de ellos hasta que su productor
+# complete Store. Así se espera exactamente lo que tarda cada productor en esa
+# corrida (latencias de latencias_config, caminos reales de los saltos).
+
+from collections import deque
+
+from .decodificador import OP_ALU, OP_ADDI, OP_LW, OP_SW, OP_BEQ, OP_JAL, OP_JALR, decodificar_instruccion
+from .latencias_config import INSTRUCTION_LATENCIES, get_stage_latency, get_instruction_latency
+from .bloques import construir_bloques, ARISTA_SECUENCIAL, ARISTA_RETORNO
+
+POLITICA_NINGUNA = 'none'           # sin control (SinHazards, ConPrediccion)
+POLITICA_NOPS = 'nops'              # controlar_hazards inserta NOPs (HazardControl)
+POLITICA_FORWARDING = 'forwarding'  # adelantamiento desde Execute/Store, sin NOPs
+POLITICA_INTERLOCK = 'interlock'    # marcador de registros: stall en Decode → RegisterFile, sin NOPs
+POLITICA_PLANIFICADOR = 'schedule'  # reordena cada bloque (planificador.py) y pone NOPs donde no alcanza
+
+POLITICAS = (POLITICA_NINGUNA, POLITICA_NOPS, POLITICA_FORWARDING, POLITICA_INTERLOCK, POLITICA_PLANIFICADOR)
+
+# (posición del registro fuente, posición de su valor) en los params que
+# RegisterFile pasa a Execute, por acción
+OPERANDOS = {
+    'alu_op': ((3, 5), (4, 6)),      # ['alu_op', op, rd, rs1, rs2, v1, v2]
+    'alu_op_imm': ((3, 5),),         # ['alu_op_imm', 'addi', rd, rs1, imm, v1]
+    'mem_read': ((2, 4),),           # ['mem_read', rd, rs1, off, v1]
+    'mem_write': ((2, 4), (1, 5)),   # ['mem_write', rs2, rs1, off, v1, v2]
+    'branch': ((2, 4), (3, 5)),      # ['branch', 'beq', rs1, rs2, v1, v2, target]
+    'jump_reg': ((3, 5),),           # ['jump_reg', 'jalr', rd, rs1, imm, v1]
+}
+
+
+# Estado del pipeline que ve la primera instrucción de un bloque: ciclos en que
+# la instrucción anterior entró a Decode, RegisterFile, Execute y Store, y
+# pares (registro, ciclo en que su último escritor completa Store), todo
+# relativo a esa entrada a Decode. _VACIO: nada en vuelo (inicio del programa o
+# flush). Un bloque puede tener varios estados de entrada (uno por camino).
+_VACIO = ((0, 0, 0, 0), ())
+_SOLO_VACIO = frozenset((_VACIO,))
+
+
+def _unir(a, b):
+    """
+    Estados de entrada de dos conjuntos de aristas (None: todavía sin calcular).
+    Los tiempos de un estado no se mezclan con los registros de otro, porque cada
+    camino los mide desde su propia última instrucción. Un flush (_VACIO) no pide
+    más NOPs que un pipeline con instrucciones en vuelo, así que se descarta si hay otro.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    estados = a | b
+    if len(estados) > 1:
+        estados = estados - {_VACIO}
+    return estados
+
+
+def nops_necesarios(codigo, labels=None, salto_especulativo=False, destino_predicho=False):
+    """
+    NOPs mínimos antes de cada instrucción de 'codigo' (texto, sin labels) para
+    que ninguna llegue a RegisterFile antes de que su productor complete Store.
+
+    Dentro de cada bloque básico (bloques.construir_bloques) se lleva el ciclo
+    en que la instrucción anterior entró a Decode, RegisterFile, Execute y Store
+    (cada etapa retiene la instrucción hasta que la siguiente se libera) y una
+    tabla registro -> ciclo en que su último escritor lo deja en el banco. Las
+    latencias salen de latencias_config (Execute según la instrucción).
+
+    Un bloque arranca con el peor caso entre sus predecesores. Por la arista
+    secuencial llega lo que dejó la instrucción anterior del texto. Un salto
+    tomado se resuelve en Store con flush, así que por esa arista no llega nada
+    en vuelo, salvo con salto_especulativo=True: en los CPU con predicción el
+    destino de un beq entra detrás del salto. Con destino_predicho=True (BTB y
+    pila de retornos, o saltos resueltos en RegisterFile) también el de un jal,
+    y un retorno llega a la instrucción que sigue a su jal detrás del jalr; como
+    vuelve a la dirección del jal + 4, pasa por los NOPs antes del label igual
+    que la arista secuencial. Se itera hasta que ningún bloque cambia (los lazos
+    se recorren más de una vez).
+
+    Devuelve (nops, relleno): nops[i] NOPs antes de la instrucción i, de los
+    cuales relleno[i] van antes de su label. Esos solo los ejecuta quien llega
+    por la instrucción anterior; quien salta al label no los paga.
+    """
+    lat_fetch = get_stage_latency('Fetch')
+    lat_decode = get_stage_latency('Decode')
+    lat_rf = get_stage_latency('RegisterFile')
+    lat_store = get_stage_latency('Store')
+    perfil_nop = ((), 0, get_instruction_latency('nop'))
+    # Más allá de esto ningún NOP antes del label cambia lo que pasa en el bloque
+    horizonte = lat_fetch + lat_decode + lat_rf + lat_store + max(INSTRUCTION_LATENCIES.values(), default=1)
+
+    cache = {}     # texto -> (instrucción decodificada, perfil)
+    programa = []
+    perfiles = []  # (registros leídos, registro escrito, latencia de Execute) por instrucción
+    for i, texto in enumerate(codigo):
+        guardado = cache.get(texto)
+        if guardado is None:
+            instr = decodificar_instruccion(texto, i * 4, labels)
+            guardado = (instr, (registros_leidos(instr), registro_escrito(instr), instr.latencia))
+            if instr.opcode != OP_BEQ and instr.opcode != OP_JAL:
+                cache[texto] = guardado  # sin destino: no depende del PC
+        programa.append(guardado[0])
+        perfiles.append(guardado[1])
+
+    def planificar(estado, perfiles_bloque, minimos):
+        """NOPs (al menos minimos[k]) antes de cada instrucción del bloque y estado a la salida."""
+        (decode, rf, execute, store), listo = estado
+        listo = dict(listo)
+        nops = []
+        for k, (leidos, escrito, latencia) in enumerate(perfiles_bloque):
+            necesario = 0
+            for rs in leidos:
+                if rs in listo and listo[rs] > necesario:
+                    necesario = listo[rs]
+            minimo = minimos[k] if minimos else 0
+            agregados = 0
+            while True:
+                # Fetch recibe la instrucción cuando la anterior pasa a Decode
+                d = decode + lat_fetch
+                if d < rf:
+                    d = rf
+                r = d + lat_decode
+                if r < execute:
+                    r = execute
+                if r >= necesario and agregados >= minimo:
+                    break
+                e = r + lat_rf
+                if e < store:
+                    e = store
+                s = e + perfil_nop[2]
+                if s < store + lat_store:
+                    s = store + lat_store
+                decode, rf, execute, store = d, r, e, s
+                agregados += 1
+            nops.append(agregados)
+            e = r + lat_rf
+            if e < store:
+                e = store
+            s = e + latencia
+            if s < store + lat_store:
+                s = store + lat_store
+            decode, rf, execute, store = d, r, e, s
+            if escrito:
+                listo[escrito] = store + lat_store
+        salida = ((0, rf - decode, execute - decode, store - decode),
+                  tuple(sorted((reg, ciclo - decode) for reg, ciclo in listo.items() if ciclo > decode)))
+        return nops, salida
+
+    def planificar_todos(estados, perfiles_bloque, minimos):
+        """Como planificar, con los mismos NOPs para todos los estados de entrada; devuelve los estados de salida."""
+        nops = minimos
+        while True:
+            salidas = set()
+            for estado in sorted(estados):
+                nops_estado, salida = planificar(estado, perfiles_bloque, nops)
+                if nops_estado != nops:
+                    nops = nops_estado  # este camino pidió más: se revisan todos de nuevo
+                    break
+                salidas.add(salida)
+            else:
+                return nops, frozenset(salidas)
+
+    def rellenar(estados, p):
+        """Estados después de p NOPs."""
+        return frozenset(planificar(estado, [perfil_nop] * p, None)[1] for estado in estados) if p else estados
+
+    bloques = construir_bloques(programa)
+    dentro = [0] * len(codigo)   # NOPs después del label (los ejecuta todo camino)
+    relleno = [0] * len(codigo)  # NOPs antes del label (solo por la arista secuencial)
+    salidas = [None] * len(bloques)
+    pendientes = deque(bloques)
+    en_cola = set(range(len(bloques)))
+    while pendientes:
+        bloque = pendientes.popleft()
+        en_cola.discard(bloque.indice)
+        secuencial = None
+        saltos = _SOLO_VACIO if bloque.inicio == 0 else None
+        for pred, tipo in bloque.predecesores:
+            opcode = programa[pred.fin - 1].opcode
+            if tipo == ARISTA_SECUENCIAL:
+                secuencial = salidas[pred.indice]
+            elif tipo == ARISTA_RETORNO and destino_predicho:
+                secuencial = _unir(secuencial, salidas[pred.indice])
+            elif salto_especulativo and (opcode == OP_BEQ or (destino_predicho and opcode == OP_JAL)):
+                saltos = _unir(saltos, salidas[pred.indice])
+            else:
+                saltos = _unir(saltos, _SOLO_VACIO)
+        inicio, fin = bloque.inicio, bloque.fin
+        perfiles_bloque = perfiles[inicio:fin]
+        minimos = dentro[inicio:fin]
+        if secuencial is None or saltos is None:
+            # Una sola clase de arista: los NOPs van después del label
+            p = relleno[inicio]
+            entrada = rellenar(_unir(secuencial, saltos) or _SOLO_VACIO, p)
+            nops, salida = planificar_todos(entrada, perfiles_bloque, minimos)
+        else:
+            # Se prueba mover NOPs antes del label: primero lo que paga la arista
+            # secuencial (relleno + dentro), después lo que paga el salto (dentro)
+            p = relleno[inicio]
+            antes = rellenar(secuencial, p)
+            mejor = None
+            while True:
+                nops_p, salida_p = planificar_todos(_unir(antes, saltos), perfiles_bloque, minimos)
+                total = sum(nops_p)
+                costo = (p + total, total)
+                if mejor is None or costo < mejor[0]:
+                    mejor = (costo, p, nops_p, salida_p)
+                # Con más relleno la arista secuencial ya no puede pagar menos
+                if total == 0 or p >= horizonte or p + 1 > mejor[0][0]:
+                    break
+                antes = rellenar(antes, 1)
+                p += 1
+            _, p, nops, salida = mejor
+            relleno[inicio] = p
+        dentro[inicio:fin] = nops
+        if salida != salidas[bloque.indice]:
+            salidas[bloque.indice] = salida
+            for suc, _tipo in bloque.sucesores:
+                if suc.indice not in en_cola:
+                    en_cola.add(suc.indice)
+                    pendientes.append(suc)
+    return [d + r for d, r in zip(dentro, relleno)], relleno
+
+
+def insertar_nops(codigo, nops_antes):
+    """Copia de 'codigo' con nops_antes[i] NOPs antes de la instrucción i."""
+    nuevo = []
+    for texto, nops in zip(codigo, nops_antes):
+        if nops:
+            nuevo.extend(["nop"] * nops)
+        nuevo.append(texto)
+    return nuevo
+
+
+def reubicar_labels(labels, nops_antes, relleno=None):
+    """
+    Labels (nombre -> PC) calculados sobre el código sin NOPs, corridos a su
+    posición después de insertar_nops. Un label queda después de los relleno[i]
+    NOPs de su instrucción que van antes del label (sin relleno, en el primero).
+    """
+    corrido = [0] * (len(nops_antes) + 1)  # corrido[i]: NOPs antes de la instrucción i
+    total = 0
+    for i, nops in enumerate(nops_antes):
+        corrido[i] = total + (relleno[i] if relleno else 0)
+        total += nops
+    corrido[-1] = total
+    return {nombre: pc + corrido[min(pc // 4, len(nops_antes))] * 4 for nombre, pc in labels.items()}
+
+
+def validar_politica(politica, permitidas=POLITICAS):
+    if politica not in permitidas:
+        raise ValueError(f"Política de hazards desconocida: {politica!r} (opciones: {', '.join(permitidas)})")
+    return politica
+
+
+class UnidadAdelantamiento:
+    """
+    Resuelve los operandos de la instrucción que entra a Execute. Cuenta los
+    operandos que vinieron de un latch y los ciclos de espera por load-use.
+    """
+    def __init__(self, regs):
+        self.regs = regs  # misma lista que el CPU y RegisterFile
+        self.adelantados = 0
+        self.ciclos_stall = 0
+
+    def operandos(self, params, latches):
+        """
+        Copia de params con los valores de los registros fuente al día, o None si
+        algún operando lo produce un load que aún no leyó memoria (hay que esperar).
+        latches: etapas posteriores ordenadas de la más nueva a la más vieja.
+        """
+        posiciones = OPERANDOS.get(params[0]) if params else None
+        if not posiciones:
+            return params
+        nuevos = list(params)
+        for pos_reg, pos_val in posiciones:
+            rs = params[pos_reg]
+            if not 0 < rs < len(self.regs):
+                continue  # x0 (o fuera de rango) se queda como lo leyó RegisterFile
+            for etapa in latches:
+                if etapa.instruccionEjecutando == "":
+                    continue
+                resultado = etapa.params
+                if not resultado:
+                    continue
+                accion = resultado[0]
+                if accion == 'reg_write' and resultado[1] == rs:
+                    nuevos[pos_val] = resultado[2]
+                    self.adelantados += 1
+                    break
+                if accion == 'mem_read_and_reg_write' and resultado[1] == rs:
+                    self.ciclos_stall += 1
+                    return None
+                if accion == 'jump_result' and resultado[1] == rs:
+                    nuevos[pos_val] = etapa.instruccionEjecutando.pc + 4
+                    self.adelantados += 1
+                    break
+            else:
+                nuevos[pos_val] = self.regs[rs]
+        return nuevos
+
+    def snapshot(self):
+        return {'adelantados': self.adelantados, 'ciclos_stall': self.ciclos_stall}
+
+    def restore(self, estado):
+        self.adelantados = estado['adelantados']
+        self.ciclos_stall = estado['ciclos_stall']
+
+
+def registros_leidos(instr):
+    """Registros fuente (sin x0) que la instrucción lee en RegisterFile."""
+    opcode = instr.opcode
+    if opcode in (OP_ALU, OP_SW, OP_BEQ):
+        fuentes = (instr.rs1, instr.rs2)
+    elif opcode in (OP_ADDI, OP_LW, OP_JALR):
+        fuentes = (instr.rs1,)
+    else:
+        return ()
+    return tuple(rs for rs in fuentes if rs)
+
+
+def registro_escrito(instr):
+    """Registro destino de la instrucción (0 si no escribe ninguno)."""
+    if instr.opcode in (OP_ALU, OP_ADDI, OP_LW, OP_JAL, OP_JALR):
+        return instr.rd
+    return 0
+
+
+class MarcadorRegistros:
+    """
+    Scoreboard: cantidad de escrituras pendientes por registro, de las
+    instrucciones que ya pasaron a RegisterFile y todavía no completaron Store.
+    """
+    def __init__(self):
+        self.pendientes = {}  # registro -> escrituras en vuelo
+        self.ciclos_stall = 0
+
+    def puede_emitir(self, instr):
+        """True si instr no lee ningún registro pendiente; si no, cuenta un ciclo de stall."""
+        pendientes = self.pendientes
+        if pendientes:
+            for rs in registros_leidos(instr):
+                if rs in pendientes:
+                    self.ciclos_stall += 1
+                    return False
+        return True
+
+    def emitir(self, instr):
+        """instr entró a RegisterFile."""
+        rd = registro_escrito(instr)
+        if rd:
+            self.pendientes[rd] = self.pendientes.get(rd, 0) + 1
+
+    def retirar(self, instr):
+        """instr completó Store (su escritura ya está en el banco de registros)."""
+        rd = registro_escrito(instr)
+        if rd in self.pendientes:
+            if self.pendientes[rd] == 1:
+                del self.pendientes[rd]
+            else:
+                self.pendientes[rd] -= 1
+
+    def limpiar(self):
+        """Flush: las instrucciones en vuelo se descartaron."""
+        self.pendientes.clear()
+
+    def reconstruir(self, etapas):
+        """Recalcula las escrituras pendientes a partir de las instrucciones en esas etapas."""
+        self.pendientes.clear()
+        for etapa in etapas:
+            if etapa.instruccionEjecutando != "":
+                self.emitir(etapa.instruccionEjecutando)
+
+    def snapshot(self):
+        return {'ciclos_stall': self.ciclos_stall}
+
+    def restore(self, estado):
+        self.ciclos_stall = estado['ciclos_stall']
@@ -48,6 +48,7 @@ INSTRUCTION_LATENCIES = {
     'blt': 1,      # Branch (predice en Fetch/Decode)
     'beq': 1,
     'jal': 1,
+    'jalr': 1,
     'nop': 1,      # No operation
 }
 
@@ -0,0 +1,164 @@
+# Planificación por listas (list scheduling) dentro de cada bloque básico.
+# Antes de que controlar_hazards rellene con NOPs, se reordenan las
+# instrucciones independientes de cada bloque para que ocupen los ciclos en que
+# un consumidor tendría que esperar a su productor. Se respetan las
+# dependencias RAW, WAR y WAW entre registros y el orden de memoria (un sw no
+# se cruza con ningún lw/sw; dos lw sí pueden cambiar de orden). El salto
+# (beq/jal/jalr) que cierra un bloque queda último, así que los bloques (y los
+# labels) no se mueven.
+# Lo que no se llega a cubrir lo siguen resolviendo los NOPs de nops_necesarios.
+
+from .decodificador import OP_DESCONOCIDO, OP_LW, OP_SW, OP_BEQ, OP_JAL, OP_JALR, decodificar_instruccion
+from .latencias_config import get_stage_latency
+from .bloques import construir_bloques
+from .hazards import registros_leidos, registro_escrito
+
+VENTANA = 16  # instrucciones pendientes (en orden del texto) que se miran en cada paso
+
+
+class _Modelo:
+    """Ciclos de entrada a Decode/RegisterFile/Execute/Store de la última instrucción emitida (como en nops_necesarios)."""
+    __slots__ = ('fetch', 'decode', 'rf', 'store', 'tiempos', 'listo')
+
+    def __init__(self):
+        self.fetch = get_stage_latency('Fetch')
+        self.decode = get_stage_latency('Decode')
+        self.rf = get_stage_latency('RegisterFile')
+        self.store = get_stage_latency('Store')
+        self.tiempos = (0, 0, 0, 0)
+        self.listo = {}  # registro -> ciclo en que completa Store su último escritor
+
+    def espera(self, leidos):
+        """NOPs que harían falta para emitir ahora una instrucción que lee esos registros."""
+        necesario = 0
+        for rs in leidos:
+            ciclo = self.listo.get(rs, 0)
+            if ciclo > necesario:
+                necesario = ciclo
+        tiempos = self.tiempos
+        nops = 0
+        while True:
+            decode, rf, execute, store = tiempos
+            d = max(decode + self.fetch, rf)
+            r = max(d + self.decode, execute)
+            if r >= necesario:
+                return nops
+            tiempos = self._paso(tiempos, 1)
+            nops += 1
+
+    def _paso(self, tiempos, latencia):
+        decode, rf, execute, store = tiempos
+        d = max(decode + self.fetch, rf)
+        r = max(d + self.decode, execute)
+        e = max(r + self.rf, store)
+        return d, r, e, max(e + latencia, store + self.store)
+
+    def emitir(self, nops, escrito, latencia):
+        for _ in range(nops):
+            self.tiempos = self._paso(self.tiempos, 1)
+        self.tiempos = self._paso(self.tiempos, latencia)
+        if escrito:
+            self.listo[escrito] = self.tiempos[3] + self.store
+
+
+def _reordenar_bloque(instrs, perfiles, modelo):
+    """Orden nuevo (índices dentro del bloque) para las instrucciones de un bloque."""
+    n = len(instrs)
+    cierre = n - 1 if instrs[-1].opcode in (OP_BEQ, OP_JAL, OP_JALR) else None
+    if any(instr.opcode == OP_DESCONOCIDO for instr in instrs):
+        orden = list(range(n))  # no se sabe qué toca: se deja como está
+        for k in orden:
+            modelo.emitir(modelo.espera(perfiles[k][0]), perfiles[k][1], perfiles[k][2])
+        return orden
+
+    # Grafo de dependencias con tablas de último escritor / lectores / accesos a memoria
+    sucesores = [[] for _ in range(n)]
+    faltan = [0] * n
+    escritor = {}   # registro -> última instrucción que lo escribe
+    lectores = {}   # registro -> instrucciones que lo leen desde su última escritura
+    ultimo_sw = None
+    lw_desde_sw = []
+
+    def depende(antes, despues):
+        sucesores[antes].append(despues)
+        faltan[despues] += 1
+
+    for k, instr in enumerate(instrs):
+        leidos, escrito, _ = perfiles[k]
+        previas = set()
+        for rs in leidos:
+            if rs in escritor:
+                previas.add(escritor[rs])                  # RAW
+        if escrito:
+            if escrito in escritor:
+                previas.add(escritor[escrito])             # WAW
+            previas.update(lectores.get(escrito, ()))      # WAR
+        if instr.opcode == OP_LW:
+            if ultimo_sw is not None:
+                previas.add(ultimo_sw)
+        elif instr.opcode == OP_SW:
+            if ultimo_sw is not None:
+                previas.add(ultimo_sw)
+            previas.update(lw_desde_sw)
+        if k == cierre:
+            previas.update(range(k))                       # el salto cierra el bloque
+        previas.discard(k)
+        for previa in previas:
+            depende(previa, k)
+        for rs in leidos:
+            lectores.setdefault(rs, []).append(k)
+        if escrito:
+            escritor[escrito] = k
+            lectores[escrito] = []
+        if instr.opcode == OP_LW:
+            lw_desde_sw.append(k)
+        elif instr.opcode == OP_SW:
+            ultimo_sw = k
+            lw_desde_sw = []
+
+    # Prioridad: camino más largo (en latencia de Execute) hasta el final del bloque
+    altura = [0] * n
+    for k in range(n - 1, -1, -1):
+        altura[k] = perfiles[k][2] + max((altura[s] for s in sucesores[k]), default=0)
+
+    orden = []
+    hecho = [False] * n
+    base = 0
+    while len(orden) < n:
+        while hecho[base]:
+            base += 1
+        mejor = None
+        vistos = 0
+        k = base
+        while k < n and vistos < VENTANA:
+            if not hecho[k]:
+                vistos += 1
+                if faltan[k] == 0:
+                    clave = (modelo.espera(perfiles[k][0]), -altura[k], k)
+                    if mejor is None or clave < mejor[0]:
+                        mejor = (clave, k)
+            k += 1
+        (nops, _, _), elegida = mejor
+        hecho[elegida] = True
+        orden.append(elegida)
+        modelo.emitir(nops, perfiles[elegida][1], perfiles[elegida][2])
+        for s in sucesores[elegida]:
+            faltan[s] -= 1
+    return orden
+
+
+def reordenar_programa(codigo, labels=None):
+    """
+    Reordena cada bloque básico de 'codigo' (texto, sin labels). Devuelve
+    (nuevo código, origen): origen[i] es el índice en 'codigo' de la
+    instrucción que quedó en la posición i. Los labels siguen valiendo.
+    """
+    programa = [decodificar_instruccion(texto, i * 4, labels) for i, texto in enumerate(codigo)]
+    perfiles = [(registros_leidos(instr), registro_escrito(instr), instr.latencia) for instr in programa]
+    modelo = _Modelo()  # se sigue el orden del texto entre bloques (arista secuencial)
+    origen = []
+    for bloque in construir_bloques(programa):
+        inicio, fin = bloque.inicio, bloque.fin
+        orden = _reordenar_bloque(programa[inicio:fin], perfiles[inicio:fin], modelo)
+        origen.extend(inicio + k for k in orden)
+    return [codigo[i] for i in origen], origen
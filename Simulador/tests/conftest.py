@@ -0,0 +1,29 @@
+# Configuración común de las pruebas del simulador.
+# Los CPU importan sus módulos desde Simulador/ (y el sin hazards desde la raíz
+# del repo), y escriben logs y memoria_salida*.txt en el directorio actual al
+# importarse: se corre todo desde un directorio temporal para no ensuciar el repo.
+
+import ast
+import os
+import sys
+import tempfile
+
+SIMULADOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for ruta in (SIMULADOR, os.path.dirname(SIMULADOR)):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+os.chdir(tempfile.mkdtemp(prefix="simulador_tests_"))
+
+
+def programas_main():
+    """Las listas riscv_code de main.py (sin importarlo: main.py corre la simulación)."""
+    with open(os.path.join(SIMULADOR, "main.py"), encoding="utf-8") as f:
+        arbol = ast.parse(f.read())
+    programas = []
+    for nodo in ast.walk(arbol):
+        if (isinstance(nodo, ast.Assign) and isinstance(nodo.value, ast.List)
+                and any(getattr(t, 'id', None) == 'riscv_code' for t in nodo.targets)
+                and nodo.value.elts):
+            programas.append(ast.literal_eval(nodo.value))
+    return programas
@@ -0,0 +1,48 @@
+import pytest
+
+from conftest import programas_main
+from cpuPipelineSinHazards import CPUpipelineNoHazard
+from cpuPipelineHazardControl import CPUPipelineHazardControl
+from cpuPipelineConPredicciondeSaltos import CPUpipelineConPrediccionSaltos
+from cpuPipelinePrediccionSaltosHazardControl import CPUPipelinePrediccionSaltosHazardControl
+from pipelineEtapas.codificador import (codificar_instruccion, codificar_programa,
+                                        decodificar_palabra, PALABRA_ILEGAL)
+from pipelineEtapas.decodificador import OP_DESCONOCIDO
+
+CPUS = [CPUpipelineNoHazard, CPUPipelineHazardControl,
+        CPUpipelineConPrediccionSaltos, CPUPipelinePrediccionSaltosHazardControl]
+
+# Programas sin codificación RV32I válida: corrían antes de ensamblar a memoria
+PROGRAMAS_SIN_CODIFICACION = {
+    'inmediato_fuera_de_rango': (["addi x1, x0, 3000", "add x2, x1, x1"], {1: 3000}),
+    'beq_sin_label': (["addi x1, x0, 5", "beq x0, x0, nowhere", "addi x2, x0, 7"], {1: 5}),
+    'jal_sin_label': (["addi x1, x0, 5", "jal x1, nowhere", "addi x2, x0, 7"], {2: 7}),
+}
+
+
+@pytest.mark.parametrize("cpu", CPUS, ids=lambda c: c.__name__)
+@pytest.mark.parametrize("nombre", PROGRAMAS_SIN_CODIFICACION)
+def test_instrucciones_sin_codificacion_se_ejecutan(cpu, nombre):
+    codigo, esperados = PROGRAMAS_SIN_CODIFICACION[nombre]
+    c = cpu()
+    c.cargarCodigo(codigo)
+    assert PALABRA_ILEGAL in c.mem_inst.data.tolist()
+    c.ejecutar()
+    for reg, valor in esperados.items():
+        assert c.regs[reg] == valor
+
+
+@pytest.mark.parametrize("codigo", programas_main(), ids=lambda c: str(len(c)))
+def test_ida_y_vuelta_programas_main(codigo):
+    c = CPUpipelineNoHazard()
+    c.cargarCodigo(codigo)
+    palabras = codificar_programa(c.programa)
+    assert palabras == c.mem_inst.data.tolist()[:len(palabras)]
+    for original, palabra in zip(c.programa, palabras):
+        if palabra == PALABRA_ILEGAL:
+            assert original.opcode == OP_DESCONOCIDO
+            continue
+        instr = decodificar_palabra(palabra, original.pc)
+        assert codificar_instruccion(instr) == palabra
+        for campo in ('opcode', 'mnemonico', 'rd', 'rs1', 'rs2', 'imm', 'target'):
+            assert getattr(instr, campo) == getattr(original, campo), (original.texto, campo)
@@ -0,0 +1,50 @@
+import pytest
+
+from cpuPipelineConPredicciondeSaltos import CPUpipelineConPrediccionSaltos
+from evaluacion_predictores import registrar_saltos, evaluar_configuracion
+from pipelineEtapas.bitacora import Bitacora
+
+# Dos lazos anidados: el beq interno sale cada 3 vueltas, el externo una sola vez
+LAZOS = [
+    "addi x1, x0, 20",
+    "addi x3, x0, 0",
+    "externo:",
+    "addi x2, x0, 3",
+    "interno:",
+    "add x3, x3, x1",
+    "addi x2, x2, -1",
+    "beq x2, x0, fin_interno",
+    "jal x0, interno",
+    "fin_interno:",
+    "addi x1, x1, -1",
+    "beq x1, x0, fin",
+    "jal x0, externo",
+    "fin:",
+    "nop",
+]
+
+CONFIGURACIONES = [
+    {'strategy': 'always_taken'},
+    {'strategy': 'always_not_taken'},
+    {'strategy': 'bimodal', 'bht_size': 64},
+    {'strategy': 'gshare', 'bht_size': 256, 'history_bits': 4},
+]
+
+
+def test_traza_de_lazos():
+    traza = registrar_saltos(LAZOS)
+    assert len(traza) == 20 * 3 + 20
+    assert traza.tomados.count(1) == 20 + 1
+
+
+@pytest.mark.parametrize("configuracion", CONFIGURACIONES, ids=lambda c: c['strategy'])
+def test_fallos_iguales_al_cpu_con_forwarding(configuracion):
+    resultado = evaluar_configuracion(registrar_saltos(LAZOS), configuracion)
+    opciones = {k: v for k, v in configuracion.items() if k != 'strategy'}
+    c = CPUpipelineConPrediccionSaltos(predictor_strategy=configuracion['strategy'], bitacora=Bitacora(0, []),
+                                       politica_hazards='forwarding', predictor_opciones=opciones)
+    c.cargarCodigo(LAZOS)
+    c.ejecutar()
+    assert c.regs[3] == sum(range(1, 21)) * 3
+    assert c.branch_predictor.mispredictions == resultado['fallos']
+    assert c.branch_predictor.correct_predictions == resultado['predicciones'] - resultado['fallos']
@@ -0,0 +1,83 @@
+import pytest
+
+from conftest import programas_main
+from cpuPipelineSinHazards import CPUpipelineNoHazard
+from cpuPipelineHazardControl import CPUPipelineHazardControl
+from cpuPipelineConPredicciondeSaltos import CPUpipelineConPrediccionSaltos
+from cpuPipelinePrediccionSaltosHazardControl import CPUPipelinePrediccionSaltosHazardControl
+from pipelineEtapas.bitacora import Bitacora
+from pipelineEtapas.ejecucion import FIN_HALT, FIN_TRAP
+from pipelineEtapas.eventos import ciclos_hasta_evento
+from pipelineEtapas.latencias_config import get_instruction_latency
+
+# (CPU, política) con etapas que retienen la instrucción terminada, y los modos originales
+CONFIGURACIONES = [
+    (CPUpipelineNoHazard, 'none'), (CPUpipelineNoHazard, 'forwarding'), (CPUpipelineNoHazard, 'interlock'),
+    (CPUPipelineHazardControl, 'nops'), (CPUPipelineHazardControl, 'forwarding'),
+    (CPUPipelineHazardControl, 'interlock'), (CPUPipelineHazardControl, 'schedule'),
+    (CPUpipelineConPrediccionSaltos, 'none'), (CPUpipelineConPrediccionSaltos, 'forwarding'),
+    (CPUpipelineConPrediccionSaltos, 'interlock'),
+    (CPUPipelinePrediccionSaltosHazardControl, 'nops'), (CPUPipelinePrediccionSaltosHazardControl, 'forwarding'),
+    (CPUPipelinePrediccionSaltosHazardControl, 'interlock'), (CPUPipelinePrediccionSaltosHazardControl, 'schedule'),
+]
+IDS = [f"{cpu.__name__}-{politica}" for cpu, politica in CONFIGURACIONES]
+
+N_DIVS = 30
+DIVS = ["addi x1, x0, 1000", "addi x2, x0, 3"] + ["div x3, x1, x2"] * N_DIVS + ["sw x3, 0(x0)"]
+
+
+def correr(cpu, politica, codigo, modo_eventos):
+    c = cpu(bitacora=Bitacora(0, []), politica_hazards=politica)
+    c.cargarCodigo(codigo)
+    motivo = c.ejecutar(modo_eventos=modo_eventos, max_ciclos=None)
+    return c, (motivo, c.ciclo_actual, list(c.regs), list(c.mem_data.data), c.instrucciones_completadas)
+
+
+@pytest.mark.parametrize("cpu, politica", CONFIGURACIONES, ids=IDS)
+def test_divs_saltan_ciclos_con_el_mismo_resultado(cpu, politica):
+    _, por_tick = correr(cpu, politica, DIVS, False)
+    c, por_eventos = correr(cpu, politica, DIVS, True)
+    assert por_eventos == por_tick
+    assert por_tick[0] == FIN_HALT
+    if c.ciclo_actual > N_DIVS * get_instruction_latency('div'):
+        # Los div se serializan en Execute: casi toda su latencia se salta
+        assert c.ciclos_saltados >= N_DIVS * (get_instruction_latency('div') - 2)
+
+
+@pytest.mark.parametrize("cpu, politica", CONFIGURACIONES, ids=IDS)
+def test_programas_main_iguales_a_tick(cpu, politica):
+    for codigo in programas_main():
+        assert correr(cpu, politica, codigo, True)[1] == correr(cpu, politica, codigo, False)[1]
+
+
+class _Etapa:
+    def __init__(self, instruccion="", ocupada=False, ciclos_restantes=0):
+        self.instruccionEjecutando = instruccion
+        self.ocupada = ocupada
+        self.ciclos_restantes = ciclos_restantes
+
+
+def test_terminada_retenida_no_es_evento():
+    # Execute procesa un div (4 ciclos más); RegisterFile y Decode terminaron y esperan
+    etapas = [_Etapa(), _Etapa("add"), _Etapa("add"), _Etapa("div", True, 5), _Etapa()]
+    retiene = lambda etapa: etapa.instruccionEjecutando == ""
+    assert ciclos_hasta_evento(etapas, False, retiene) == 4
+    # Sin retención, Decode podría pasar a RegisterFile (no está ocupada)
+    assert ciclos_hasta_evento(etapas, False) == 0
+
+
+def test_pipeline_trabado():
+    etapas = [_Etapa(), _Etapa(), _Etapa(), _Etapa("div", True, 0), _Etapa()]
+    assert ciclos_hasta_evento(etapas, False) is None
+
+
+@pytest.mark.parametrize("cpu, politica", CONFIGURACIONES, ids=IDS)
+def test_pipeline_trabado_termina_en_trap(cpu, politica):
+    c = cpu(bitacora=Bitacora(0, []), politica_hazards=politica)
+    c.cargarCodigo(DIVS)
+    # Una etapa ocupada que nunca termina (latencia 0)
+    c.etapa_execute.instruccionEjecutando = c.programa[2]
+    c.etapa_execute.ocupada = True
+    c.etapa_execute.ciclos_restantes = 0
+    assert c.ejecutar(modo_eventos=True, max_ciclos=100000) == FIN_TRAP
+    assert c.ciclo_actual < 100000
@@ -0,0 +1,35 @@
+import pytest
+
+from cpuPipelinePrediccionSaltosHazardControl import CPUPipelinePrediccionSaltosHazardControl
+from pipelineEtapas.bitacora import Bitacora
+from pipelineEtapas.hazards import nops_necesarios
+
+# L lo alcanzan el beq (tomado) y la arista secuencial desde el addi x2
+CODIGO_UNION = ["addi x1, x0, 5", "beq x4, x0, L", "addi x2, x0, 1", "add x3, x1, x2"]
+LABELS_UNION = {'L': 12}
+
+
+def test_union_sin_especulacion():
+    # El beq tomado hace flush: por esa arista no llega nada en vuelo, todos
+    # los NOPs van antes del label y solo los paga la arista secuencial
+    nops, relleno = nops_necesarios(CODIGO_UNION, LABELS_UNION)
+    assert nops == [0, 0, 0, 2]
+    assert relleno == [0, 0, 0, 2]
+
+
+def test_union_con_salto_especulativo():
+    # Con predicción el add entra detrás del beq con x1 todavía en vuelo:
+    # un NOP tiene que quedar después del label para la arista tomada
+    nops, relleno = nops_necesarios(CODIGO_UNION, LABELS_UNION, salto_especulativo=True)
+    assert nops == [0, 0, 0, 2]
+    assert relleno == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("estrategia", ['always_taken', 'always_not_taken'])
+@pytest.mark.parametrize("x4, x3", [(0, 5), (1, 6)], ids=['tomado', 'no_tomado'])
+def test_union_en_cpu_con_prediccion(estrategia, x4, x3):
+    c = CPUPipelinePrediccionSaltosHazardControl(predictor_strategy=estrategia, bitacora=Bitacora(0, []))
+    c.cargarCodigo([f"addi x4, x0, {x4}", "addi x1, x0, 5", "beq x4, x0, L",
+                    "addi x2, x0, 1", "L:", "add x3, x1, x2"])
+    c.ejecutar()
+    assert c.regs[3] == x3